@@ -0,0 +1,104 @@
+"""Time and payload of drawing the Memento Mori grid, and of exporting it.
+
+"per-week containers" rebuilds the grid the way the screen did before it
+was rasterized: one bordered, tooltipped Container per week. "year bands"
+is the screen as it is now, building the bands that fill the first
+viewport. Payload is the JSON of the Flet add commands for the grid.
+
+Run from the backend directory:  python benchmarks/calendar_grid.py [years ...]
+"""
+import io
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import flet as ft
+from flet.core.protocol import CommandEncoder
+from models.life_calendar import LifeCalendar
+from models.player import Player
+from screens.memento_mori_screen import MementoMoriScreen
+from services.calendar_export import export_pdf, export_png, export_svg
+from services.sqlite_store import SQLiteStore
+
+BIRTH_DATE = date(1990, 6, 15)
+
+
+def per_week_grid(years, lived_weeks):
+    rows = []
+    for year_num in range(years):
+        week_boxes = []
+        for week in range(52):
+            index = year_num * 52 + week
+            week_boxes.append(ft.Container(
+                width=11,
+                height=11,
+                bgcolor=ft.Colors.BLACK if index < lived_weeks else ft.Colors.WHITE,
+                border=ft.border.all(0.5, ft.Colors.GREY_400 if index < lived_weeks else ft.Colors.GREY_200),
+                margin=0.5,
+                tooltip=f"Year {year_num}, Week {week + 1}" + ("" if index < lived_weeks else " (Future)")
+            ))
+        label = f"{year_num}" if year_num % 5 == 0 else ""
+        rows.append(ft.Row(
+            controls=[*week_boxes, ft.Container(content=ft.Text(label, size=10), width=30)],
+            spacing=0
+        ))
+    return ft.Column(rows)
+
+
+def payload(control):
+    added = []
+    commands = control._build_add_commands(added_controls=added)
+    return len(added), len(json.dumps(commands, cls=CommandEncoder))
+
+
+def measure(build):
+    start = time.perf_counter()
+    control = build()
+    controls, size = payload(control)
+    return (time.perf_counter() - start) * 1000, controls, size
+
+
+def screen_for(years):
+    Player.store = SQLiteStore(':memory:')
+    player = Player()
+    player.birth_date = BIRTH_DATE
+    player.life_expectancy = years
+    return MementoMoriScreen(player)
+
+
+def main(all_years):
+    lived = (date.today() - BIRTH_DATE).days // 7
+    print(f"{'years':>5}  {'grid':<20} {'time':>10} {'controls':>9} {'bytes':>10}")
+    for years in all_years:
+        screen = screen_for(years)
+
+        def bands():
+            LifeCalendar._cache.clear()
+            screen.calendar = None
+            screen.bands = []
+            screen.generate_calendar(None)
+            return screen.grid_area
+
+        for name, build in (("per-week containers", lambda: per_week_grid(years, lived)), ("year bands", bands)):
+            elapsed, controls, size = measure(build)
+            print(f"{years:>5}  {name:<20} {elapsed:>7.1f} ms {controls:>9} {size:>10,}")
+
+    print()
+    print(f"{'years':>5}  {'export':<20} {'time':>10} {'bytes':>10}")
+    for years in all_years:
+        calendar = LifeCalendar(BIRTH_DATE, years)
+        calendar.advance(date.today())
+        for name, export, out in (("svg", export_svg, io.StringIO), ("png", export_png, io.BytesIO), ("pdf", export_pdf, io.BytesIO)):
+            f = out()
+            start = time.perf_counter()
+            export(calendar, f)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{years:>5}  {name:<20} {elapsed:>7.1f} ms {len(f.getvalue()):>10,}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [80, 120])
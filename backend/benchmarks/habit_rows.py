@@ -0,0 +1,113 @@
+"""Controls, commands and bytes sent to the client per habit edit at 500 habits.
+
+The page stand-in builds the same update commands Flet would send and
+JSON-encodes them; nothing is rendered. "rebuild all rows" is what every
+edit cost before rows were patched in place.
+
+Run from the backend directory:  python benchmarks/habit_rows.py [habits]
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flet.core.protocol import CommandEncoder
+from models.player import Player
+from screens.habits_screen import HabitsScreen
+from services.habit_schedule import HabitScheduler
+from services.habit_service import HabitService
+from services.sqlite_store import SQLiteStore
+
+
+class CountingPage:
+    """Builds Flet's update commands for the controls given and counts what would be sent"""
+
+    def __init__(self):
+        self.overlay = []
+        self.index = {'page': self}
+        self.root = None
+        self.sent = []
+        self._next_id = 0
+
+    def _register(self, added):
+        for control in added:
+            if control._Control__uid is None:
+                self._next_id += 1
+                control._Control__uid = f"_{self._next_id}"
+                self.index[control._Control__uid] = control
+            control.page = self
+
+    def add(self, root):
+        self.root = root
+        added = []
+        root._build_add_commands(index=self.index, added_controls=added)
+        self._register(added)
+
+    def update(self, *controls):
+        if self.root is None:
+            return
+        controls = controls or (self.root,)
+        commands, added, removed = [], [], []
+        for control in controls:
+            control.build_update_commands(self.index, commands, added, removed)
+        self._register(added)
+        self.sent.append((len(controls), len(commands), len(json.dumps(commands, cls=CommandEncoder))))
+
+
+def make_screen(habits):
+    Player.store = SQLiteStore(':memory:')
+    player = Player()
+    service = HabitService(player, HabitScheduler())
+    for i in range(habits):
+        player.habits.add({
+            'name': f"Habit {i}", 'type': 'PHYSICAL', 'frequency': 'Daily', 'streak': 0, 'xp': 10,
+            'completed_today': False, 'last_completed': None, 'created_at': '2024-01-01',
+        })
+    page = CountingPage()
+    screen = HabitsScreen(player, page, service)
+    page.add(screen)
+    return screen, service, page
+
+
+def measure(page, edit):
+    page.sent.clear()
+    start = time.perf_counter()
+    edit()
+    elapsed = (time.perf_counter() - start) * 1000
+    controls, commands, size = (sum(column) for column in zip(*page.sent)) if page.sent else (0, 0, 0)
+    return controls, commands, size, elapsed
+
+
+def main(habits):
+    screen, service, page = make_screen(habits)
+    ids = service.player.habits.ids()
+    today = datetime.now().date()
+
+    def rebuild():
+        screen.load_habits()
+
+    def check_off_selected():
+        screen.selected = set(ids[10:30])
+        screen.check_off_selected(None)
+
+    edits = [
+        ("rename one habit", lambda: service.update(ids[0], name="Renamed")),
+        ("toggle one habit", lambda: service.toggle(ids[1], today)),
+        ("add a habit", lambda: service.add("New habit", 'MENTAL', "Daily")),
+        ("delete a habit", lambda: service.delete(ids[2])),
+        ("check off 20 selected", check_off_selected),
+        ("full page.update()", lambda: page.update()),
+        ("rebuild all rows", rebuild),
+    ]
+    print(f"{habits} habits")
+    print(f"{'edit':<26} {'controls':>9} {'commands':>9} {'bytes':>9} {'time':>10}")
+    for name, edit in edits:
+        controls, commands, size, elapsed = measure(page, edit)
+        print(f"{name:<26} {controls:>9} {commands:>9} {size:>9} {elapsed:>7.2f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,95 @@
+"""Habit streaks and rates: one habits x days matrix vs a per-habit bitset loop.
+
+Every habit gets five years of random history with its own completion
+rate. "daily" answers current and longest streaks plus 7 and 30 day rates
+for every habit; "weekly" answers the current streak in weeks, which is
+what ``HabitScheduler`` asks for Weekly and Monthly habits.
+
+Run from the backend directory:  python benchmarks/habit_stats.py [sizes...]
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.completion_history import CompletionHistory
+from services.habit_schedule import period_bounds, period_starts
+from services.habit_stats import HabitStats, streaks
+
+DAYS = 5 * 365
+TODAY = date(2026, 1, 1)
+ROUNDS = 5
+
+
+def make_habits(count, seed=7):
+    rng = random.Random(seed)
+    start = TODAY.toordinal() - DAYS + 1
+    habits = []
+    for i in range(count):
+        rate = rng.uniform(0.3, 0.97)
+        bits = 0
+        for day in range(DAYS):
+            if rng.random() < rate:
+                bits |= 1 << day
+        habits.append({'id': str(i), 'history': CompletionHistory(start, bits)})
+    return habits
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def daily_matrix(habits):
+    stats = HabitStats(habits, TODAY)
+    return stats.current_streaks(), stats.longest_streaks(), stats.weekly_rates(), stats.monthly_rates()
+
+
+def daily_loop(habits):
+    results = []
+    for habit in habits:
+        history = CompletionHistory.for_habit(habit)
+        # drop the cached longest run so every round does the same work
+        history._longest = None
+        results.append((history.current_streak(TODAY), history.longest_streak(),
+                        history.completion_rate(7, TODAY), history.completion_rate(30, TODAY)))
+    return results
+
+
+def weekly_matrix(habits):
+    stats = HabitStats(habits, period_bounds("Weekly", TODAY)[1])
+    starts = period_starts("Weekly", stats.start_date, stats.today)
+    columns = [max(0, (s - stats.start_date).days) for s in starts]
+    return streaks(stats.period_matrix(columns))[0]
+
+
+def weekly_loop(habits):
+    results = []
+    for habit in habits:
+        history = CompletionHistory.for_habit(habit)
+        first, last = period_bounds("Weekly", TODAY)
+        streak = 0
+        if not history.completions_between(first, last):
+            first, last = first - timedelta(days=7), first - timedelta(days=1)
+        while history.completions_between(first, last):
+            streak += 1
+            first, last = first - timedelta(days=7), first - timedelta(days=1)
+        results.append(streak)
+    return results
+
+
+def main(sizes):
+    print(f"{'habits':>8} {'daily matrix':>14} {'daily loop':>12} {'weekly matrix':>15} {'weekly loop':>13}")
+    for size in sizes:
+        habits = make_habits(size)
+        print(f"{size:>8} {timed(lambda: daily_matrix(habits)):>11.1f} ms {timed(lambda: daily_loop(habits)):>9.1f} ms"
+              f" {timed(lambda: weekly_matrix(habits)):>12.1f} ms {timed(lambda: weekly_loop(habits)):>10.1f} ms")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10, 1000, 10000])
@@ -0,0 +1,63 @@
+"""Per-mutation save cost as the profile grows: full rewrite vs journal append.
+
+Run from the backend directory:  python benchmarks/journal_append.py [sizes...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.player import Player
+from services.journal import PlayerJournal
+
+ROUNDS = 50
+
+
+def make_player(directory, habits):
+    Player.store = PlayerJournal(
+        os.path.join(directory, 'player.json'), os.path.join(directory, 'player.journal'),
+        compact_every=10 ** 9,
+    )
+    player = Player()
+    player.habits = [
+        {'name': f"Habit {i}", 'type': 'HEALTH', 'frequency': 'Daily', 'streak': i % 30,
+         'xp': 10, 'completed_today': False, 'last_completed': None, 'created_at': '2024-01-01'}
+        for i in range(habits)
+    ]
+    player.store.compact(player.to_dict())
+    player.save()
+    return player
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main(sizes):
+    print(f"{'habits':>8} {'full rewrite':>14} {'journal append':>16}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            player = make_player(directory, size)
+            habit_id = player.habits.ids()[0]
+
+            def mutate():
+                player.habits.update(habit_id, streak=player.habits.get(habit_id)['streak'] + 1)
+
+            def rewrite():
+                mutate()
+                player.store.compact(player.to_dict())
+
+            def append():
+                mutate()
+                player.save()
+
+            print(f"{size:>8} {timed(rewrite):>11.2f} ms {timed(append):>13.2f} ms")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [100, 1000, 10000])
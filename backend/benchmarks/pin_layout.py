@@ -0,0 +1,139 @@
+"""Time and payload of one map pan frame at 10, 1000 and 50000 pins.
+
+Each frame nudges the offset and lays the viewport out the way the frame
+scheduler does. "every pin" is the layout before pins were indexed:
+every pin is moved and sent. "viewport" is the screen as it is now:
+tiles, the lone pins in view and a badge per cluster. "still" is a
+viewport frame that doesn't move the view, like the ones finished tiles
+ask for. Tiles are rendered before timing starts, into a temporary
+cache, so the frames measure layout and not tile cutting. Payload is
+the JSON of the update commands, built by a page stand-in.
+
+Run from the backend directory:  python benchmarks/pin_layout.py [pins ...]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flet.core.protocol import CommandEncoder
+from models.player import Player
+from screens.map_screen import Location, MapScreen, VisitType
+from services.map_tiles import SourceMap, TileCache
+from services.sqlite_store import SQLiteStore
+
+FRAMES = 10
+SCALES = (0.5, 1.0, 3.0)
+
+
+class CountingPage:
+    """Builds Flet's update commands for the controls given and counts what would be sent"""
+
+    def __init__(self):
+        self.overlay = []
+        self.index = {'page': self}
+        self.root = None
+        self.sent = []
+        self._next_id = 0
+        self.on_resize = None
+
+    def _register(self, added):
+        for control in added:
+            if control._Control__uid is None:
+                self._next_id += 1
+                control._Control__uid = f"_{self._next_id}"
+                self.index[control._Control__uid] = control
+            control.page = self
+
+    def add(self, root):
+        self.root = root
+        added = []
+        root._build_add_commands(index=self.index, added_controls=added)
+        self._register(added)
+
+    def update(self, *controls):
+        if self.root is None:
+            return
+        controls = controls or (self.root,)
+        commands, added, removed = [], [], []
+        for control in controls:
+            control.build_update_commands(self.index, commands, added, removed)
+        self._register(added)
+        self.sent.append(len(json.dumps(commands, cls=CommandEncoder)))
+
+
+def make_screen(pins, tiles):
+    Player.store = SQLiteStore(':memory:')
+    player = Player()
+    player.locations_seeded = True
+    page = CountingPage()
+    screen = MapScreen(player, page)
+    screen.tile_layer.cache = TileCache(SourceMap(), directory=tiles)
+    rng = random.Random(pins)
+    for i in range(pins):
+        screen.add_location(Location(
+            id=str(i), name=f"Place {i}", description="", x=rng.random(), y=rng.random(),
+            visit_type=VisitType.OTHER, visited=False,
+        ), persist=False, refresh=False)
+    screen.store.load()
+    page.add(screen)
+    screen.initialized = True
+    return screen, page
+
+
+def every_pin(screen):
+    """The layout before pins were indexed: move every pin and send them all"""
+    pins = []
+    for location_id, location in screen.locations.items():
+        pin = screen.pin_layer.get(location_id)
+        pin.left, pin.top = screen._to_screen(location)
+        pin.visible = True
+        pins.append(pin)
+    screen.page.update(*pins)
+
+
+def warm_tiles(screen):
+    """Render every tile the frames will show, so no frame waits for one"""
+    cache = screen.tile_layer.cache
+    for scale in SCALES:
+        level = cache.level_for(max(screen.map_width, screen.map_height) * scale)
+        for key in cache.covering(level, -0.1, -0.1, 1.1, 1.1):
+            cache.get(*key)
+
+
+def pan(screen, page, layout, scale, step=(3, 2)):
+    screen.scale = scale
+    screen.offset_x = screen.map_width * (1 - scale) / 2
+    screen.offset_y = screen.map_height * (1 - scale) / 2
+    layout(screen)
+    page.sent.clear()
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        screen.offset_x += step[0]
+        screen.offset_y += step[1]
+        layout(screen)
+    elapsed = (time.perf_counter() - start) * 1000 / FRAMES
+    return elapsed, sum(page.sent) / FRAMES
+
+
+def main(all_pins):
+    with tempfile.TemporaryDirectory() as tiles:
+        print(f"{'pins':>6} {'scale':>6}  {'layout':<10} {'frame':>10} {'sent':>12}")
+        for pins in all_pins:
+            screen, page = make_screen(pins, tiles)
+            warm_tiles(screen)
+            for scale in SCALES:
+                for name, layout, step in (("every pin", every_pin, (3, 2)),
+                                           ("viewport", MapScreen.update_pin_positions, (3, 2)),
+                                           ("still", MapScreen.update_pin_positions, (0, 0))):
+                    elapsed, size = pan(screen, page, layout, scale, step)
+                    print(f"{pins:>6} {scale:>6}  {name:<10} {elapsed:>7.1f} ms {size / 1024:>8.1f} KiB")
+            screen.frames.cancel()
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10, 1000, 50000])
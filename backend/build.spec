@@ -4,7 +4,7 @@ block_cipher = None
 a = Analysis(['main.py'],
              pathex=[],
              binaries=[],
-             datas=[('data', 'data')],
+             datas=[('data', 'data'), ('assets', 'assets')],
              hiddenimports=[],
              hookspath=[],
              runtime_hooks=[],
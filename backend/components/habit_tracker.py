@@ -1,10 +1,11 @@
 import flet as ft
-from datetime import datetime, timedelta
+from datetime import date
 
 class HabitTracker(ft.Container):
-    def __init__(self, habits):
+    def __init__(self, habit_service):
         super().__init__()
-        self.habits = habits
+        self.habit_service = habit_service
+        self.habits = habit_service.player.habits
     
     def build(self):
         return ft.Column(
@@ -26,7 +27,7 @@ class HabitTracker(ft.Container):
                 content=ft.Row(
                     controls=[
                         ft.Checkbox(
-                            value=habit.get("completed", False),
+                            value=habit.get("completed_today", False),
                             on_change=lambda e, h=habit: self._toggle_habit(h)
                         ),
                         ft.Column(
@@ -36,7 +37,7 @@ class HabitTracker(ft.Container):
                                     ft.Text(f"Streak: {habit.get('streak', 0)} days", 
                                            color=streak_color),
                                     ft.Text(
-                                        f"Last: {last_completed.strftime('%m/%d')}" if last_completed 
+                                        f"Last: {date.fromisoformat(last_completed).strftime('%m/%d')}" if last_completed 
                                         else "Never completed",
                                         size=12
                                     )
@@ -57,21 +58,9 @@ class HabitTracker(ft.Container):
         )
     
     def _toggle_habit(self, habit):
-        today = datetime.now().date()
-        last_completed = habit.get("last_completed")
-        
-        if last_completed and last_completed.date() == today:
-            return
-        
-        if last_completed and last_completed.date() == today - timedelta(days=1):
-            habit["streak"] = habit.get("streak", 0) + 1
-        else:
-            habit["streak"] = 1
-        
-        habit["last_completed"] = datetime.now()
-        habit["completed"] = True
+        self.habit_service.toggle(habit['id'])
         self.update()
     
     def _remove_habit(self, habit):
-        self.habits.remove(habit)
+        self.habit_service.delete(habit['id'])
         self.update()
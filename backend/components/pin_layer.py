@@ -0,0 +1,86 @@
+import flet as ft
+
+
+class PinBucket(ft.Stack):
+    """A full-size stack holding up to ``PinLayer.BUCKET_SIZE`` pins.
+
+    Isolated, so updates to the layer or the page above don't walk into
+    its pins; the bucket is updated on its own when it gains or loses one.
+    """
+
+    def __init__(self):
+        super().__init__(controls=[], left=0, top=0, right=0, bottom=0)
+
+    def is_isolated(self):
+        return True
+
+
+class PinLayer(ft.Stack):
+    """Map pins keyed by location id, spread over fixed-size buckets.
+
+    Looking a pin up is a dict hit, and adding or removing one only diffs
+    and sends the bucket it lives in, so the cost doesn't grow with the
+    number of pins on the map. Moving or restyling a pin is left to the
+    caller, who patches the pin control itself. Bulk loads pass
+    ``send=False`` and call ``flush()`` once at the end.
+    """
+
+    BUCKET_SIZE = 64
+
+    def __init__(self):
+        super().__init__(controls=[], left=0, top=0, right=0, bottom=0)
+        self.pins = {}
+        self._bucket_of = {}
+        self._open = set()  # buckets with room for another pin
+        self._unsent = set()
+
+    def __len__(self):
+        return len(self.pins)
+
+    def __contains__(self, pin_id):
+        return pin_id in self.pins
+
+    def get(self, pin_id):
+        return self.pins.get(pin_id)
+
+    def add(self, pin_id, pin, send=True):
+        """Add ``pin`` under ``pin_id``, sending only the bucket it lands in"""
+        bucket = next(iter(self._open), None)
+        new_bucket = bucket is None
+        if new_bucket:
+            bucket = PinBucket()
+            self.controls.append(bucket)
+            self._open.add(bucket)
+        bucket.controls.append(pin)
+        if len(bucket.controls) >= self.BUCKET_SIZE:
+            self._open.discard(bucket)
+        self.pins[pin_id] = pin
+        self._bucket_of[pin_id] = bucket
+        # a new bucket goes out whole with the layer's own update
+        self._unsent.add(self if new_bucket else bucket)
+        if send:
+            self.flush()
+
+    def remove(self, pin_id, send=True):
+        """Drop a pin, sending only the removal from its bucket; returns the pin"""
+        pin = self.pins.pop(pin_id, None)
+        if pin is None:
+            return None
+        bucket = self._bucket_of.pop(pin_id)
+        bucket.controls.remove(pin)
+        self._open.add(bucket)
+        self._unsent.add(bucket)
+        if send:
+            self.flush()
+        return pin
+
+    def flush(self):
+        """Send the layer and buckets changed since the last flush"""
+        unsent, self._unsent = self._unsent, set()
+        if self in unsent:
+            unsent.discard(self)
+            if self.page:
+                self.update()
+        for bucket in unsent:
+            if bucket.page:
+                bucket.update()
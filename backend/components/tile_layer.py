@@ -0,0 +1,51 @@
+import flet as ft
+
+
+class TileLayer(ft.Stack):
+    """The map tiles covering the viewport, drawn from a ``TileCache``.
+
+    Image controls are pooled: a tile scrolling out hands its control to
+    one scrolling in, so the layer only ever holds about a screenful of
+    images and a frame that keeps the same tiles sends just their new
+    positions.
+    """
+
+    def __init__(self, cache, **kwargs):
+        super().__init__(controls=[], **kwargs)
+        self.cache = cache
+        self.shown = {}  # tile key -> image
+        self._spare = []  # hidden images waiting for a tile
+
+    def show(self, placed):
+        """Place tiles given as ``(key, left, top, width, height)``.
+
+        Returns the images that changed and whether new ones were added to
+        the layer, in which case the layer itself needs an update.
+        """
+        wanted = {key: box for key, *box in placed}
+        leaving = [self.shown.pop(key) for key in list(self.shown) if key not in wanted]
+        spare = self._spare + leaving
+        changed = []
+        added = False
+        for key, (left, top, width, height) in wanted.items():
+            image = self.shown.get(key)
+            if image is None:
+                if spare:
+                    image = spare.pop()
+                else:
+                    image = ft.Image(fit=ft.ImageFit.FILL, gapless_playback=True)
+                    self.controls.append(image)
+                    added = True
+                image.src_base64 = self.cache.get(*key)
+                image.visible = True
+                self.shown[key] = image
+            elif (image.left, image.top, image.width, image.height) == (left, top, width, height):
+                continue
+            image.left, image.top, image.width, image.height = left, top, width, height
+            changed.append(image)
+        for image in spare:
+            if image.visible:
+                image.visible = False
+                changed.append(image)
+        self._spare = spare
+        return changed, added
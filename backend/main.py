@@ -8,6 +8,11 @@ from screens.rewards_screen import RewardsScreen
 from screens.settings_screen import SettingsScreen
 from screens.habits_screen import HabitsScreen
 from screens.memento_mori_screen import MementoMoriScreen
+from services.day_rollover import DayRollover
+from services.habit_service import HabitService
+from services.sqlite_store import open_store
+from services.write_behind import WriteBehindSaver
+import atexit
 import traceback
 
 def get_theme(theme_mode=ft.ThemeMode.DARK):
@@ -25,6 +30,31 @@ def get_theme(theme_mode=ft.ThemeMode.DARK):
         ),
     )
 
+def confirm_fresh_profile(page, player):
+    """Tell the user their saved profile couldn't be read and ask before saving over it"""
+    def start_fresh(e):
+        dlg.open = False
+        player.allow_saves()
+        page.update()
+
+    kept = f" A copy was kept at {player.backup_path}." if player.backup_path else ""
+    dlg = ft.AlertDialog(
+        title=ft.Text("Saved profile unreadable"),
+        content=ft.Text(
+            f"Your saved profile could not be read: {player.load_error}.{kept}\n"
+            "Nothing will be saved until you start a new profile."
+        ),
+        actions=[
+            ft.TextButton("Not now", on_click=lambda e: (setattr(dlg, "open", False), page.update())),
+            ft.TextButton("Start new profile", on_click=start_fresh),
+        ],
+        actions_alignment=ft.MainAxisAlignment.END,
+        modal=True
+    )
+    page.dialog = dlg
+    dlg.open = True
+    page.update()
+
 def main(page: ft.Page):
     try:
         page.window.width = 1400
@@ -40,16 +70,23 @@ def main(page: ft.Page):
         page.theme_mode = ft.ThemeMode.DARK
         page.padding = 20
         
-        player = Player()
+        Player.store = open_store()
+        player = Player.load()
+        player.saver = WriteBehindSaver(player.write_staged)
+        page.on_disconnect = lambda e: player.close()
+        page.on_close = lambda e: player.close()
+        atexit.register(player.close)
         
-        home_screen = HomeScreen(player)
+        habit_service = HabitService(player)
+        page.run_task(DayRollover(player, habit_service).run)
+        home_screen = HomeScreen(player, habit_service)
         quests_screen = QuestsScreen(player)
         map_screen = MapScreen(player, page)
         profile_screen = ProfileScreen(player)
         rewards_screen = RewardsScreen(player)
-        habits_screen = HabitsScreen(player, page)  
+        habits_screen = HabitsScreen(player, page, habit_service)  
         settings_screen = SettingsScreen(player, page)
-        memento_mori_screen = MementoMoriScreen()
+        memento_mori_screen = MementoMoriScreen(player)
 
         
         screens = [
@@ -142,6 +179,8 @@ def main(page: ft.Page):
                 expand=True,
             )
         )
+        if player.load_error:
+            confirm_fresh_profile(page, player)
 
     except Exception as e:
         page.add(
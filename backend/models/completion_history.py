@@ -0,0 +1,186 @@
+from datetime import date, timedelta
+
+
+class CompletionHistory:
+    """Day-indexed bitset of the days a habit was completed.
+
+    Bit ``i`` of ``bits`` is day ``start + i`` (proleptic ordinals), so ten
+    years of history is ~460 bytes and every query below is a shift, mask or
+    popcount over the int rather than a walk over dates.
+    """
+
+    def __init__(self, start=None, bits=0):
+        self.start = start
+        self.bits = bits
+        self._longest = None
+        self._added = set()
+        self._removed = set()
+        self._origin = None  # the live history, when this is a snapshot of it
+
+    @classmethod
+    def from_json(cls, value):
+        """Parse the compact ``"<start ordinal>:<hex bits>"`` form"""
+        if not value:
+            return cls()
+        start, _, bits = value.partition(':')
+        return cls(int(start), int(bits or '0', 16))
+
+    def to_json(self):
+        if self.start is None:
+            return ""
+        return f"{self.start}:{self.bits:x}"
+
+    @classmethod
+    def for_habit(cls, habit):
+        """The history stored on a habit dict, created from legacy fields if missing.
+
+        Habits saved before histories existed only know ``last_completed`` and
+        ``streak``; those are taken to mean ``streak`` consecutive days ending
+        on ``last_completed``.
+        """
+        history = habit.get('history')
+        if isinstance(history, cls):
+            return history
+        if isinstance(history, str):
+            history = cls.from_json(history)
+        else:
+            history = cls()
+            last = habit.get('last_completed')
+            if last:
+                last = date.fromisoformat(str(last)[:10])
+                for offset in range(max(1, habit.get('streak', 0))):
+                    history.mark(last - timedelta(days=offset))
+                history.drain_changes()
+        habit['history'] = history
+        return history
+
+    def __len__(self):
+        """Number of completed days"""
+        return self.bits.bit_count()
+
+    def _index(self, day):
+        return day.toordinal() - self.start
+
+    def completed_on(self, day):
+        if self.start is None:
+            return False
+        i = self._index(day)
+        return i >= 0 and (self.bits >> i) & 1 == 1
+
+    def mark(self, day):
+        """Record a completion on ``day``; returns False if it was already set"""
+        ordinal = day.toordinal()
+        if self.start is None:
+            self.start = ordinal
+        elif ordinal < self.start:
+            self.bits <<= self.start - ordinal
+            self.start = ordinal
+        i = ordinal - self.start
+        if (self.bits >> i) & 1:
+            return False
+        self.bits |= 1 << i
+        if self._longest is not None:
+            after = self.bits >> (i + 1)
+            run = self.run_ending(day) + (~after & (after + 1)).bit_length() - 1
+            self._longest = max(self._longest, run)
+        self._removed.discard(ordinal)
+        self._added.add(ordinal)
+        return True
+
+    def unmark(self, day):
+        """Remove the completion on ``day``; returns False if there wasn't one"""
+        if not self.completed_on(day):
+            return False
+        self.bits &= ~(1 << self._index(day))
+        self._longest = None
+        ordinal = day.toordinal()
+        self._added.discard(ordinal)
+        self._removed.add(ordinal)
+        return True
+
+    def last_completed(self):
+        if not self.bits:
+            return None
+        return date.fromordinal(self.start + self.bits.bit_length() - 1)
+
+    def run_ending(self, day):
+        """Length of the run of completed days ending on ``day``"""
+        if self.start is None:
+            return 0
+        i = self._index(day)
+        if i < 0:
+            return 0
+        window = self.bits & ((1 << (i + 1)) - 1)
+        gaps = ~window & ((1 << (i + 1)) - 1)
+        return i + 1 if not gaps else i + 1 - gaps.bit_length()
+
+    def current_streak(self, today):
+        """Run ending today, or yesterday if today isn't checked off yet"""
+        if self.completed_on(today):
+            return self.run_ending(today)
+        return self.run_ending(today - timedelta(days=1))
+
+    def longest_streak(self):
+        """Longest run ever; cached, and kept up to date by ``mark``"""
+        if self._longest is None:
+            x, longest = self.bits, 0
+            while x:
+                x &= x >> 1
+                longest += 1
+            self._longest = longest
+        return self._longest
+
+    def completions_between(self, first, last):
+        """Completed days in the inclusive range ``first``..``last``"""
+        if self.start is None or last < first:
+            return 0
+        lo = max(0, self._index(first))
+        hi = self._index(last) + 1
+        if hi <= 0:
+            return 0
+        return ((self.bits >> lo) & ((1 << (hi - lo)) - 1)).bit_count()
+
+    def completion_rate(self, days, today):
+        """Fraction of the last ``days`` days (ending today) that were completed"""
+        if days <= 0:
+            return 0.0
+        return self.completions_between(today - timedelta(days=days - 1), today) / days
+
+    def dates(self):
+        """Completed dates, oldest first"""
+        x = self.bits
+        while x:
+            low = x & -x
+            i = low.bit_length() - 1
+            yield date.fromordinal(self.start + i)
+            x ^= low
+
+    def pending_changes(self):
+        """The (added, removed) dates not yet acknowledged as written"""
+        return ([date.fromordinal(o) for o in sorted(self._added)],
+                [date.fromordinal(o) for o in sorted(self._removed)])
+
+    def acknowledge(self, added, removed):
+        """Forget changes once a store has committed them.
+
+        Days changed again since ``pending_changes`` keep their newer entry.
+        """
+        self._added.difference_update(day.toordinal() for day in added)
+        self._removed.difference_update(day.toordinal() for day in removed)
+        if self._origin is not None:
+            self._origin.acknowledge(added, removed)
+
+    def snapshot(self):
+        """A copy for a background save; acknowledging it acknowledges this history too"""
+        copy = CompletionHistory(self.start, self.bits)
+        copy._added, copy._removed = set(self._added), set(self._removed)
+        copy._origin = self
+        return copy
+
+    def drain_changes(self):
+        """Return and forget the (added, removed) dates since the last drain"""
+        added = [date.fromordinal(o) for o in sorted(self._added)]
+        removed = [date.fromordinal(o) for o in sorted(self._removed)]
+        self._added.clear()
+        self._removed.clear()
+        return added, removed
@@ -0,0 +1,109 @@
+class HabitRegistry:
+    """Habits keyed by id, iterated in the order they were added.
+
+    Backed by a dict, so get, update and delete by id are O(1). New habits
+    take the next value of a counter that only moves forward, past every
+    numeric id the registry has seen. Deleting a habit doesn't lower it, so
+    as long as ``next_id`` is saved and passed back in on load, no id is
+    ever issued twice. Reports changes through
+    ``on_change(added, removed, reset)`` like ``TrackedList``, and
+    serializes as the plain list of habits.
+    """
+
+    def __init__(self, habits=(), on_change=None, next_id=1):
+        self._habits = {}
+        self._positions = {}
+        self._next_position = 0
+        self._next_id = int(next_id)
+        self.reassigned = []
+        # True once the counter has moved past its last saved value
+        self.counter_moved = False
+        for habit in habits:
+            self._insert(habit)
+        self.on_change = on_change
+
+    def _changed(self, added=(), removed=(), reset=False):
+        if self.on_change:
+            self.on_change(added, removed, reset)
+
+    @property
+    def next_id(self):
+        return self._next_id
+
+    def reserve(self, next_id):
+        """Never issue an id below ``next_id``, e.g. the counter saved last session"""
+        self._next_id = max(self._next_id, int(next_id))
+
+    def _new_id(self):
+        habit_id = str(self._next_id)
+        self._next_id += 1
+        self.counter_moved = True
+        return habit_id
+
+    def _insert(self, habit):
+        habit_id = habit.get('id')
+        if habit_id is None or str(habit_id) in self._habits:
+            if habit_id is not None:
+                # duplicate left behind by the old len(habits) + 1 ids
+                self.reassigned.append(str(habit_id))
+            habit_id = self._new_id()
+        habit_id = str(habit_id)
+        if habit_id.isdigit() and int(habit_id) >= self._next_id:
+            self._next_id = int(habit_id) + 1
+            self.counter_moved = True
+        habit['id'] = habit_id
+        self._habits[habit_id] = habit
+        self._positions[habit_id] = self._next_position
+        self._next_position += 1
+        return habit
+
+    def __iter__(self):
+        return iter(list(self._habits.values()))
+
+    def __len__(self):
+        return len(self._habits)
+
+    def __contains__(self, habit_id):
+        return str(habit_id) in self._habits
+
+    def __repr__(self):
+        return f"HabitRegistry({list(self._habits.values())!r})"
+
+    def ids(self):
+        return list(self._habits)
+
+    def get(self, habit_id, default=None):
+        return self._habits.get(str(habit_id), default)
+
+    def add(self, habit):
+        """Add a habit, giving it a fresh id unless it brings an unused one"""
+        habit = self._insert(habit)
+        self._changed(added=(habit,))
+        return habit
+
+    def update(self, habit_id, **changes):
+        habit = self._habits.get(str(habit_id))
+        if habit is None:
+            return None
+        habit.update(changes)
+        self._changed(added=(habit,))
+        return habit
+
+    def delete(self, habit_id):
+        """Remove a habit by id; returns it, or None if there was none"""
+        habit_id = str(habit_id)
+        habit = self._habits.pop(habit_id, None)
+        if habit is None:
+            return None
+        del self._positions[habit_id]
+        self._changed(removed=(habit,))
+        return habit
+
+    def in_order(self, ids):
+        """The habits among ``ids`` that exist, in display order"""
+        present = [habit_id for habit_id in map(str, ids) if habit_id in self._habits]
+        present.sort(key=self._positions.__getitem__)
+        return [self._habits[habit_id] for habit_id in present]
+
+    def to_json(self):
+        return list(self._habits.values())
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+WEEKS_PER_YEAR = 52
+
+
+class LifeCalendar:
+    """Weeks of a life as a bitmask: bit ``i`` is set once week ``i`` has been lived.
+
+    ``advance`` only sets the bits for weeks lived since the last call and
+    ``set_expectancy`` only adds or drops year rows, so keeping a calendar
+    current never recomputes it from scratch. Years whose bits changed are
+    collected in ``changed_years`` for the renderer to redraw.
+    """
+
+    _cache = OrderedDict()
+    CACHE_SIZE = 4
+
+    def __init__(self, birth_date, expectancy):
+        self.birth_date = birth_date
+        self.expectancy = expectancy
+        self.lived = 0
+        self.lived_weeks = 0
+        self.changed_years = set()
+
+    @classmethod
+    def get(cls, birth_date, expectancy, today):
+        """The cached calendar for ``birth_date``, brought up to ``expectancy`` and ``today``.
+
+        An exact (birth date, expectancy) match is only advanced. A match on
+        the birth date alone is resized rather than rebuilt.
+        """
+        key = (birth_date, expectancy)
+        calendar = cls._cache.pop(key, None)
+        if calendar is None:
+            for other in list(cls._cache):
+                if other[0] == birth_date:
+                    calendar = cls._cache.pop(other)
+                    calendar.set_expectancy(expectancy)
+                    break
+            else:
+                calendar = cls(birth_date, expectancy)
+        calendar.advance(today)
+        cls._cache[key] = calendar
+        while len(cls._cache) > cls.CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return calendar
+
+    @property
+    def total_weeks(self):
+        return self.expectancy * WEEKS_PER_YEAR
+
+    @property
+    def remaining_weeks(self):
+        return self.total_weeks - self.lived_weeks
+
+    @property
+    def percent_lived(self):
+        return 100 * self.lived_weeks / self.total_weeks if self.total_weeks else 0.0
+
+    def weeks_lived_by(self, today):
+        return max(0, min((today - self.birth_date).days // 7, self.total_weeks))
+
+    def advance(self, today):
+        """Flip the weeks lived since the last call; returns how many changed"""
+        weeks = self.weeks_lived_by(today)
+        if weeks == self.lived_weeks:
+            return 0
+        low, high = sorted((self.lived_weeks, weeks))
+        self.lived ^= ((1 << (high - low)) - 1) << low
+        self.changed_years.update(range(low // WEEKS_PER_YEAR, (high - 1) // WEEKS_PER_YEAR + 1))
+        self.lived_weeks = weeks
+        return high - low
+
+    def set_expectancy(self, years):
+        """Append or drop year rows; weeks already lived stay as they are"""
+        if years < self.expectancy:
+            self.lived &= (1 << (years * WEEKS_PER_YEAR)) - 1
+            self.lived_weeks = min(self.lived_weeks, years * WEEKS_PER_YEAR)
+        self.changed_years = {year for year in self.changed_years if year < years}
+        self.expectancy = years
+
+    def is_lived(self, week):
+        return (self.lived >> week) & 1 == 1
+
+    def lived_in_year(self, year):
+        return ((self.lived >> (year * WEEKS_PER_YEAR)) & ((1 << WEEKS_PER_YEAR) - 1)).bit_count()
+
+    def lived_per_year(self, first=0, last=None):
+        """Lived weeks in each year row from ``first`` up to (not including) ``last``"""
+        last = self.expectancy if last is None else last
+        return [self.lived_in_year(year) for year in range(first, last)]
+
+    def drain_changed_years(self):
+        changed, self.changed_years = self.changed_years, set()
+        return changed
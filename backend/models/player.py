@@ -1,90 +1,359 @@
-import json
-from datetime import datetime
-from enum import Enum
-
-class Attribute(Enum):
-    STRENGTH = "strength"
-    INTELLIGENCE = "intelligence"
-    CHARISMA = "charisma"
-    ENDURANCE = "endurance"
-    CREATIVITY = "creativity"
-
-class Player:
-    def __init__(self):
-        self.name = "Adventurer"
-        self.level = 1
-        self.xp = 0
-        self.gold = 100
-        self.attributes = {
-            "strength": 5,
-            "intelligence": 8,
-            "charisma": 6,
-            "endurance": 5,
-            "creativity": 5
-        }
-        self.active_quests = []
-        self.completed_quests = []
-        self.last_login = datetime.now()
-        self.daily_streak = 0
-        self.habits = []
-        self.visited_locations = [
-            {"name": "Tokyo", "x_pct": 88, "y_pct": 50},
-            {"name": "Paris", "x_pct": 46, "y_pct": 40},
-        ]
-
-    def save(self):
-        with open('data/player.json', 'w') as f:
-            json.dump({
-                'name': self.name,
-                'level': self.level,
-                'xp': self.xp,
-                'gold': self.gold,
-                'attributes': self.attributes,
-                'last_login': self.last_login.isoformat(),
-                'daily_streak': self.daily_streak,
-                'habits': self.habits,
-                'visited_locations': self.visited_locations
-            }, f)
-
-    @classmethod
-    def load(cls):
-        try:
-            with open('data/player.json') as f:
-                data = json.load(f)
-                player = cls()
-                player.name = data.get('name', 'Adventurer')
-                player.level = data.get('level', 1)
-                player.xp = data.get('xp', 0)
-                player.gold = data.get('gold', 100)
-                player.attributes = data.get('attributes', {
-                    "strength": 5,
-                    "intelligence": 8,
-                    "charisma": 6,
-                    "endurance": 5,
-                    "creativity": 5
-                })
-                player.last_login = datetime.fromisoformat(data.get('last_login', datetime.now().isoformat()))
-                player.daily_streak = data.get('daily_streak', 0)
-                player.habits = data.get('habits', [])
-                player.visited_locations = data.get('visited_locations', [])
-                return player
-        except (FileNotFoundError, ValueError):
-            return cls()
-
-    def add_xp(self, amount):
-        self.xp += amount
-        if self.xp >= self.xp_to_next_level():
-            self.level_up()
-
-    def xp_to_next_level(self):
-        return self.level * 100
-
-    def level_up(self):
-        self.level += 1
-        self.xp = 0
-        self.gold += self.level * 50
-
-    def complete_quest(self, quest):
-        self.add_xp(quest.xp_reward)
-        self.gold += quest.gold_reward
-        self.completed_quests.append(quest)
+import threading
+from datetime import date, datetime
+from enum import Enum
+from functools import partial
+from models.completion_history import CompletionHistory
+from models.habit_registry import HabitRegistry
+from models.quest import Quest
+from models.tracking import SaveStats, TrackedDict, TrackedList, TrackedSet
+from services.journal import PlayerJournal
+
+FIELDS = (
+    'name', 'level', 'xp', 'gold', 'attributes', 'last_login', 'daily_streak',
+    'habits', 'locations', 'visited_locations', 'locations_seeded', 'quests', 'birth_date',
+    'life_expectancy', 'next_habit_id'
+)
+RECORD_SECTIONS = ('habits', 'locations')
+QUEST_LISTS = ('active_quests', 'completed_quests')
+# staged-save key for a full state snapshot that replaces everything before it
+COMPACT = ('compact',)
+
+
+def _snapshot(value):
+    """A deep copy of a record value that a background save can serialize safely"""
+    if isinstance(value, CompletionHistory):
+        return value.snapshot()
+    if hasattr(value, 'to_json'):
+        value = value.to_json()
+    if isinstance(value, dict):
+        return {key: _snapshot(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_snapshot(item) for item in value]
+    return value
+
+
+def _stage_record(staged, record):
+    """Add a record to a staged save, replacing what it supersedes"""
+    if record['op'] == 'set':
+        field = record['field']
+        if field in RECORD_SECTIONS:
+            # the whole section is rewritten, so earlier puts and deletes in it are moot
+            for key in [key for key in staged if key[0] == field]:
+                del staged[key]
+        # after every staged record it was built after
+        staged.pop(('set', field), None)
+        staged[('set', field)] = record
+    else:
+        record_id = str(record['id'] if record['op'] == 'del' else record['record'].get('id'))
+        staged[(record['section'], record_id)] = record
+
+class Attribute(Enum):
+    STRENGTH = "strength"
+    INTELLIGENCE = "intelligence"
+    CHARISMA = "charisma"
+    ENDURANCE = "endurance"
+    CREATIVITY = "creativity"
+
+class Player:
+    store = PlayerJournal()
+
+    def __init__(self):
+        object.__setattr__(self, '_dirty_lock', threading.Lock())
+        object.__setattr__(self, '_dirty_fields', set())
+        object.__setattr__(self, '_dirty_records', {})
+        object.__setattr__(self, '_staged', {})
+        self.name = "Adventurer"
+        self.level = 1
+        self.xp = 0
+        self.gold = 100
+        self.attributes = {
+            "strength": 5,
+            "intelligence": 8,
+            "charisma": 6,
+            "endurance": 5,
+            "creativity": 5
+        }
+        self.active_quests = []
+        self.completed_quests = []
+        self.last_login = datetime.now()
+        self.daily_streak = 0
+        self.habits = []
+        self.locations = []
+        # False until the locations section has been read from the store
+        self.locations_loaded = False
+        self.visited_locations = set()
+        self.locations_seeded = False
+        self.birth_date = None
+        self.life_expectancy = 80
+        self.saver = None
+        self.save_stats = SaveStats()
+        # set when the saved profile couldn't be read; nothing is written
+        # over it until ``allow_saves`` is called
+        self.load_error = None
+        self.backup_path = None
+        self.saves_blocked = False
+
+    def __setattr__(self, name, value):
+        if name == 'habits':
+            # replacing the list doesn't make the old ids free again
+            next_id = self.habits.next_id if 'habits' in self.__dict__ else 1
+            if isinstance(value, HabitRegistry):
+                value.reserve(next_id)
+            else:
+                value = HabitRegistry(value, next_id=next_id)
+            value.on_change = partial(self._section_changed, name)
+            value.counter_moved = False
+            self.mark_dirty(name)
+            self.mark_dirty('next_habit_id')
+        elif name in RECORD_SECTIONS:
+            value = TrackedList(value, on_change=partial(self._section_changed, name))
+            self.mark_dirty(name)
+        elif name in QUEST_LISTS:
+            value = TrackedList(value, on_change=lambda *change: self.mark_dirty('quests'))
+            self.mark_dirty('quests')
+        elif name in FIELDS:
+            if isinstance(value, dict):
+                value = TrackedDict(value, on_change=partial(self.mark_dirty, name))
+            elif isinstance(value, list):
+                value = TrackedList(value, on_change=lambda *change, name=name: self.mark_dirty(name))
+            elif isinstance(value, (set, frozenset)):
+                value = TrackedSet(value, on_change=partial(self.mark_dirty, name))
+            self.mark_dirty(name)
+        super().__setattr__(name, value)
+
+    def mark_dirty(self, field, record_id=None):
+        """Flag a field, or a single record of a habits/locations section, for the next save"""
+        with self._dirty_lock:
+            if record_id is None:
+                self._dirty_fields.add(field)
+            else:
+                self._dirty_records.setdefault(field, set()).add(str(record_id))
+
+    def _section_changed(self, section, added, removed, reset):
+        if section == 'habits' and self.habits.counter_moved:
+            self.habits.counter_moved = False
+            self.mark_dirty('next_habit_id')
+        if reset:
+            self.mark_dirty(section)
+            return
+        for item in (*removed, *added):
+            self.mark_dirty(section, item.get('id'))
+
+    def _field_value(self, field):
+        if field == 'last_login':
+            return self.last_login.isoformat()
+        if field == 'birth_date':
+            return self.birth_date.isoformat() if self.birth_date else None
+        if field == 'next_habit_id':
+            # saved so ids of deleted habits aren't handed out again after a restart
+            return self.habits.next_id
+        if field == 'quests':
+            return [
+                dict(q.to_dict(), state='active') for q in self.active_quests
+            ] + [
+                dict(q.to_dict(), state='completed') for q in self.completed_quests
+            ]
+        return getattr(self, field)
+
+    def to_dict(self):
+        return {field: self._field_value(field) for field in FIELDS}
+
+    def save(self):
+        """Write only the dirty fields and records to the store"""
+        self.stage()
+        self.write_staged()
+
+    def stage(self):
+        """Copy the dirty fields and records into the staged save.
+
+        Runs on the thread that made the changes, so the write-behind worker
+        only ever serializes these copies and never the live habits and
+        locations the UI is still editing.
+        """
+        with self._dirty_lock:
+            fields, dirty = self._dirty_fields, self._dirty_records
+            object.__setattr__(self, '_dirty_fields', set())
+            object.__setattr__(self, '_dirty_records', {})
+            pending = len(self._staged) + len(fields) + sum(map(len, dirty.values()))
+        if self.store.needs_compaction(pending):
+            # a compaction rewrites every section, so it needs them all in memory
+            self.load_locations()
+            state = _snapshot(self.to_dict())
+            with self._dirty_lock:
+                object.__setattr__(self, '_staged', {COMPACT: state})
+            return
+        records = [_snapshot(record) for record in self._dirty_changes(fields, dirty)]
+        with self._dirty_lock:
+            for record in records:
+                _stage_record(self._staged, record)
+
+    def write_staged(self):
+        """Write the staged save to the store; on failure it stays staged for the next try"""
+        if self.saves_blocked:
+            return
+        with self._dirty_lock:
+            staged = self._staged
+            object.__setattr__(self, '_staged', {})
+        state = staged.pop(COMPACT, None)
+        records = list(staged.values())
+        try:
+            written = self.store.compact(state) if state is not None else 0
+            written += self.store.append(records)
+        except Exception:
+            with self._dirty_lock:
+                newer = self._staged
+                if COMPACT not in newer:
+                    if state is not None:
+                        staged = {COMPACT: state, **staged}
+                    for record in newer.values():
+                        _stage_record(staged, record)
+                    object.__setattr__(self, '_staged', staged)
+            raise
+        self.save_stats.record(len(records), written)
+
+    def allow_saves(self):
+        """Let a profile that replaced an unreadable one be saved, writing all of it"""
+        self.saves_blocked = False
+        for field in FIELDS:
+            self.mark_dirty(field)
+        self.request_save()
+
+    def request_save(self):
+        """Stage the changes and hand the write to the write-behind saver, or save now without one"""
+        if self.saver:
+            self.stage()
+            self.saver.request()
+        else:
+            self.save()
+
+    def close(self):
+        """Write whatever is still unsaved and stop the saver"""
+        self.stage()
+        if self.saver:
+            self.saver.close()
+        else:
+            self.write_staged()
+
+    def load_locations(self):
+        """The locations section, read from the store the first time it's asked for.
+
+        Stores with a ``load_locations()`` method leave locations out of
+        ``load()`` so startup doesn't pay for the map until it is opened.
+        """
+        if not self.locations_loaded:
+            loader = getattr(self.store, 'load_locations', None)
+            if loader:
+                self.locations = loader()
+                with self._dirty_lock:
+                    self._dirty_fields.discard('locations')
+            self.locations_loaded = True
+        return self.locations
+
+    def _dirty_changes(self, fields, dirty):
+        records = [
+            {'op': 'set', 'field': field, 'value': self._field_value(field)}
+            for field in FIELDS if field in fields
+        ]
+        for section, ids in dirty.items():
+            if section in fields:
+                # the whole section is already being written
+                continue
+            items = getattr(self, section)
+            if isinstance(items, HabitRegistry):
+                present = items.in_order(ids)
+            else:
+                present = list({
+                    str(item.get('id')): item for item in items if str(item.get('id')) in ids
+                }.values())
+            # list order, so stores that track position append new records at the end
+            records.extend(
+                {'op': 'put', 'section': section, 'record': item}
+                for item in present
+            )
+            present_ids = {str(item.get('id')) for item in present}
+            records.extend(
+                {'op': 'del', 'section': section, 'id': record_id}
+                for record_id in ids if record_id not in present_ids
+            )
+        return records
+
+    @classmethod
+    def load(cls):
+        player = cls()
+        try:
+            data = player.store.load()
+        except FileNotFoundError:
+            return player
+        except ValueError as e:
+            # start fresh, but keep the unreadable profile: copy it aside and
+            # write nothing until the user has been told and agrees
+            player.load_error = str(e)
+            player.saves_blocked = True
+            player.locations_loaded = True
+            quarantine = getattr(player.store, 'quarantine', None)
+            if quarantine:
+                try:
+                    player.backup_path = quarantine()
+                except OSError as copy_error:
+                    print(f"Error: could not copy the unreadable profile: {copy_error}")
+            with player._dirty_lock:
+                player._dirty_fields.clear()
+                player._dirty_records.clear()
+            return player
+        player.name = data.get('name', 'Adventurer')
+        player.level = data.get('level', 1)
+        player.xp = data.get('xp', 0)
+        player.gold = data.get('gold', 100)
+        player.attributes = data.get('attributes', {
+            "strength": 5,
+            "intelligence": 8,
+            "charisma": 6,
+            "endurance": 5,
+            "creativity": 5
+        })
+        player.last_login = datetime.fromisoformat(data.get('last_login', datetime.now().isoformat()))
+        player.daily_streak = data.get('daily_streak', 0)
+        player.habits = HabitRegistry(data.get('habits', []), next_id=data.get('next_habit_id', 1))
+        if 'locations' in data:
+            player.locations = data['locations']
+            player.locations_loaded = True
+        # older profiles mixed {"name", "x_pct", "y_pct"} dicts in with the ids
+        visited = data.get('visited_locations', [])
+        player.visited_locations = {v for v in visited if isinstance(v, str)}
+        # profiles from before the flag had the samples added whenever the map
+        # was empty, so one without locations still gets them; stores that
+        # load locations lazily leave that to the map, which only seeds an
+        # empty one
+        player.locations_seeded = data.get('locations_seeded', bool(data.get('locations')))
+        player.birth_date = date.fromisoformat(data['birth_date']) if data.get('birth_date') else None
+        player.life_expectancy = data.get('life_expectancy', 80)
+        quests = data.get('quests', [])
+        player.active_quests = [Quest.from_dict(q) for q in quests if q.get('state') == 'active']
+        player.completed_quests = [Quest.from_dict(q) for q in quests if q.get('state') == 'completed']
+        with player._dirty_lock:
+            player._dirty_fields.clear()
+            player._dirty_records.clear()
+        if len(player.visited_locations) != len(visited):
+            player.mark_dirty('visited_locations')
+        if player.habits.reassigned:
+            # rewrite habits that shared an id so they get their new ones
+            player.mark_dirty('habits')
+        return player
+
+    def add_xp(self, amount):
+        self.xp += amount
+        if self.xp >= self.xp_to_next_level():
+            self.level_up()
+
+    def xp_to_next_level(self):
+        return self.level * 100
+
+    def level_up(self):
+        self.level += 1
+        self.xp = 0
+        self.gold += self.level * 50
+
+    def complete_quest(self, quest):
+        self.add_xp(quest.xp_reward)
+        self.gold += quest.gold_reward
+        self.completed_quests.append(quest)
@@ -1,6 +1,5 @@
 from enum import Enum
 import random
-from models.player import Attribute
 
 class QuestType(Enum):
     DAILY = "Daily"
@@ -30,6 +29,30 @@ class Quest:
         self.rarity = rarity
         self.completed = False
     
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'description': self.description,
+            'quest_type': self.quest_type.value,
+            'rarity': self.rarity.value,
+            'xp_reward': self.xp_reward,
+            'gold_reward': self.gold_reward,
+            'completed': self.completed
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a saved quest without re-applying the rarity modifiers"""
+        quest = cls.__new__(cls)
+        quest.name = data['name']
+        quest.description = data.get('description', '')
+        quest.quest_type = QuestType(data.get('quest_type', QuestType.DAILY.value))
+        quest.rarity = QuestRarity(data.get('rarity', QuestRarity.COMMON.value))
+        quest.xp_reward = data.get('xp_reward', 0)
+        quest.gold_reward = data.get('gold_reward', 0)
+        quest.completed = data.get('completed', False)
+        return quest
+
     def _generate_quest_name(self, base_name):
         adjective = random.choice(list(self.DESCRIPTORS.values()))[0]
         return f"{adjective} {base_name}"
@@ -0,0 +1,203 @@
+class TrackedDict(dict):
+    """A dict that calls ``on_change`` whenever it is mutated"""
+
+    def __init__(self, data=(), on_change=None):
+        super().__init__(data)
+        self.on_change = on_change
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            super().__setitem__(key, default)
+            self._changed()
+        return self[key]
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+
+class TrackedList(list):
+    """A list that reports mutations to ``on_change(added, removed, reset)``.
+
+    ``added`` and ``removed`` list the items appended or taken out; ``reset``
+    is True when the change can't be described item by item (inserts,
+    slicing, sorting).
+    """
+
+    def __init__(self, items=(), on_change=None, wrap=None):
+        self.wrap = wrap
+        super().__init__(self._wrap(item) for item in items)
+        self.on_change = on_change
+
+    def _wrap(self, item):
+        return self.wrap(item) if self.wrap else item
+
+    def _changed(self, added=(), removed=(), reset=False):
+        if self.on_change:
+            self.on_change(added, removed, reset)
+
+    def append(self, item):
+        item = self._wrap(item)
+        super().append(item)
+        self._changed(added=(item,))
+
+    def extend(self, items):
+        items = [self._wrap(item) for item in items]
+        super().extend(items)
+        self._changed(added=items)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def remove(self, item):
+        super().remove(item)
+        self._changed(removed=(item,))
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._changed(removed=(item,))
+        return item
+
+    def clear(self):
+        removed = list(self)
+        super().clear()
+        self._changed(removed=removed)
+
+    def insert(self, index, item):
+        super().insert(index, self._wrap(item))
+        self._changed(reset=True)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            super().__setitem__(index, [self._wrap(item) for item in value])
+            self._changed(reset=True)
+            return
+        old = self[index]
+        value = self._wrap(value)
+        super().__setitem__(index, value)
+        self._changed(added=(value,), removed=(old,))
+
+    def __delitem__(self, index):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        self._changed(removed=removed)
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed(reset=True)
+
+    def reverse(self):
+        super().reverse()
+        self._changed(reset=True)
+
+
+class TrackedSet(set):
+    """A set that calls ``on_change`` when an element is actually added or removed.
+
+    Saved as a sorted list (see ``json_default``).
+    """
+
+    def __init__(self, items=(), on_change=None):
+        super().__init__(items)
+        self.on_change = on_change
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
+
+    def add(self, item):
+        if item not in self:
+            super().add(item)
+            self._changed()
+
+    def discard(self, item):
+        if item in self:
+            super().discard(item)
+            self._changed()
+
+    def remove(self, item):
+        super().remove(item)
+        self._changed()
+
+    def pop(self):
+        item = super().pop()
+        self._changed()
+        return item
+
+    def update(self, *others):
+        size = len(self)
+        super().update(*others)
+        if len(self) != size:
+            self._changed()
+
+    def difference_update(self, *others):
+        size = len(self)
+        super().difference_update(*others)
+        if len(self) != size:
+            self._changed()
+
+    def clear(self):
+        if self:
+            super().clear()
+            self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __isub__(self, other):
+        self.difference_update(other)
+        return self
+
+    def to_json(self):
+        return sorted(self, key=str)
+
+
+class SaveStats:
+    """Counters for what each save actually wrote"""
+
+    def __init__(self):
+        self.saves = 0
+        self.last_records = 0
+        self.last_bytes = 0
+        self.total_records = 0
+        self.total_bytes = 0
+
+    def record(self, records, written):
+        self.saves += 1
+        self.last_records = records
+        self.last_bytes = written
+        self.total_records += records
+        self.total_bytes += written
+
+    def __repr__(self):
+        return (f"SaveStats(saves={self.saves}, last_records={self.last_records}, "
+                f"last_bytes={self.last_bytes}, total_records={self.total_records}, "
+                f"total_bytes={self.total_bytes})")
@@ -1,6 +1,9 @@
 import flet as ft
 from datetime import datetime, timedelta
 from enum import Enum, auto
+from services.habit_schedule import PERIOD_UNITS, scheduler
+from services.habit_service import HabitService
+from services.habit_transfer import export_file, import_file
 
 class HabitType(Enum):
     PHYSICAL = auto()
@@ -34,14 +37,97 @@ class HabitType(Enum):
         }
         return colors.get(habit_type, ft.Colors.AMBER)
 
+class HabitRow(ft.Card):
+    """One habit's card, kept across refreshes and patched in place.
+
+    The row is isolated, so updating the list only adds or removes rows and
+    never walks into them. ``patch`` sets just the values that changed and
+    returns those controls for the screen to send.
+    """
+
+    def __init__(self, screen, habit, status):
+        self.habit_id = str(habit['id'])
+        self.icon = ft.Icon(size=40)
+        self.name_text = ft.Text(size=18, weight=ft.FontWeight.BOLD)
+        self.streak_text = ft.Text(size=14)
+        self.frequency_text = ft.Text(size=12)
+        self.checkbox = ft.Checkbox(on_change=lambda e: screen.habit_service.toggle(self.habit_id))
+        self.selected = False
+        self.body = ft.Container(
+            content=ft.ListTile(
+                leading=self.icon,
+                title=self.name_text,
+                subtitle=ft.Column([self.streak_text, self.frequency_text], spacing=2),
+                trailing=ft.Row([
+                    self.checkbox,
+                    ft.IconButton(
+                        icon=ft.Icons.EDIT,
+                        on_click=lambda e: screen.show_edit_dialog(screen.habit_service.get(self.habit_id)),
+                        tooltip="Edit habit",
+                        icon_color=ft.Colors.BLUE_300
+                    ),
+                    ft.IconButton(
+                        icon=ft.Icons.DELETE,
+                        on_click=lambda e: screen.show_delete_confirmation(screen.habit_service.get(self.habit_id)),
+                        tooltip="Delete habit",
+                        icon_color=ft.Colors.RED_300
+                    ),
+                ], spacing=5, width=150),
+            ),
+            padding=10,
+            border_radius=10,
+            bgcolor=ft.Colors.with_opacity(0.05, ft.Colors.WHITE),
+            # tapping the card selects it for checking off several at once
+            on_click=lambda e: screen.toggle_selected(self.habit_id)
+        )
+        super().__init__(content=self.body, elevation=2, margin=5)
+        self.patch(habit, status)
+
+    def is_isolated(self):
+        return True
+
+    def set_selected(self, selected):
+        """Highlight the row while it is selected; returns the controls that changed"""
+        if selected == self.selected:
+            return []
+        self.selected = selected
+        self.body.bgcolor = ft.Colors.with_opacity(0.15 if selected else 0.05, ft.Colors.WHITE)
+        self.body.border = ft.border.all(1, ft.Colors.AMBER_300) if selected else None
+        return [self.body]
+
+    def patch(self, habit, status):
+        """Bring the row up to date with ``habit``; returns the controls that changed"""
+        habit_type = HabitType[habit['type']]
+        color = HabitType.get_color(habit_type)
+        values = [
+            (self.icon, 'name', HabitType.get_icon(habit_type)),
+            (self.icon, 'color', color),
+            (self.name_text, 'value', habit['name']),
+            (self.streak_text, 'value', f"Streak: {status.streak} {PERIOD_UNITS.get(habit['frequency'], 'days')}"),
+            (self.frequency_text, 'value', f"Frequency: {habit['frequency']}"),
+            (self.checkbox, 'value', status.done),
+            (self.checkbox, 'fill_color', color),
+        ]
+        changed = []
+        for control, attr, value in values:
+            if getattr(control, attr) != value:
+                setattr(control, attr, value)
+                if control not in changed:
+                    changed.append(control)
+        return changed
+
 class HabitsScreen(ft.Container):
-    def __init__(self, player, page):
+    def __init__(self, player, page, habit_service=None):
         super().__init__()
         self.player = player
         self.page = page
         
         if not hasattr(self.player, 'habits'):
             self.player.habits = []
+        self.habit_service = habit_service or HabitService(player)
+        self.habit_service.subscribe(self._on_habits_changed)
+        self.rows = {}
+        self.selected = set()
         
         self.expand = True
         self.padding = 20
@@ -94,15 +180,44 @@ class HabitsScreen(ft.Container):
             )
         )
         
+        self.check_off_button = ft.ElevatedButton(
+            text="Check off selected",
+            icon=ft.Icons.DONE_ALL,
+            on_click=self.check_off_selected,
+            visible=False
+        )
+        
         self.habits_list = ft.ListView(
             spacing=10,
             divider_thickness=1,
             expand=True
         )
         
+        self.file_picker = ft.FilePicker(on_result=self._on_file_picked)
+        self.transfer_action = None
+        self.transfer_status = ft.Text("", size=12, color=ft.Colors.GREY_400)
+        if self.page:
+            self.page.overlay.append(self.file_picker)
+        
         self.content = ft.Column(
             controls=[
-                ft.Text("Habits Tracker", size=24, weight="bold"),
+                ft.Row([
+                    ft.Text("Habits Tracker", size=24, weight="bold"),
+                    ft.Row([
+                        self.check_off_button,
+                        self.transfer_status,
+                        ft.IconButton(
+                            icon=ft.Icons.UPLOAD_FILE,
+                            on_click=self._pick_import,
+                            tooltip="Import habits (CSV or JSONL)"
+                        ),
+                        ft.IconButton(
+                            icon=ft.Icons.DOWNLOAD,
+                            on_click=self._pick_export,
+                            tooltip="Export habits (CSV or JSONL)"
+                        ),
+                    ], spacing=5),
+                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                 ft.Row([
                     self.habit_name_input,
                     self.habit_type_dropdown,
@@ -119,85 +234,72 @@ class HabitsScreen(ft.Container):
 
     def load_habits(self):
         """Load habits from player data"""
-        self.habits_list.controls.clear()
-        
-        for habit in self.player.habits:
-            habit_item = self.create_habit_item(habit)
-            self.habits_list.controls.append(habit_item)
-        
+        statuses = scheduler.statuses(self.player.habits, datetime.now().date())
+        self.rows = {
+            str(habit['id']): HabitRow(self, habit, status)
+            for habit, status in zip(self.player.habits, statuses)
+        }
+        self.habits_list.controls = list(self.rows.values())
         self.update()
 
-    def create_habit_item(self, habit):
-        """Create a habit list item with interactive controls"""
-        def toggle_completed(e):
-            today = datetime.now().date()
-            last_completed = datetime.strptime(habit['last_completed'], "%Y-%m-%d").date() if habit['last_completed'] else None
-            
-            if not last_completed or today > last_completed:
-                habit['completed_today'] = not habit['completed_today']
-                if habit['completed_today']:
-                    habit['streak'] += 1
-                    habit['last_completed'] = today.strftime("%Y-%m-%d")
-                    self.player.add_xp(10)
-                else:
-                    habit['streak'] = max(0, habit['streak'] - 1)
-                
-                self.player.save()
-                self.update()
-                self.page.update()
-        
-        def edit_habit(e):
-            self.show_edit_dialog(habit)
-        
-        def delete_habit(e):
-            self.show_delete_confirmation(habit)
-        
-        habit_type = HabitType[habit['type']]
-        
-        return ft.Card(
-            content=ft.Container(
-                content=ft.ListTile(
-                    leading=ft.Icon(
-                        HabitType.get_icon(habit_type),
-                        color=HabitType.get_color(habit_type),
-                        size=40
-                    ),
-                    title=ft.Text(
-                        habit['name'],
-                        size=18,
-                        weight=ft.FontWeight.BOLD
-                    ),
-                    subtitle=ft.Column([
-                        ft.Text(f"Streak: {habit['streak']} days", size=14),
-                        ft.Text(f"Frequency: {habit['frequency']}", size=12),
-                    ], spacing=2),
-                    trailing=ft.Row([
-                        ft.Checkbox(
-                            value=habit.get('completed_today', False),
-                            on_change=toggle_completed,
-                            fill_color=HabitType.get_color(habit_type)
-                        ),
-                        ft.IconButton(
-                            icon=ft.Icons.EDIT,
-                            on_click=edit_habit,
-                            tooltip="Edit habit",
-                            icon_color=ft.Colors.BLUE_300
-                        ),
-                        ft.IconButton(
-                            icon=ft.Icons.DELETE,
-                            on_click=lambda e, h=habit: self.show_delete_confirmation(h),
-                            tooltip="Delete habit",
-                            icon_color=ft.Colors.RED_300
-                        ),
-                    ], spacing=5, width=150),
-                ),
-                padding=10,
-                border_radius=10,
-                bgcolor=ft.Colors.with_opacity(0.05, ft.Colors.WHITE)
-            ),
-            elevation=2,
-            margin=5
-        )
+    def reconcile(self, changed_ids):
+        """Patch the rows for ``changed_ids`` in place, adding and dropping rows as needed.
+
+        Returns the controls that were sent: the changed rows' texts and
+        checkboxes, plus the list itself only when rows were added or
+        removed.
+        """
+        registry = self.player.habits
+        changed = registry.in_order(changed_ids)
+        statuses = scheduler.statuses(changed, datetime.now().date())
+
+        dirty = []
+        added = False
+        for habit, status in zip(changed, statuses):
+            row = self.rows.get(habit['id'])
+            if row is None:
+                self.rows[habit['id']] = HabitRow(self, habit, status)
+                added = True
+            else:
+                dirty.extend(row.patch(habit, status))
+
+        if added or len(self.rows) != len(registry):
+            self.rows = {habit_id: self.rows[habit_id] for habit_id in registry.ids() if habit_id in self.rows}
+            self.habits_list.controls = list(self.rows.values())
+            dirty.append(self.habits_list)
+            if not self.selected <= self.rows.keys():
+                self.selected &= self.rows.keys()
+                dirty.extend(self._selection_changed())
+
+        if dirty and self.habits_list.page:
+            self.habits_list.page.update(*dirty)
+        return dirty
+
+    def toggle_selected(self, habit_id):
+        """Add a habit to, or drop it from, the ones the next check-off completes"""
+        row = self.rows.get(habit_id)
+        if row is None:
+            return
+        self.selected ^= {habit_id}
+        dirty = row.set_selected(habit_id in self.selected) + self._selection_changed()
+        if self.habits_list.page:
+            self.habits_list.page.update(*dirty)
+
+    def check_off_selected(self, e):
+        """Complete every selected habit with one save and one refresh"""
+        ids, self.selected = self.selected, set()
+        dirty = [control for habit_id in ids if habit_id in self.rows
+                 for control in self.rows[habit_id].set_selected(False)]
+        dirty.extend(self._selection_changed())
+        self.habit_service.complete_many(ids)
+        if self.habits_list.page:
+            self.habits_list.page.update(*dirty)
+
+    def _selection_changed(self):
+        count = len(self.selected)
+        self.check_off_button.visible = bool(count)
+        self.check_off_button.text = f"Check off {count} selected"
+        return [self.check_off_button]
 
     def add_habit(self, e):
         """Add a new habit"""
@@ -205,23 +307,9 @@ class HabitsScreen(ft.Container):
         if not name:
             return
         
-        new_habit = {
-            'id': str(len(self.player.habits) + 1),
-            'name': name,
-            'type': self.habit_type_dropdown.value,
-            'frequency': self.habit_frequency.value,
-            'streak': 0,
-            'xp': 10,
-            'completed_today': False,
-            'last_completed': None,
-            'created_at': datetime.now().strftime("%Y-%m-%d")
-        }
-        
-        self.player.habits.append(new_habit)
-        self.player.save()
         self.habit_name_input.value = ""
-        self.habits_list.controls.append(self.create_habit_item(new_habit))
-        self.update()
+        self.habit_service.add(name, self.habit_type_dropdown.value, self.habit_frequency.value)
+        self.habit_name_input.update()
 
     def show_edit_dialog(self, habit):
         """Show dialog to edit habit"""
@@ -250,12 +338,13 @@ class HabitsScreen(ft.Container):
         )
         
         def save_changes(e):
-            habit['name'] = name_field.value.strip()
-            habit['type'] = type_dropdown.value
-            habit['frequency'] = frequency_dropdown.value
-            self.player.save()
-            self.load_habits()
             dlg.open = False
+            self.habit_service.update(
+                habit['id'],
+                name=name_field.value.strip(),
+                type=type_dropdown.value,
+                frequency=frequency_dropdown.value
+            )
             self.page.update()
         
         dlg = ft.AlertDialog(
@@ -282,16 +371,8 @@ class HabitsScreen(ft.Container):
     def show_delete_confirmation(self, habit):
         """Show confirmation dialog before deleting habit"""
         def confirm_delete(e):
-            print(f"Deleting habit with ID: {habit['id']}")
-            print(f"Current habits before deletion: {[h['id'] for h in self.player.habits]}")
-            
-            self.player.habits = [h for h in self.player.habits if str(h['id']) != str(habit['id'])]
-            
-            print(f"Current habits after deletion: {[h['id'] for h in self.player.habits]}")
-            
-            self.player.save()
-            self.load_habits()
             dlg.open = False
+            self.habit_service.delete(habit['id'])
             self.page.update()
         
         dlg = ft.AlertDialog(
@@ -309,6 +390,45 @@ class HabitsScreen(ft.Container):
         dlg.open = True
         self.page.update()
 
+    def _pick_import(self, e):
+        self.transfer_action = 'import'
+        self.file_picker.pick_files(allowed_extensions=["csv", "jsonl"])
+
+    def _pick_export(self, e):
+        self.transfer_action = 'export'
+        self.file_picker.save_file(file_name="habits.jsonl", allowed_extensions=["csv", "jsonl"])
+
+    def _show_transfer_status(self, message):
+        self.transfer_status.value = message
+        if self.transfer_status.page:
+            self.transfer_status.update()
+
+    def _on_file_picked(self, e):
+        """Run the chosen import or export, reporting progress in the header"""
+        try:
+            if self.transfer_action == 'import' and e.files:
+                result = import_file(
+                    self.habit_service, e.files[0].path,
+                    progress=lambda rows: self._show_transfer_status(f"Importing... {rows:,} rows")
+                )
+                self._show_transfer_status(
+                    f"Imported {result.habits_added} habits, {result.completions_added:,} completions"
+                    + (f" ({result.skipped} rows skipped)" if result.skipped else "")
+                )
+            elif self.transfer_action == 'export' and e.path:
+                lines = export_file(
+                    self.player.habits, e.path,
+                    progress=lambda rows: self._show_transfer_status(f"Exporting... {rows:,} rows")
+                )
+                self._show_transfer_status(f"Exported {lines:,} rows")
+        except (OSError, ValueError) as ex:
+            print(f"Error: habit {self.transfer_action} failed: {ex}")
+            self._show_transfer_status(f"{self.transfer_action.capitalize()} failed")
+        self.transfer_action = None
+
+    def _on_habits_changed(self, changed_ids):
+        self.reconcile(changed_ids)
+
     def update(self):
         if self.page:
             self.page.update()
\ No newline at end of file
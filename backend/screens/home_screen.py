@@ -4,11 +4,16 @@ from components.xp_bar import XPBar
 from components.attribute_chart import AttributeChart
 from components.daily_login import DailyLoginBonus
 from models.quest import Quest
+from services.habit_schedule import PERIOD_UNITS, scheduler
+from services.habit_service import HabitService
+from screens.habits_screen import HabitType
 
 class HomeScreen(ft.Container):
-    def __init__(self, player):
+    def __init__(self, player, habit_service=None):
         super().__init__()
         self.player = player
+        self.habit_service = habit_service or HabitService(player)
+        self.habit_service.subscribe(self._on_habits_changed)
         self.claimed_today = self._check_claimed_today()
         self.padding = 20
         self.margin = 10
@@ -34,13 +39,14 @@ class HomeScreen(ft.Container):
             self.player.xp += 20
             self.player.last_login = datetime.now()
             self.player.daily_streak += 1
-            self.player.save()
+            self.player.request_save()
             self.claimed_today = True
             self.content = self.build()
             self.update()
 
     
     def build(self):
+        self.statuses = scheduler.statuses(self.player.habits, datetime.now().date())
         habits_section = ft.Column([
             ft.Text("Today's Habits", size=18, weight="bold"),
             ft.ListView(
@@ -106,13 +112,9 @@ class HomeScreen(ft.Container):
         if not hasattr(self.player, 'habits'):
             return []
             
-        today = datetime.now().date()
         habit_tiles = []
         
-        for habit in self.player.habits:
-            last_completed = datetime.strptime(habit['last_completed'], "%Y-%m-%d").date() if habit['last_completed'] else None
-            completed_today = last_completed == today if last_completed else False
-            
+        for habit, status in zip(self.player.habits, self.statuses):
             habit_tiles.append(
                 ft.ListTile(
                     leading=ft.Icon(
@@ -120,9 +122,9 @@ class HomeScreen(ft.Container):
                         color=HabitType.get_color(HabitType[habit['type']])
                     ),
                     title=ft.Text(habit['name']),
-                    subtitle=ft.Text(f"Streak: {habit['streak']} days"),
+                    subtitle=ft.Text(f"Streak: {status.streak} {PERIOD_UNITS.get(habit.get('frequency'), 'days')}"),
                     trailing=ft.Checkbox(
-                        value=completed_today,
+                        value=status.done,
                         on_change=lambda e, h=habit: self._toggle_habit_completion(h)
                     )
                 )
@@ -134,22 +136,14 @@ class HomeScreen(ft.Container):
         """Get the longest current habit streak"""
         if not hasattr(self.player, 'habits') or not self.player.habits:
             return 0
-        return max(habit['streak'] for habit in self.player.habits)
+        return max(status.streak for status in self.statuses)
     
     def _toggle_habit_completion(self, habit):
         """Toggle habit completion status"""
-        today = datetime.now().date()
-        last_completed = datetime.strptime(habit['last_completed'], "%Y-%m-%d").date() if habit['last_completed'] else None
-        
-        if not last_completed or today > last_completed:
-            habit['completed_today'] = not habit.get('completed_today', False)
-            if habit['completed_today']:
-                habit['streak'] += 1
-                habit['last_completed'] = today.strftime("%Y-%m-%d")
-                self.player.add_xp(habit['xp'])
-            else:
-                habit['streak'] = max(0, habit['streak'] - 1)
-            
-            self.player.save()
-            self.content = self.build()
+        self.habit_service.toggle(habit['id'])
+
+    def _on_habits_changed(self, changed_ids):
+        self.claimed_today = self._check_claimed_today()
+        self.content = self.build()
+        if self.page:
             self.update()
\ No newline at end of file
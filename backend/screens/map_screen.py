@@ -1,9 +1,21 @@
 import flet as ft
+import threading
+import math
 import uuid
 import time
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Tuple
 from enum import Enum, auto
+from components.pin_layer import PinLayer
+from components.tile_layer import TileLayer
+from services.debounce import Debouncer
+from services.frame_scheduler import FrameScheduler
+from services.location_store import LocationStore
+from services.map_tiles import SourceMap, TileCache
+from services.location_search import LocationSearch
+from services.sorted_views import SortedViews
+from services.pin_clusters import PinClusters
+from services.spatial_index import SpatialIndex
 
 class VisitType(Enum):
     VACATION = auto()
@@ -57,32 +69,89 @@ class Location:
     created_at: float = 0.0  # timestamp for sorting
     updated_at: float = 0.0  # timestamp for sorting
 
+    def to_dict(self) -> dict:
+        """Compact form: fields at their defaults are left out and the
+        position is rounded to a millionth of the map"""
+        data = {'id': self.id, 'name': self.name, 'x': round(self.x, 6), 'y': round(self.y, 6)}
+        if self.description:
+            data['description'] = self.description
+        if self.visit_type is not VisitType.OTHER:
+            data['visit_type'] = self.visit_type.name
+        if self.visited:
+            data['visited'] = True
+        if self.created_at:
+            data['created_at'] = self.created_at
+        if self.updated_at != self.created_at:
+            data['updated_at'] = self.updated_at
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Location':
+        return cls(
+            id=data['id'],
+            name=data['name'],
+            description=data.get('description') or "",
+            x=data['x'],
+            y=data['y'],
+            visit_type=VisitType.from_string(data.get('visit_type') or ""),
+            visited=bool(data.get('visited', False)),
+            created_at=data.get('created_at') or 0.0,
+            updated_at=data.get('updated_at', data.get('created_at')) or 0.0,
+        )
+
 class MapScreen(ft.Container):
     MIN_SCALE = 0.5
     MAX_SCALE = 3.0
     DEFAULT_SCALE = 1.0
     DEFAULT_MAP_WIDTH = 1000
     DEFAULT_MAP_HEIGHT = 700
+    PIN_SIZE = 24
+    BADGE_SIZE = 32
+    FRAME_RATE = 30
+    SEARCH_DELAY = 0.25
+    PAGE_SIZE = 50
+    SORT_KEYS = {
+        "name": lambda loc: loc.name,
+        "visit_type": lambda loc: loc.visit_type.name,
+        "visited": lambda loc: not loc.visited,
+        "recently_added": lambda loc: -loc.created_at,
+    }
     
-    def __init__(self, player, page):
+    def __init__(self, player, page, fps: int = FRAME_RATE):
         super().__init__()
         self.player = player
         self.page = page
         self.locations: Dict[str, Location] = {}
+        self.store = LocationStore(player)
+        self.index = SpatialIndex()
+        self.visible_pins = set()
+        self.clusters = PinClusters(min_cell_px=self.BADGE_SIZE + 8)
+        self.badges: List[ft.Container] = []
+        self.search = LocationSearch()
+        self.search_debounce = Debouncer(self.update_locations_list, self.SEARCH_DELAY)
+        self.sorted_views = SortedViews(self.SORT_KEYS)
+        # tiles currently in the list, by location id
+        self.tiles: Dict[str, ft.ListTile] = {}
+        self.area_selection: Optional[set] = None
+        self.area_anchor: Optional[Tuple[float, float]] = None
         self.selected_location: Optional[Location] = None
         self.scale = self.DEFAULT_SCALE
         self.offset_x = 0.0
         self.offset_y = 0.0
         self.drag_start: Optional[Tuple[float, float]] = None
+        # zoom ratio and offset shift gathered from gesture events since the last frame
+        self.pending_view = (1.0, 0.0, 0.0)
+        self._view_lock = threading.Lock()
+        # held for every layout and for changes to the index, clusters and
+        # layers it reads; re-entered when a frame lays out the viewport
+        self._frame_lock = threading.RLock()
+        self.frames = FrameScheduler(self._render_frame, fps)
         self.map_width = self.DEFAULT_MAP_WIDTH
         self.map_height = self.DEFAULT_MAP_HEIGHT
         self.initialized = False
         self.pending_location_add = False
         self.last_click_x = 0.5
         self.last_click_y = 0.5
-
-        if not hasattr(self.player, 'visited_locations'):
-            self.player.visited_locations = []
         
         self.build_ui()
 
@@ -92,6 +161,8 @@ class MapScreen(ft.Container):
         self.page.on_resize = self.handle_page_resize
 
     def will_unmount(self):
+        self.frames.cancel()
+        self.search_debounce.cancel()
         self.page.on_resize = None
 
     def handle_page_resize(self, e):
@@ -106,25 +177,31 @@ class MapScreen(ft.Container):
 
     def create_map_components(self):
         """Create all map-related UI components"""
-        self.map_image = ft.Image(
-            src="https://images.photowall.com/products/84032/world-map-lotr-style-blue.jpg?h=699&q=85",
-            fit=ft.ImageFit.CONTAIN,
-            repeat=ft.ImageRepeat.NO_REPEAT,
-        )
+        # tiles are cut from the bundled source map and cached on disk, so the map works offline
+        self.tile_layer = TileLayer(TileCache(SourceMap()))
+        self.tile_level: Optional[int] = None
         
         self.map_container = ft.GestureDetector(
-            content=self.map_image,
+            content=ft.Container(content=self.tile_layer, bgcolor="#1c345c", expand=True),
             on_scale_start=self.handle_scale_start,
             on_scale_update=self.handle_scale_update,
+            on_scale_end=self.handle_gesture_end,
             on_pan_start=self.handle_pan_start,
             on_pan_update=self.handle_pan_update,
+            on_pan_end=self.handle_gesture_end,
             on_tap=self.handle_map_tap,
             on_double_tap=self.handle_double_tap,
+            on_long_press_start=self.handle_long_press_start,
             on_long_press_end=self.handle_long_press,
         )
         
+        # pins get their own layer; the map and cluster badges stay out of it
+        self.pin_layer = PinLayer()
+        self.badge_layer = ft.Stack(controls=[], left=0, top=0, right=0, bottom=0)
+
         self.map_stack = ft.Stack(
-            controls=[self.map_container],
+            controls=[self.map_container, self.pin_layer, self.badge_layer],
+            fit=ft.StackFit.EXPAND,
             expand=True,
         )
         
@@ -199,11 +276,14 @@ class MapScreen(ft.Container):
             expand=True,
             spacing=10,
             divider_thickness=1,
+            on_scroll=self._on_list_scroll,
+            on_scroll_interval=100,
         )
+        self.list_footer = ft.Text("", italic=True, color=ft.Colors.GREY_500)
         
         self.search_field = ft.TextField(
             label="Search locations",
-            on_change=self.update_locations_list,
+            on_change=self.handle_search_change,
             prefix_icon=ft.Icons.SEARCH,
             expand=True,
         )
@@ -247,21 +327,33 @@ class MapScreen(ft.Container):
     def update_map_size(self):
         """Update the map dimensions based on current container size"""
         if self.page and self.initialized:
-            self.map_width = self.map_wrapper.width or self.DEFAULT_MAP_WIDTH
-            self.map_height = self.map_wrapper.height or self.DEFAULT_MAP_HEIGHT
-            self.update_pin_positions()
+            with self._frame_lock:
+                self.map_width = self.map_wrapper.width or self.DEFAULT_MAP_WIDTH
+                self.map_height = self.map_wrapper.height or self.DEFAULT_MAP_HEIGHT
+                self.update_pin_positions()
 
     def load_locations(self):
-        """Load sample locations or from persistent storage"""
+        """Load the saved locations the first time the map is shown, seeding samples on first run"""
         self.update_map_size()
-        
+        if self.store.loaded:
+            return
+
+        saved = self.store.load()
+        for data in saved:
+            self.add_location(Location.from_dict(data), persist=False, refresh=False)
+        if saved or self.player.locations_seeded:
+            self.pin_layer.flush()
+            self.update_pin_positions()
+            self.update_locations_list()
+            return
+
         sample_locations = [
             Location(
                 id=str(uuid.uuid4()),
                 name="Home City",
                 description="Where I was born and raised",
-                x=0.5,
-                y=0.5,
+                x=0.25,
+                y=0.27,
                 visit_type=VisitType.HOME,
                 visited=True,
                 created_at=0.0,
@@ -271,8 +363,8 @@ class MapScreen(ft.Container):
                 id=str(uuid.uuid4()),
                 name="Grand Canyon",
                 description="Amazing hiking vacation spot",
-                x=0.3,
-                y=0.4,
+                x=0.189,
+                y=0.299,
                 visit_type=VisitType.VACATION,
                 visited=True,
                 created_at=0.0,
@@ -281,100 +373,308 @@ class MapScreen(ft.Container):
         ]
         
         for loc in sample_locations:
-            self.add_location(loc)
+            self.add_location(loc, refresh=False)
+        self.player.locations_seeded = True
         
+        self.pin_layer.flush()
+        self.update_pin_positions()
         self.update_locations_list()
 
-    def add_location(self, location: Location):
-        """Add a location to the map and data store"""
-        self.locations[location.id] = location
-        self.add_pin_to_map(location)
+    def add_location(self, location: Location, persist: bool = True, refresh: bool = True):
+        """Add a location to the map and data store.
+
+        ``refresh=False`` skips the pin layout and list rebuild, for callers
+        adding many locations that refresh once at the end.
+        """
+        with self._frame_lock:
+            self.locations[location.id] = location
+            self.index.insert(location.id, location.x, location.y)
+            self.clusters.add(location.id, location.x, location.y)
+            self.add_pin_to_map(location, send=refresh)
+        self.search.add(location.id, location.name, location.description)
+        self.sorted_views.add(location)
         
-        if location.visited and location.id not in self.player.visited_locations:
-            self.player.visited_locations.append(location.id)
-        self.update_locations_list()
+        if location.visited:
+            self.player.visited_locations.add(location.id)
+        else:
+            self.player.visited_locations.discard(location.id)
+        if persist:
+            self.store.put(location.to_dict())
+        if refresh:
+            self.update_pin_positions()
+            self.update_locations_list()
 
-    def add_pin_to_map(self, location: Location):
+    def add_pin_to_map(self, location: Location, send: bool = True):
+        """Create the location's pin, or restyle the one it already has"""
         if not all([self.map_width, self.map_height]):
             return
 
-        existing_pin = next(
-            (c for c in self.map_stack.controls
-             if hasattr(c, 'data') and c.data == location.id),
-            None
-        )
+        existing_pin = self.pin_layer.get(location.id)
 
         if existing_pin:
             existing_pin.content.name = VisitType.get_icon(location.visit_type)
             existing_pin.content.color = VisitType.get_color(location.visit_type)
             existing_pin.tooltip = f"{location.name}\n{location.description[:50]}..."
+            if send and existing_pin.page:
+                existing_pin.update()
         else:
+            left, top = self._to_screen(location)
             pin = ft.Container(
                 content=ft.Icon(
                     name=VisitType.get_icon(location.visit_type),
                     color=VisitType.get_color(location.visit_type),
                     size=24,
                 ),
-                left=location.x * self.map_width * self.scale + self.offset_x,
-                top=location.y * self.map_height * self.scale + self.offset_y,
+                left=left,
+                top=top,
+                # shown by the next layout unless it falls in a cluster
+                visible=False,
                 on_click=lambda e, loc=location: self.select_location(loc),
                 tooltip=f"{location.name}\n{location.description[:50]}...",
                 data=location.id,
             )
-            self.map_stack.controls.append(pin)
+            self.pin_layer.add(location.id, pin, send=send)
 
-        if self.page:
-            self.map_stack.update()
+    def _to_screen(self, location) -> Tuple[float, float]:
+        """Top-left corner of the pin for a location or cluster, in map-stack pixels"""
+        return (
+            location.x * self.map_width * self.scale + self.offset_x,
+            location.y * self.map_height * self.scale + self.offset_y,
+        )
+
+    def _to_map(self, x: float, y: float) -> Tuple[float, float]:
+        """Inverse of _to_screen, unclamped"""
+        return (
+            (x - self.offset_x) / (self.map_width * self.scale),
+            (y - self.offset_y) / (self.map_height * self.scale),
+        )
+
+    def viewport_rect(self) -> Tuple[float, float, float, float]:
+        """Map rectangle (0-1 units) of the locations whose pins overlap the view"""
+        left, top = self._to_map(-self.PIN_SIZE, -self.PIN_SIZE)
+        right, bottom = self._to_map(self.map_width, self.map_height)
+        return left, top, right, bottom
+
+    def update_tiles(self):
+        """Place the tiles covering the viewport at the level that keeps them sharp.
+
+        Tiles not cached yet are rendered in the background, each finished
+        one asking for a new frame. Until the whole view is ready at a new
+        level, the level already on screen keeps being drawn, stretched.
+        """
+        cache = self.tile_layer.cache
+        left, top = self._to_map(0, 0)
+        right, bottom = self._to_map(self.map_width, self.map_height)
+        level = cache.level_for(max(self.map_width, self.map_height) * self.scale)
+        keys = cache.covering(level, left, top, right, bottom)
+        missing = [key for key in keys if not cache.cached(key)]
+        if missing and self.tile_level is not None and self.tile_level != level:
+            level = self.tile_level
+            keys = cache.covering(level, left, top, right, bottom)
+            missing += [key for key in keys if not cache.cached(key)]
+        cache.request(missing, self.frames.request)
+        self.tile_level = level
+
+        tile_width = self.map_width * self.scale / (1 << level)
+        tile_height = self.map_height * self.scale / (1 << level)
+        placed = []
+        missing = set(missing)
+        for key in keys:
+            if key in missing:
+                continue
+            _, x, y = key
+            # whole pixels, so neighbouring tiles meet without seams
+            x1, y1 = math.floor(x * tile_width + self.offset_x), math.floor(y * tile_height + self.offset_y)
+            x2 = math.ceil((x + 1) * tile_width + self.offset_x)
+            y2 = math.ceil((y + 1) * tile_height + self.offset_y)
+            placed.append((key, x1, y1, x2 - x1, y2 - y1))
+        return self.tile_layer.show(placed)
 
     def update_pin_positions(self):
-        """Update all pin positions based on current scale and offset"""
+        """Lay out the viewport: map tiles, a pin per lone location, a badge per cluster.
+
+        Clusters come from the level that suits the current zoom. Only tiles,
+        pins and badges inside the viewport, or that were shown last frame,
+        are touched, and only those are sent to the client. Runs under the
+        frame lock, so a re-layout on the UI thread never overlaps a frame.
+        """
+        with self._frame_lock:
+            self._layout_viewport()
+
+    def _layout_viewport(self):
         if not all([self.map_width, self.map_height]):
             return
-        
-        for control in self.map_stack.controls:
-            if hasattr(control, 'data') and control.data in self.locations:
-                loc = self.locations[control.data]
-                control.left = loc.x * self.map_width * self.scale + self.offset_x
-                control.top = loc.y * self.map_height * self.scale + self.offset_y
-        
-        if self.page:
-            self.map_stack.update()
+
+        changed, tiles_added = self.update_tiles()
+        left, top, right, bottom = self.viewport_rect()
+        level = self.clusters.level_for(self.map_width * self.scale, self.map_height * self.scale)
+        visible = set()
+        groups = []
+        for cluster in self.clusters.clusters(level, left, top, right, bottom):
+            if cluster.count > 1:
+                groups.append(cluster)
+            elif left <= cluster.x <= right and top <= cluster.y <= bottom:
+                visible.add(cluster.point_id)
+
+        for location_id in visible:
+            pin = self.pin_layer.get(location_id)
+            if pin is None:
+                continue
+            left, top = self._to_screen(self.locations[location_id])
+            # frames that don't move the view (a tile arriving, a resize to
+            # the same size) leave pins and badges as they are, unsent
+            if (pin.left, pin.top, pin.visible) != (left, top, True):
+                pin.left, pin.top, pin.visible = left, top, True
+                changed.append(pin)
+        for location_id in self.visible_pins - visible:
+            pin = self.pin_layer.get(location_id)
+            if pin is not None:
+                pin.visible = False
+                changed.append(pin)
+        self.visible_pins = visible
+
+        added = len(groups) > len(self.badges)
+        for i, cluster in enumerate(groups):
+            if i == len(self.badges):
+                self.badges.append(self._create_badge())
+                self.badge_layer.controls.append(self.badges[i])
+            badge = self.badges[i]
+            badge.data = cluster
+            x, y = self._to_screen(cluster)
+            left = x + (self.PIN_SIZE - self.BADGE_SIZE) / 2
+            top = y + (self.PIN_SIZE - self.BADGE_SIZE) / 2
+            tooltip = f"{cluster.count} locations"
+            if (badge.left, badge.top, badge.tooltip, badge.visible) != (left, top, tooltip, True):
+                badge.left, badge.top, badge.tooltip, badge.visible = left, top, tooltip, True
+                badge.content.value = str(cluster.count) if cluster.count < 1000 else f"{cluster.count // 1000}k"
+                changed.append(badge)
+        for badge in self.badges[len(groups):]:
+            if badge.visible:
+                badge.visible = False
+                changed.append(badge)
+
+        if not changed or not self.map_stack.page:
+            return
+        if tiles_added:
+            self.tile_layer.update()
+        if added:
+            self.badge_layer.update()
+        self.map_stack.page.update(*changed)
+
+    def _create_badge(self) -> ft.Container:
+        badge = ft.Container(
+            content=ft.Text("", size=12, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE),
+            width=self.BADGE_SIZE,
+            height=self.BADGE_SIZE,
+            border_radius=self.BADGE_SIZE / 2,
+            bgcolor=ft.Colors.BLUE_700,
+            border=ft.border.all(2, ft.Colors.WHITE),
+            alignment=ft.alignment.center,
+            visible=False,
+        )
+        badge.on_click = lambda e: self.handle_cluster_tap(badge.data)
+        return badge
+
+    def handle_cluster_tap(self, cluster):
+        """Zoom in on a cluster, or list its locations once fully zoomed in"""
+        if cluster is None:
+            return
+        if self.scale < self.MAX_SCALE:
+            self.frames.cancel()
+            with self._view_lock:
+                self.pending_view = (1.0, 0.0, 0.0)
+                self.scale = min(self.MAX_SCALE, self.scale * 2)
+                self.offset_x = self.map_width / 2 - cluster.x * self.map_width * self.scale
+                self.offset_y = self.map_height / 2 - cluster.y * self.map_height * self.scale
+            self.update_pin_positions()
+        else:
+            self.area_selection = self.clusters.members(cluster.level, cluster.key)
+            self.update_locations_list()
+
+    def location_at(self, x: float, y: float) -> Optional[Location]:
+        """The location whose pin is under map-stack pixel ``x, y``, if any.
+
+        Locations folded into a cluster badge have no pin to hit.
+        """
+        if not all([self.map_width, self.map_height]):
+            return None
+        half = self.PIN_SIZE / 2
+        map_x, map_y = self._to_map(x - half, y - half)
+        location_id = self.index.nearest(
+            map_x, map_y,
+            half / (self.map_width * self.scale),
+            half / (self.map_height * self.scale),
+        )
+        if location_id not in self.visible_pins:
+            return None
+        return self.locations.get(location_id)
+
+    def locations_in_rect(self, x1: float, y1: float, x2: float, y2: float) -> List[Location]:
+        """Locations whose pins lie in the screen rectangle spanned by two corners"""
+        left, top = self._to_map(min(x1, x2) - self.PIN_SIZE / 2, min(y1, y2) - self.PIN_SIZE / 2)
+        right, bottom = self._to_map(max(x1, x2) - self.PIN_SIZE / 2, max(y1, y2) - self.PIN_SIZE / 2)
+        return [self.locations[i] for i in self.index.query(left, top, right, bottom)]
 
     def select_location(self, location: Location):
         """Select a location and update the edit panel"""
+        previous = self.selected_location
         self.selected_location = location
         self.location_name.value = location.name
         self.location_desc.value = location.description
         self.visit_type.value = location.visit_type.name
         self.visited_check.value = location.visited
         self.edit_panel.visible = True
-        self.update_locations_list()
-        self.page.update()
+
+        # move the highlight by patching the two tiles involved
+        changed = [self.edit_panel]
+        for loc, color in ((previous, None), (location, ft.Colors.GREY_800)):
+            tile = self.tiles.get(loc.id) if loc else None
+            if tile:
+                tile.bgcolor = color
+                changed.append(tile)
+        self.page.update(*changed)
+
+    def handle_search_change(self, e=None):
+        """Refresh the list once typing pauses rather than on every keystroke"""
+        self.search_debounce.trigger()
 
     def update_locations_list(self, e=None):
-        """Update the locations list based on current filter and sort"""
+        """Show the first page of the current search or sort order.
+
+        A search shows ranked matches from the search index; otherwise the
+        list reads the sort dropdown's view from the sorted indexes. Later
+        pages are added as the list is scrolled.
+        """
         self.locations_list.controls.clear()
-    
-        search_term = self.search_field.value.lower() if self.search_field.value else ""
-        sort_key = self.sort_dropdown.value
-    
-        
-        filtered_locations = [
-            loc for loc in self.locations.values()
-            if (search_term in loc.name.lower() or 
-                search_term in loc.description.lower())
-        ]
-    
-        if sort_key == "name":
-            filtered_locations.sort(key=lambda x: x.name)
-        elif sort_key == "visit_type":
-            filtered_locations.sort(key=lambda x: x.visit_type.name)
-        elif sort_key == "visited":
-            filtered_locations.sort(key=lambda x: not x.visited)
-        elif sort_key == "recently_added":
-            filtered_locations.sort(key=lambda x: x.created_at, reverse=True)
-    
-        for loc in filtered_locations:
+        self.tiles.clear()
+        ids, total = self._list_ids(self.PAGE_SIZE)
+        self._append_tiles(ids, total)
+
+    def _list_ids(self, limit: int) -> Tuple[List[str], int]:
+        """The first ``limit`` ids of the current listing, and its full length"""
+        search_term = self.search_field.value or ""
+        if search_term.strip():
+            return self.search.search(search_term, limit, within=self.area_selection)
+        ids = self.sorted_views.ids(self.sort_dropdown.value or "name", limit, within=self.area_selection)
+        total = len(self.locations) if self.area_selection is None else len(self.area_selection)
+        return ids, total
+
+    def _on_list_scroll(self, e: ft.OnScrollEvent):
+        """Add the next page once the list nears the end of what is built"""
+        if e.pixels < e.max_scroll_extent - e.viewport_dimension:
+            return
+        shown = len(self.tiles)
+        ids, total = self._list_ids(shown + self.PAGE_SIZE)
+        if len(ids) > shown:
+            self._append_tiles(ids[shown:], total)
+
+    def _append_tiles(self, ids: List[str], total: int):
+        controls = self.locations_list.controls
+        if controls and controls[-1] is self.list_footer:
+            controls.pop()
+
+        for location_id in ids:
+            loc = self.locations[location_id]
             item = ft.ListTile(
                 leading=ft.Icon(
                     VisitType.get_icon(loc.visit_type),
@@ -383,12 +683,18 @@ class MapScreen(ft.Container):
                 title=ft.Text(loc.name),
                 subtitle=ft.Text(loc.description[:50] + "..." if len(loc.description) > 50 else loc.description),
                 on_click=lambda e, loc=loc: self.select_location(loc),
-                bgcolor=ft.Colors.GREY_800 if loc == self.selected_location else None,
+                bgcolor=ft.Colors.GREY_800 if loc is self.selected_location else None,
                 trailing=ft.Icon(ft.Icons.CHECK_CIRCLE if loc.visited else ft.Icons.RADIO_BUTTON_UNCHECKED),
             )
-            self.locations_list.controls.append(item)
+            self.tiles[location_id] = item
+            controls.append(item)
+
+        if total > len(self.tiles):
+            self.list_footer.value = f"Showing {len(self.tiles)} of {total} locations"
+            controls.append(self.list_footer)
     
-        self.locations_list.update()
+        if self.locations_list.page:
+            self.locations_list.update()
 
     def add_location_from_input(self, e=None):
         """Add a new location from the input fields"""
@@ -449,40 +755,44 @@ class MapScreen(ft.Container):
         if not self.selected_location:
             return
             
-        self.map_stack.controls = [
-            c for c in self.map_stack.controls 
-            if not hasattr(c, 'data') or c.data != self.selected_location.id
-        ]
+        with self._frame_lock:
+            self.pin_layer.remove(self.selected_location.id)
+            self.visible_pins.discard(self.selected_location.id)
+            self.index.remove(self.selected_location.id)
+            self.clusters.remove(self.selected_location.id)
+            self.locations.pop(self.selected_location.id, None)
+        self.search.remove(self.selected_location.id)
+        self.sorted_views.remove(self.selected_location.id)
+        if self.area_selection is not None:
+            self.area_selection.discard(self.selected_location.id)
         
-        if self.selected_location.id in self.locations:
-            del self.locations[self.selected_location.id]
-        
-        if self.selected_location.id in self.player.visited_locations:
-            self.player.visited_locations.remove(self.selected_location.id)
+        self.player.visited_locations.discard(self.selected_location.id)
+        self.store.delete(self.selected_location.id)
         
         self.selected_location = None
         self.edit_panel.visible = False
         self.update_locations_list()
-        self.map_stack.update()
-        self.page.update()
+        self.update_pin_positions()
+        self.update()
 
     def handle_scale_start(self, e: ft.ScaleStartEvent):
         """Handle the start of a scaling gesture"""
         self.drag_start = self._get_event_coordinates(e)
 
     def handle_scale_update(self, e: ft.ScaleUpdateEvent):
-        """Handle scaling (pinch zoom) updates"""
-        new_scale = max(self.MIN_SCALE, min(self.MAX_SCALE, self.scale * e.scale))
-        
-        if self.scale != new_scale:
-            x, y = self._get_event_coordinates(e)
-            focus_x = x - self.offset_x
-            focus_y = y - self.offset_y
-            self.offset_x -= focus_x * (new_scale / self.scale - 1)
-            self.offset_y -= focus_y * (new_scale / self.scale - 1)
-            self.scale = new_scale
-        
-        self.update_pin_positions()
+        """Queue a zoom about the gesture's focal point for the next frame"""
+        with self._view_lock:
+            ratio, dx, dy = self.pending_view
+            current = self.scale * ratio
+            new_scale = max(self.MIN_SCALE, min(self.MAX_SCALE, current * e.scale))
+
+            if current != new_scale:
+                x, y = self._get_event_coordinates(e)
+                # zooming by r about x maps an offset o to r * o + x * (1 - r)
+                r = new_scale / current
+                self.pending_view = (ratio * r, dx * r + x * (1 - r), dy * r + y * (1 - r))
+
+        self.frames.request()
 
     def handle_pan_start(self, e: ft.DragStartEvent):
         """Handle the start of a pan/drag gesture"""
@@ -492,17 +802,47 @@ class MapScreen(ft.Container):
         """Handle pan/drag updates"""
         if self.drag_start:
             x, y = self._get_event_coordinates(e)
-            dx = x - self.drag_start[0]
-            dy = y - self.drag_start[1]
-            self.offset_x += dx
-            self.offset_y += dy
+            with self._view_lock:
+                ratio, dx, dy = self.pending_view
+                self.pending_view = (ratio, dx + x - self.drag_start[0], dy + y - self.drag_start[1])
             self.drag_start = (x, y)
+            self.frames.request()
+
+    def handle_gesture_end(self, e):
+        """Drop the frame still waiting and lay out the settled view once"""
+        self.drag_start = None
+        if self.frames.cancel():
+            self._render_frame()
+
+    def _apply_pending_view(self):
+        """Fold the zoom and pan gathered since the last frame into scale and offset.
+
+        Done under the view lock, so a gesture handler never sees the pending
+        view cleared before scale and offset have taken it in.
+        """
+        with self._view_lock:
+            ratio, dx, dy = self.pending_view
+            self.pending_view = (1.0, 0.0, 0.0)
+            self.scale *= ratio
+            self.offset_x = self.offset_x * ratio + dx
+            self.offset_y = self.offset_y * ratio + dy
+
+    def _render_frame(self):
+        with self._frame_lock:
+            self._apply_pending_view()
             self.update_pin_positions()
 
     def handle_map_tap(self, e: ft.TapEvent):
-        """Handle map tap events"""
-        local_x = (e.local_x - self.offset_x) / (self.map_width * self.scale)
-        local_y = (e.local_y - self.offset_y) / (self.map_height * self.scale)
+        """Select the pin under the tap, or start a new location there"""
+        hit = self.location_at(e.local_x, e.local_y)
+        if hit:
+            self.select_location(hit)
+            return
+        if self.area_selection is not None:
+            self.area_selection = None
+            self.update_locations_list()
+
+        local_x, local_y = self._to_map(e.local_x, e.local_y)
 
         self.last_click_x = max(0, min(1, local_x))
         self.last_click_y = max(0, min(1, local_y))
@@ -516,14 +856,26 @@ class MapScreen(ft.Container):
 
     def handle_double_tap(self, e: ft.TapEvent):
         """Handle double tap (reset zoom)"""
-        self.scale = self.DEFAULT_SCALE
-        self.offset_x = 0.0
-        self.offset_y = 0.0
+        self.frames.cancel()
+        with self._view_lock:
+            self.pending_view = (1.0, 0.0, 0.0)
+            self.scale = self.DEFAULT_SCALE
+            self.offset_x = 0.0
+            self.offset_y = 0.0
         self.update_pin_positions()
 
+    def handle_long_press_start(self, e: ft.LongPressStartEvent):
+        """Anchor a rectangle selection"""
+        self.area_anchor = (e.local_x, e.local_y)
+
     def handle_long_press(self, e: ft.LongPressEndEvent):
-        """Handle long press (context menu)"""
-        pass
+        """Limit the locations list to the pins inside the long-press-and-drag rectangle"""
+        if not self.area_anchor:
+            return
+        selected = self.locations_in_rect(*self.area_anchor, e.local_x, e.local_y)
+        self.area_anchor = None
+        self.area_selection = {loc.id for loc in selected}
+        self.update_locations_list()
 
     def handle_map_hover(self, e: ft.HoverEvent):
         """Handle map hover events (tooltip positioning)"""
@@ -552,6 +904,7 @@ class MapScreen(ft.Container):
         return 0.5, 0.5
 
     def update(self):
-        """Update the UI"""
+        """Update the UI, never while a frame is patching the map controls"""
         if self.page:
-            self.page.update()
\ No newline at end of file
+            with self._frame_lock:
+                self.page.update()
\ No newline at end of file
@@ -1,12 +1,21 @@
 import flet as ft
-from datetime import datetime
+from datetime import date, datetime
+from models.life_calendar import LifeCalendar
+from services.calendar_export import export_calendar
+from services.calendar_raster import WEEKS_PER_YEAR, GridLayout, render_png_base64
 
 class MementoMoriScreen(ft.Container):
-    def __init__(self):
+    BAND_YEARS = 5
+    GRID_HEIGHT = 600
+
+    def __init__(self, player):
         super().__init__()
+        self.player = player
         self.expand = True
         self._initialized = False
         self.build()
+        if self.player.birth_date:
+            self.generate_calendar(None)
         
     def build(self):
         months = [
@@ -17,12 +26,13 @@ class MementoMoriScreen(ft.Container):
         ]
         
         today = datetime.now()
+        initial = self.player.birth_date or today
         
         self.day_dropdown = ft.Dropdown(
             width=80,
             label="Day",
             options=[ft.dropdown.Option(str(i)) for i in range(1, 32)],
-            value=str(today.day),
+            value=str(initial.day),
             text_style=ft.TextStyle(color=ft.Colors.BLUE_GREY)
 
         )
@@ -31,7 +41,7 @@ class MementoMoriScreen(ft.Container):
             width=120,
             label="Month",
             options=[ft.dropdown.Option(num, text=name) for num, name in months],
-            value=str(today.month),
+            value=str(initial.month),
             text_style=ft.TextStyle(color=ft.Colors.BLUE_GREY)
         )
         
@@ -39,7 +49,7 @@ class MementoMoriScreen(ft.Container):
             width=100,
             label="Year",
             options=[ft.dropdown.Option(str(i)) for i in range(today.year-100, today.year+1)],
-            value=str(today.year),
+            value=str(initial.year),
             text_style=ft.TextStyle(color=ft.Colors.BLUE_GREY)
         )
         
@@ -54,11 +64,43 @@ class MementoMoriScreen(ft.Container):
             max=120,
             divisions=70,
             label="{value} years",
-            value=80,
+            value=self.player.life_expectancy,
             width=400
         )
         
         self.grid_area = ft.Column()
+        self.hover_text = ft.Text("", size=12, color=ft.Colors.BLUE_GREY)
+        self.grid_list = ft.ListView(
+            spacing=0,
+            on_scroll=self._on_grid_scroll,
+            on_scroll_interval=50
+        )
+        self.stats_text = ft.Text("", size=14, weight="bold")
+        self.legend = ft.Row(
+            controls=[
+                ft.Container(
+                    width=20,
+                    height=20,
+                    bgcolor=ft.Colors.BLACK,
+                    border=ft.border.all(1, ft.Colors.GREY_400)
+                ),
+                ft.Text("Lived weeks", size=12),
+                ft.Container(
+                    width=20,
+                    height=20,
+                    bgcolor=ft.Colors.WHITE,
+                    border=ft.border.all(1, ft.Colors.GREY_200)
+                ),
+                ft.Text("Remaining weeks", size=12)
+            ],
+            spacing=10,
+            alignment=ft.MainAxisAlignment.CENTER
+        )
+        self.calendar = None
+        self.layout = None
+        self.bands = []
+        self.built_years = 0
+        self.file_picker = ft.FilePicker(on_result=self._on_export_path)
     
         self.content = ft.Column(
             controls=[
@@ -106,14 +148,29 @@ class MementoMoriScreen(ft.Container):
                     alignment=ft.MainAxisAlignment.CENTER
                 ),
                 
-                ft.ElevatedButton(
-                    "Generate Life Calendar",
-                    icon=ft.Icons.CALENDAR_VIEW_MONTH,
-                    on_click=self.generate_calendar,
-                    style=ft.ButtonStyle(
-                        padding=20,
-                        shape=ft.RoundedRectangleBorder(radius=10)
-                    )
+                ft.Row(
+                    controls=[
+                        ft.ElevatedButton(
+                            "Generate Life Calendar",
+                            icon=ft.Icons.CALENDAR_VIEW_MONTH,
+                            on_click=self.generate_calendar,
+                            style=ft.ButtonStyle(
+                                padding=20,
+                                shape=ft.RoundedRectangleBorder(radius=10)
+                            )
+                        ),
+                        ft.OutlinedButton(
+                            "Export",
+                            icon=ft.Icons.DOWNLOAD,
+                            tooltip="Save the calendar as SVG, PNG or PDF",
+                            on_click=self._pick_export_path,
+                            style=ft.ButtonStyle(
+                                padding=20,
+                                shape=ft.RoundedRectangleBorder(radius=10)
+                            )
+                        ),
+                    ],
+                    spacing=10
                 ),
                 
                 ft.Container(
@@ -134,7 +191,13 @@ class MementoMoriScreen(ft.Container):
         
     def did_mount(self):
         """Called when the control is added to the page"""
+        if self.file_picker not in self.page.overlay:
+            self.page.overlay.append(self.file_picker)
+            self.page.update()
         self._update_date_display(None)
+        if self.calendar:
+            # only the weeks lived since the last visit get redrawn
+            self.generate_calendar(None)
         
     def _update_date_display(self, e):
         """Updates the date text display"""
@@ -159,91 +222,132 @@ class MementoMoriScreen(ft.Container):
             day = int(self.day_dropdown.value)
             month = int(self.month_dropdown.value)
             year = int(self.year_dropdown.value)
-            dob = datetime(year, month, day)
+            dob = date(year, month, day)
             
-            today = datetime.now()
+            today = datetime.now().date()
             if dob > today:
                 raise ValueError("Birth date cannot be in the future")
             
             life_expectancy = int(self.life_expectancy_field.value)
-            
-            self.grid_area.controls.clear()
+            if (self.player.birth_date, self.player.life_expectancy) != (dob, life_expectancy):
+                self.player.birth_date = dob
+                self.player.life_expectancy = life_expectancy
+                self.player.request_save()
 
-            total_weeks = life_expectancy * 52
-            lived_weeks = (today - dob).days // 7
-            lived_weeks = max(0, min(lived_weeks, total_weeks))
+            self._show_calendar(LifeCalendar.get(dob, life_expectancy, today))
 
-            max_width = 700
-            box_width = max(6, min(12, max_width // 60))
-            box_height = box_width
+        except ValueError as ve:
+            self._show_error(f"Validation Error: {str(ve)}")
+        except Exception as ex:
+            self._show_error(f"Unexpected Error: {str(ex)}")
+        if self.page:
+            self.update()
 
-            for year_num in range(life_expectancy):
-                week_boxes = []
-                for week in range(52):
-                    index = year_num * 52 + week
-                    color = ft.Colors.BLACK if index < lived_weeks else ft.Colors.WHITE
-                    border_color = ft.Colors.GREY_400 if index < lived_weeks else ft.Colors.GREY_200
-                    
-                    week_boxes.append(
-                        ft.Container(
-                            width=box_width,
-                            height=box_height,
-                            bgcolor=color,
-                            border=ft.border.all(0.5, border_color),
-                            margin=0.5,
-                            tooltip=f"Year {year_num}, Week {week+1}" if index < lived_weeks else f"Year {year_num}, Week {week+1} (Future)"
-                        )
-                    )
+    def _pick_export_path(self, e):
+        if not self.calendar:
+            self.generate_calendar(None)
+        if self.calendar:
+            self.file_picker.save_file(file_name="memento_mori.pdf", allowed_extensions=["pdf", "png", "svg"])
 
-                label = f"{year_num}" if year_num % 5 == 0 else ""
-                row = ft.Row(
-                    controls=[
-                        *week_boxes,
-                        ft.Container(
-                            content=ft.Text(label, size=10),
-                            width=30,
-                            alignment=ft.alignment.center_left
-                        )
-                    ],
-                    spacing=0
-                )
-                self.grid_area.controls.append(row)
+    def _on_export_path(self, e):
+        """Write the calendar straight from the model, without going through the grid controls"""
+        if not e.path or not self.calendar:
+            return
+        try:
+            export_calendar(self.calendar, e.path)
+            self.hover_text.value = f"Saved {e.path}"
+        except (OSError, ValueError) as ex:
+            print(f"Error: calendar export failed: {ex}")
+            self.hover_text.value = "Export failed"
+        self.hover_text.update()
 
-            self.grid_area.controls.append(
-                ft.Row(
-                    controls=[
-                        ft.Container(
-                            width=20,
-                            height=20,
-                            bgcolor=ft.Colors.BLACK,
-                            border=ft.border.all(1, ft.Colors.GREY_400)
-                        ),
-                        ft.Text("Lived weeks", size=12),
-                        ft.Container(
-                            width=20,
-                            height=20,
-                            bgcolor=ft.Colors.WHITE,
-                            border=ft.border.all(1, ft.Colors.GREY_200)
-                        ),
-                        ft.Text("Remaining weeks", size=12)
-                    ],
-                    spacing=10,
-                    alignment=ft.MainAxisAlignment.CENTER
-                )
-            )
-            
+    def _show_error(self, message):
+        self.calendar = None
+        self.layout = None
+        self.bands = []
+        self.grid_area.controls = [ft.Text(message, color=ft.Colors.RED, size=16)]
 
-            self.update()
+    def _show_calendar(self, calendar):
+        """Show ``calendar``, redrawing only the bands whose weeks or length changed"""
+        changed = calendar.drain_changed_years()
+        if calendar is not self.calendar:
+            self.bands = []
+        self.calendar = calendar
+        self.layout = GridLayout(calendar.expectancy)
 
-        except ValueError as ve:
-            self.grid_area.controls.clear()
-            self.grid_area.controls.append(
-                ft.Text(f"Validation Error: {str(ve)}", color=ft.Colors.RED, size=16)
-            )
-            self.update()
-        except Exception as ex:
-            self.grid_area.controls.clear()
-            self.grid_area.controls.append(
-                ft.Text(f"Unexpected Error: {str(ex)}", color=ft.Colors.RED, size=16)
-            )
-            self.update()
\ No newline at end of file
+        bands = []
+        for first, years, control in self.bands:
+            expected = min(self.BAND_YEARS, calendar.expectancy - first)
+            if expected <= 0:
+                break
+            if expected != years or any(first <= year < first + years for year in changed):
+                years, control = expected, self._build_band(first, expected)
+            bands.append((first, years, control))
+        self.bands = bands
+        self.built_years = sum(years for _, years, _ in bands)
+        self.grid_list.controls = [control for _, _, control in bands]
+        self.grid_list.height = min(self.GRID_HEIGHT, self.layout.height)
+        self._append_bands(self.grid_list.height + self.BAND_YEARS * self.layout.pitch - self.built_years * self.layout.pitch)
+
+        self.stats_text.value = (
+            f"{calendar.lived_weeks:,} weeks lived, {calendar.remaining_weeks:,} remaining "
+            f"({calendar.percent_lived:.1f}%)"
+        )
+        self.grid_area.controls = [self.stats_text, self.grid_list, self.hover_text, self.legend]
+
+    def _append_bands(self, pixels):
+        """Build year bands until another ``pixels`` of grid exist or the calendar ends"""
+        added = 0
+        while self.built_years < self.layout.years and added < pixels:
+            first = self.built_years
+            years = min(self.BAND_YEARS, self.layout.years - first)
+            control = self._build_band(first, years)
+            self.bands.append((first, years, control))
+            self.grid_list.controls.append(control)
+            self.built_years += years
+            added += years * self.layout.pitch
+        return added
+
+    def _build_band(self, first, years):
+        """Years ``first`` .. ``first + years - 1`` of the grid as one PNG strip, labelled every five years"""
+        layout = GridLayout(years, self.layout.cell, self.layout.gap)
+        image = ft.Image(
+            src_base64=render_png_base64(layout, self.calendar.lived_per_year(first, first + years)),
+            width=layout.width,
+            height=layout.height,
+            fit=ft.ImageFit.NONE,
+            gapless_playback=True
+        )
+        labels = [
+            ft.Text(str(year), size=10, left=layout.width + 6, top=(year - first) * layout.pitch - 3)
+            for year in range(first, first + years) if year % 5 == 0
+        ]
+        return ft.GestureDetector(
+            content=ft.Stack([image, *labels], width=layout.width + 30, height=layout.height),
+            on_hover=lambda e: self._on_grid_hover(e, first),
+            on_exit=lambda e: self._on_grid_hover(e, first),
+            hover_interval=30
+        )
+
+    def _on_grid_scroll(self, e):
+        """Build the next bands once the viewport nears the end of what exists"""
+        if not self.layout or self.built_years >= self.layout.years:
+            return
+        if e.pixels >= e.max_scroll_extent - self.GRID_HEIGHT / 2:
+            if self._append_bands(self.GRID_HEIGHT):
+                self.grid_list.update()
+
+    def _on_grid_hover(self, e, first_year=0):
+        """Name the week under the pointer, found from its position rather than per-cell tooltips"""
+        week = None
+        if self.layout and e.name == "hover":
+            week = self.layout.week_at(e.local_x, e.local_y + first_year * self.layout.pitch)
+        text = ""
+        if week:
+            year, week_num = week
+            text = f"Year {year}, Week {week_num + 1}"
+            if not self.calendar.is_lived(year * WEEKS_PER_YEAR + week_num):
+                text += " (Future)"
+        if text != self.hover_text.value:
+            self.hover_text.value = text
+            self.hover_text.update()
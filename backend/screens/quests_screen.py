@@ -72,5 +72,6 @@ class QuestsScreen(ft.Column):
             self.player.active_quests.append(quest)
         else:
             self.player.complete_quest(quest)
+        self.player.request_save()
         self.build()
         self.update()
\ No newline at end of file
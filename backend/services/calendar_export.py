@@ -0,0 +1,136 @@
+import os
+import zlib
+from services.calendar_raster import WEEKS_PER_YEAR, GridLayout, iter_png, week_scanlines
+
+FORMATS = ('.svg', '.png', '.pdf')
+
+LIVED_FILL, LIVED_STROKE = "#000000", "#bdbdbd"
+REMAINING_FILL, REMAINING_STROKE = "#ffffff", "#eeeeee"
+
+
+def _title(calendar):
+    return (f"Memento Mori - born {calendar.birth_date.isoformat()}, "
+            f"{calendar.lived_weeks:,} of {calendar.total_weeks:,} weeks lived")
+
+
+def export_svg(calendar, f, cell=10, gap=2, margin=20):
+    """Write the grid as SVG, one path per run of lived or remaining weeks in each year row"""
+    pitch = cell + gap
+    label = 30
+    width = margin * 2 + label + WEEKS_PER_YEAR * pitch
+    height = margin * 2 + 30 + calendar.expectancy * pitch
+    f.write(
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="sans-serif">\n'
+        f'<style>.l{{fill:{LIVED_FILL};stroke:{LIVED_STROKE}}}'
+        f'.r{{fill:{REMAINING_FILL};stroke:{REMAINING_STROKE}}}text{{font-size:10px}}</style>\n'
+        f'<text x="{margin}" y="{margin + 12}" style="font-size:14px">{_title(calendar)}</text>\n'
+    )
+    top = margin + 30
+    left = margin + label
+    side = cell - 1
+    for year, lived in enumerate(calendar.lived_per_year()):
+        y = top + year * pitch
+        if year % 5 == 0:
+            f.write(f'<text x="{margin}" y="{y + cell - 1}">{year}</text>\n')
+        for css, weeks in (('l', range(lived)), ('r', range(lived, WEEKS_PER_YEAR))):
+            if weeks:
+                cells = ''.join(f'M{left + week * pitch + 0.5} {y + 0.5}h{side}v{side}h-{side}z' for week in weeks)
+                f.write(f'<path class="{css}" d="{cells}"/>\n')
+    f.write('</svg>\n')
+
+
+def export_png(calendar, f, cell=40, gap=8):
+    """Write the grid as an indexed PNG, streamed one scanline at a time.
+
+    The defaults give a ~2500 px wide poster; memory stays at one scanline
+    plus the compressor window whatever the size.
+    """
+    layout = GridLayout(calendar.expectancy, cell, gap)
+    for chunk in iter_png(layout.width, layout.height, week_scanlines(layout, calendar.lived_per_year())):
+        f.write(chunk)
+
+
+def export_pdf(calendar, f, cell=6.0, gap=1.5, margin=36):
+    """Write a single-page vector PDF sized to the grid.
+
+    Each year row becomes one filled-and-stroked path per run of weeks, and
+    the content stream is deflated as it is written, so rows are never
+    collected in memory. Uses the built-in Helvetica font.
+    """
+    pitch = cell + gap
+    label = 24
+    width = margin * 2 + label + WEEKS_PER_YEAR * pitch
+    height = margin * 2 + 30 + calendar.expectancy * pitch
+    offsets = []
+    written = 0
+
+    def out(data):
+        nonlocal written
+        data = data.encode('latin-1') if isinstance(data, str) else data
+        f.write(data)
+        written += len(data)
+
+    def begin_object(number):
+        offsets.append(written)
+        out(f"{number} 0 obj\n")
+
+    out(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    begin_object(1)
+    out("<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+    begin_object(2)
+    out("<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n")
+    begin_object(3)
+    out(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width:g} {height:g}] "
+        f"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>\nendobj\n")
+    begin_object(4)
+    out("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>\nendobj\n")
+    begin_object(5)
+    out("<< /Length 6 0 R /Filter /FlateDecode >>\nstream\n")
+
+    compressor = zlib.compressobj(9)
+    stream_start = written
+    title = _title(calendar).replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    out(compressor.compress(
+        f"BT /F1 12 Tf {margin:g} {height - margin - 12:g} Td ({title}) Tj ET\n0.5 w\n".encode('latin-1')
+    ))
+    top = height - margin - 30
+    left = margin + label
+    colours = {
+        True: "0 0 0 rg 0.741 0.741 0.741 RG\n",
+        False: "1 1 1 rg 0.933 0.933 0.933 RG\n",
+    }
+    for year, lived in enumerate(calendar.lived_per_year()):
+        y = top - (year + 1) * pitch + gap
+        ops = []
+        if year % 5 == 0:
+            ops.append(f"BT /F1 7 Tf {margin:g} {y + 1:g} Td ({year}) Tj ET\n")
+        for is_lived, weeks in ((True, range(lived)), (False, range(lived, WEEKS_PER_YEAR))):
+            if weeks:
+                ops.append(colours[is_lived])
+                ops.extend(f"{left + week * pitch:g} {y:g} {cell:g} {cell:g} re\n" for week in weeks)
+                ops.append("B\n")
+        out(compressor.compress(''.join(ops).encode('latin-1')))
+    out(compressor.flush())
+    length = written - stream_start
+    out("\nendstream\nendobj\n")
+    begin_object(6)
+    out(f"{length}\nendobj\n")
+
+    xref = written
+    out(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n")
+    out(''.join(f"{offset:010d} 00000 n \n" for offset in offsets))
+    out(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n")
+
+
+def export_calendar(calendar, path, **options):
+    """Export ``calendar`` to ``path`` as SVG, PNG or PDF, chosen by extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"unsupported export format: {extension}")
+    if extension == '.svg':
+        with open(path, 'w', encoding='utf-8') as f:
+            export_svg(calendar, f, **options)
+    else:
+        with open(path, 'wb') as f:
+            (export_png if extension == '.png' else export_pdf)(calendar, f, **options)
@@ -0,0 +1,111 @@
+import base64
+import struct
+import zlib
+
+WEEKS_PER_YEAR = 52
+
+# palette indices for the indexed-colour PNG
+BACKGROUND, LIVED, LIVED_BORDER, REMAINING, REMAINING_BORDER = range(5)
+PALETTE = (
+    (0, 0, 0),        # background, fully transparent via tRNS
+    (0, 0, 0),        # lived week
+    (189, 189, 189),  # lived border (GREY_400)
+    (255, 255, 255),  # remaining week
+    (238, 238, 238),  # remaining border (GREY_200)
+)
+
+
+class GridLayout:
+    """Pixel geometry of the week grid: ``cell`` px squares ``gap`` px apart"""
+
+    def __init__(self, years, cell=10, gap=2):
+        self.years = years
+        self.cell = cell
+        self.gap = gap
+        self.pitch = cell + gap
+        self.width = WEEKS_PER_YEAR * self.pitch
+        self.height = years * self.pitch
+
+    def week_at(self, x, y):
+        """(year, week) under pixel ``x, y``, or None over a gap or outside the grid"""
+        if x < 0 or y < 0:
+            return None
+        year, dy = divmod(int(y), self.pitch)
+        week, dx = divmod(int(x), self.pitch)
+        if year >= self.years or week >= WEEKS_PER_YEAR or dx >= self.cell or dy >= self.cell:
+            return None
+        return year, week
+
+
+def _chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def iter_png(width, height, scanlines, palette=PALETTE, transparent=(BACKGROUND,)):
+    """Yield an 8-bit indexed PNG chunk by chunk from an iterable of scanline bytes.
+
+    Each scanline is compressed as it arrives, so only the zlib window and
+    the current line are held in memory however tall the image is.
+    """
+    yield b'\x89PNG\r\n\x1a\n'
+    yield _chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0))
+    yield _chunk(b'PLTE', b''.join(bytes(rgb) for rgb in palette))
+    if transparent:
+        yield _chunk(b'tRNS', bytes(0 if i in transparent else 255 for i in range(len(palette))))
+    compressor = zlib.compressobj(9)
+    pending = []
+    size = 0
+    for line in scanlines:
+        data = compressor.compress(b'\x00' + line)
+        if data:
+            pending.append(data)
+            size += len(data)
+        if size >= 1 << 16:
+            yield _chunk(b'IDAT', b''.join(pending))
+            pending, size = [], 0
+    pending.append(compressor.flush())
+    yield _chunk(b'IDAT', b''.join(pending))
+    yield _chunk(b'IEND', b'')
+
+
+def week_scanlines(layout, lived_in_year):
+    """Scanlines for the grid, given how many weeks of each year row were lived.
+
+    Every row of cells is a prefix of lived weeks followed by remaining
+    ones, so each pixel row is assembled from a handful of repeated byte
+    patterns instead of pixel by pixel.
+    """
+    cell, gap = layout.cell, layout.gap
+    gap_px = bytes([BACKGROUND]) * gap
+    edge = {
+        LIVED: bytes([LIVED_BORDER]) * cell + gap_px,
+        REMAINING: bytes([REMAINING_BORDER]) * cell + gap_px,
+    }
+    inner = {
+        LIVED: bytes([LIVED_BORDER]) + bytes([LIVED]) * (cell - 2) + bytes([LIVED_BORDER]) + gap_px,
+        REMAINING: bytes([REMAINING_BORDER]) + bytes([REMAINING]) * (cell - 2) + bytes([REMAINING_BORDER]) + gap_px,
+    }
+    blank = bytes([BACKGROUND]) * layout.width
+    for lived in lived_in_year:
+        rest = WEEKS_PER_YEAR - lived
+        edge_line = edge[LIVED] * lived + edge[REMAINING] * rest
+        inner_line = inner[LIVED] * lived + inner[REMAINING] * rest
+        yield edge_line
+        for _ in range(cell - 2):
+            yield inner_line
+        yield edge_line
+        for _ in range(gap):
+            yield blank
+
+
+def lived_per_year(lived_weeks, years):
+    """Lived weeks in each year row when the first ``lived_weeks`` weeks are lived"""
+    return [max(0, min(WEEKS_PER_YEAR, lived_weeks - year * WEEKS_PER_YEAR)) for year in range(years)]
+
+
+def render_png(layout, lived_in_year):
+    return b''.join(iter_png(layout.width, layout.height, week_scanlines(layout, lived_in_year)))
+
+
+def render_png_base64(layout, lived_in_year):
+    return base64.b64encode(render_png(layout, lived_in_year)).decode('ascii')
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime, timedelta
+
+
+class FakeClock:
+    """Stand-in for ``datetime.now`` and ``asyncio.sleep`` when testing rollovers.
+
+    With ``speed=None`` time only moves through ``sleep`` and ``advance``, so
+    a test can jump straight to midnight. With a number, time runs that many
+    times faster than real time.
+    """
+
+    def __init__(self, start, speed=None):
+        self._now = start
+        self.speed = speed
+
+    def now(self):
+        return self._now
+
+    def advance(self, seconds):
+        self._now += timedelta(seconds=seconds)
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds / self.speed if self.speed else 0)
+        self.advance(seconds)
+
+
+class DayRollover:
+    """Resets per-day state once when the local date changes while the app is open.
+
+    ``run`` is meant for ``page.run_task`` so the rollover happens on Flet's
+    event loop. Sleeps are capped at ``max_sleep`` seconds and the date is
+    re-checked after each one, so a suspended machine or a clock change is
+    noticed on wake-up instead of a day late.
+    """
+
+    def __init__(self, player, habit_service, clock=None, sleep=None, max_sleep=300):
+        self.player = player
+        self.habit_service = habit_service
+        self.now = clock.now if clock else datetime.now
+        self.sleep = sleep or (clock.sleep if clock else asyncio.sleep)
+        self.max_sleep = max_sleep
+        self.rollovers = 0
+
+    @staticmethod
+    def seconds_until_midnight(now):
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return (midnight - now).total_seconds()
+
+    async def run(self):
+        day = self.now().date()
+        while True:
+            await self.sleep(min(self.max_sleep, self.seconds_until_midnight(self.now()) + 0.5))
+            today = self.now().date()
+            if today != day:
+                day = today
+                self.roll(today)
+
+    def roll(self, today):
+        """Finalize yesterday: break a missed login streak and reset every habit's flags"""
+        last_login = self.player.last_login
+        if last_login is None or last_login.date() < today - timedelta(days=1):
+            self.player.daily_streak = 0
+        self.rollovers += 1
+        return self.habit_service.roll_over(today)
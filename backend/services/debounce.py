@@ -0,0 +1,45 @@
+import threading
+
+
+class Debouncer:
+    """Runs ``action`` once, ``delay`` seconds after the last of a burst of ``trigger()`` calls.
+
+    Meant for handlers like search-as-you-type, where only the state after
+    the user pauses matters. ``triggers`` and ``runs`` count both sides.
+    """
+
+    def __init__(self, action, delay=0.25):
+        self._action = action
+        self.delay = delay
+        self.triggers = 0
+        self.runs = 0
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def trigger(self, *args):
+        """(Re)start the wait; the action runs with the latest ``args``"""
+        with self._lock:
+            self.triggers += 1
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._fire, args)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+    def _fire(self, *args):
+        with self._lock:
+            # a timer replaced while it was already firing must not run
+            if threading.current_thread() is not self._timer:
+                return
+            self._timer = None
+        try:
+            self._action(*args)
+            self.runs += 1
+        except Exception as e:
+            print(f"Error: debounced action failed: {e}")
@@ -0,0 +1,79 @@
+import threading
+import time
+
+
+class FrameScheduler:
+    """Coalesces bursts of render requests into at most one render per frame.
+
+    Gesture handlers call ``request()`` for every event and return
+    immediately. A background worker runs ``render`` at most ``fps`` times a
+    second while requests keep arriving. ``cancel()`` drops a frame that
+    hasn't been rendered yet. ``events``, ``frames`` and ``dropped`` count
+    what came in, what was drawn and what was thrown away.
+    """
+
+    def __init__(self, render, fps=30):
+        self._render = render
+        self.fps = fps
+        self.events = 0
+        self.frames = 0
+        self.dropped = 0
+        self._pending = False
+        self._last_frame = 0.0
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="frame-scheduler", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        """Ask for a frame; requests before the next frame share it"""
+        with self._lock:
+            self.events += 1
+            self._pending = True
+        self._wake.set()
+
+    def cancel(self):
+        """Drop the frame that is waiting, if any; True if one was dropped"""
+        with self._lock:
+            pending, self._pending = self._pending, False
+            if pending:
+                self.dropped += 1
+        return pending
+
+    def close(self):
+        """Stop the worker; a frame still waiting is dropped"""
+        self._closed.set()
+        self._wake.set()
+        self._thread.join()
+        self.cancel()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            if self._closed.is_set():
+                return
+            # hold the frame until a full interval has passed since the last one
+            wait = self._last_frame + 1 / self.fps - time.monotonic()
+            if wait > 0 and self._closed.wait(wait):
+                return
+            self._wake.clear()
+            self._render_pending()
+
+    def _render_pending(self):
+        with self._render_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                self._pending = False
+            self._last_frame = time.monotonic()
+            try:
+                self._render()
+                self.frames += 1
+            except Exception as e:
+                print(f"Error: frame render failed: {e}")
+
+    def __repr__(self):
+        return (f"FrameScheduler(fps={self.fps}, events={self.events}, "
+                f"frames={self.frames}, dropped={self.dropped})")
@@ -0,0 +1,135 @@
+from datetime import date, timedelta
+from typing import NamedTuple
+from models.completion_history import CompletionHistory
+from services.habit_stats import HabitStats, streaks
+
+FREQUENCIES = ("Daily", "Weekly", "Monthly")
+PERIOD_UNITS = {"Daily": "days", "Weekly": "weeks", "Monthly": "months"}
+
+
+def period_bounds(frequency, day):
+    """First and last day of the period containing ``day``"""
+    if frequency == "Weekly":
+        first = day - timedelta(days=day.weekday())
+        return first, first + timedelta(days=6)
+    if frequency == "Monthly":
+        first = day.replace(day=1)
+        following = (first + timedelta(days=32)).replace(day=1)
+        return first, following - timedelta(days=1)
+    return day, day
+
+
+def period_starts(frequency, first, last):
+    """Start dates of every period overlapping ``first``..``last``, oldest first"""
+    starts = []
+    current = period_bounds(frequency, first)[0]
+    while current <= last:
+        starts.append(current)
+        current = period_bounds(frequency, current)[1] + timedelta(days=1)
+    return starts
+
+
+class PeriodStatus(NamedTuple):
+    due: bool
+    done: bool
+    streak: int
+    period_start: date
+    period_end: date
+
+
+class HabitScheduler:
+    """Due / done-this-period / streak-in-periods for habits of any frequency.
+
+    Daily habits are answered from each habit's bitset, which is cheaper
+    than unpacking them into a matrix. Weekly and Monthly habits need their
+    days collapsed into periods, so each of those groups is answered in one
+    vectorized ``HabitStats`` pass (see benchmarks/habit_stats.py). Results
+    are cached per day key and reused until the habit's frequency or
+    completion history changes, so screen rebuilds don't recompute them.
+    """
+
+    def __init__(self):
+        self._day = None
+        self._bounds = {}
+        self._cache = {}
+
+    def _start_day(self, today):
+        if today != self._day:
+            self._day = today
+            self._bounds = {f: period_bounds(f, today) for f in FREQUENCIES}
+            self._cache.clear()
+
+    @staticmethod
+    def _key(habit, history):
+        return habit.get('frequency', "Daily"), history.start, history.bits
+
+    def statuses(self, habits, today):
+        """One PeriodStatus per habit, in order"""
+        habits = list(habits)
+        self._start_day(today)
+        results = [None] * len(habits)
+        misses = {}
+        for i, habit in enumerate(habits):
+            history = CompletionHistory.for_habit(habit)
+            cached = self._cache.get(str(habit.get('id')))
+            if cached and cached[0] == self._key(habit, history):
+                results[i] = cached[1]
+            else:
+                frequency = habit.get('frequency', "Daily")
+                misses.setdefault(frequency if frequency in FREQUENCIES else "Daily", []).append(i)
+
+        for frequency, indices in misses.items():
+            group = [habits[i] for i in indices]
+            first, last = self._bounds[frequency]
+            if frequency == "Daily":
+                histories = [CompletionHistory.for_habit(habit) for habit in group]
+                current = [history.current_streak(last) for history in histories]
+                done = [history.completed_on(last) for history in histories]
+            else:
+                stats = HabitStats(group, last)
+                starts = period_starts(frequency, stats.start_date, last)
+                columns = [max(0, (s - stats.start_date).days) for s in starts]
+                periods = stats.period_matrix(columns)
+                current, _ = streaks(periods)
+                done = periods[:, -1]
+            for j, i in enumerate(indices):
+                habit = habits[i]
+                status = PeriodStatus(not done[j], bool(done[j]), int(current[j]), first, last)
+                self._cache[str(habit.get('id'))] = (self._key(habit, CompletionHistory.for_habit(habit)), status)
+                results[i] = status
+        return results
+
+    def status(self, habit, today):
+        return self.statuses([habit], today)[0]
+
+    def toggle(self, habit, today):
+        """Check a habit off for its current period, or undo that.
+
+        Updates the habit's ``completed_today``, ``streak`` and
+        ``last_completed`` and returns True when the period became done.
+        """
+        history = CompletionHistory.for_habit(habit)
+        first, last = period_bounds(habit.get('frequency', "Daily"), today)
+        if history.completions_between(first, last):
+            day = first
+            while day <= last:
+                history.unmark(day)
+                day += timedelta(days=1)
+            became_done = False
+        else:
+            history.mark(today)
+            became_done = True
+        self.refresh([habit], today)
+        return became_done
+
+    def refresh(self, habits, today):
+        """Rewrite ``completed_today``, ``streak`` and ``last_completed`` from each habit's history"""
+        habits = list(habits)
+        for habit, status in zip(habits, self.statuses(habits, today)):
+            last_completed = CompletionHistory.for_habit(habit).last_completed()
+            habit['completed_today'] = status.done
+            habit['streak'] = status.streak
+            habit['last_completed'] = last_completed.strftime("%Y-%m-%d") if last_completed else None
+
+
+scheduler = HabitScheduler()
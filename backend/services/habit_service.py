@@ -0,0 +1,144 @@
+from datetime import datetime
+from services.habit_schedule import period_bounds, scheduler as default_scheduler
+
+
+class HabitService:
+    """The one place habits are completed, added, edited and deleted.
+
+    Every operation applies XP, streaks and dirty tracking for all the habits
+    it touches, then requests a single save and sends a single change
+    notification to subscribers with the ids that changed.
+    """
+
+    def __init__(self, player, scheduler=None):
+        self.player = player
+        self.scheduler = scheduler or default_scheduler
+        self._listeners = []
+
+    def subscribe(self, callback):
+        """Call ``callback(changed_ids)`` after every operation"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def get(self, habit_id):
+        return self.player.habits.get(habit_id)
+
+    def commit(self, changed_ids, notify=True, flush=False):
+        """Mark ``changed_ids`` dirty, request one save and tell subscribers.
+
+        ``flush`` writes the save through before returning, for bulk jobs
+        that commit in batches; ``notify=False`` holds the notification
+        back until the job's final batch.
+        """
+        for habit_id in changed_ids:
+            if habit_id in self.player.habits:
+                self.player.mark_dirty('habits', habit_id)
+        self.player.request_save()
+        if flush and self.player.saver:
+            self.player.saver.flush()
+        if notify:
+            for callback in list(self._listeners):
+                callback(set(changed_ids))
+
+    def _day(self, day):
+        return day or datetime.now().date()
+
+    def _reward(self, habit, day):
+        """Award a habit's XP at most once per period.
+
+        The start of the rewarded period is kept on the habit, so undoing a
+        completion and checking it off again doesn't pay out twice.
+        """
+        period = period_bounds(habit.get('frequency', "Daily"), day)[0].isoformat()
+        if habit.get('rewarded') == period:
+            return
+        habit['rewarded'] = period
+        self.player.add_xp(habit.get('xp', 10))
+
+    def toggle(self, habit_id, day=None):
+        """Check a habit off for its current period, or undo that; True if it became done"""
+        habit = self.get(habit_id)
+        if habit is None:
+            return False
+        day = self._day(day)
+        became_done = self.scheduler.toggle(habit, day)
+        if became_done:
+            self._reward(habit, day)
+        self.commit([str(habit['id'])])
+        return became_done
+
+    def complete_many(self, ids, day=None):
+        """Complete every habit in ``ids`` not already done this period.
+
+        Returns the ids that were newly completed. Costs one save and one
+        notification no matter how many habits change.
+        """
+        day = self._day(day)
+        habits = self.player.habits.in_order(ids)
+        completed = []
+        for habit, status in zip(habits, self.scheduler.statuses(habits, day)):
+            if status.done:
+                continue
+            self.scheduler.toggle(habit, day)
+            self._reward(habit, day)
+            completed.append(str(habit['id']))
+        if completed:
+            self.commit(completed)
+        return completed
+
+    def uncomplete_many(self, ids, day=None):
+        """Undo this period's completion for every habit in ``ids`` that has one"""
+        day = self._day(day)
+        habits = self.player.habits.in_order(ids)
+        undone = []
+        for habit, status in zip(habits, self.scheduler.statuses(habits, day)):
+            if status.done:
+                self.scheduler.toggle(habit, day)
+                undone.append(str(habit['id']))
+        if undone:
+            self.commit(undone)
+        return undone
+
+    def roll_over(self, today):
+        """Bring every habit's ``completed_today`` and ``streak`` up to a new day.
+
+        Only habits whose flags actually change are marked dirty, but the
+        notification always goes out so screens redraw for the new date.
+        """
+        changed = []
+        for habit, status in zip(self.player.habits, self.scheduler.statuses(self.player.habits, today)):
+            if habit.get('completed_today') != status.done or habit.get('streak') != status.streak:
+                habit['completed_today'] = status.done
+                habit['streak'] = status.streak
+                changed.append(str(habit['id']))
+        self.commit(changed)
+        return changed
+
+    def add(self, name, habit_type, frequency, xp=10):
+        habit = self.player.habits.add({
+            'name': name,
+            'type': habit_type,
+            'frequency': frequency,
+            'streak': 0,
+            'xp': xp,
+            'completed_today': False,
+            'last_completed': None,
+            'created_at': datetime.now().strftime("%Y-%m-%d")
+        })
+        self.commit([habit['id']])
+        return habit
+
+    def update(self, habit_id, **changes):
+        habit = self.player.habits.update(habit_id, **changes)
+        if habit is not None:
+            self.commit([habit['id']])
+        return habit
+
+    def delete(self, habit_id):
+        if self.player.habits.delete(habit_id) is None:
+            return False
+        self.commit([str(habit_id)])
+        return True
@@ -0,0 +1,122 @@
+from datetime import date
+import numpy as np
+from models.completion_history import CompletionHistory
+
+
+def streaks(matrix, chunk=1024):
+    """Current and longest runs of True per row of a boolean matrix.
+
+    The current run ends in the last column, or in the one before it when the
+    last column (today, this period) isn't done yet. For every cell the run
+    length ending there is its column position minus the position of the last
+    miss, found with a running maximum. Rows are processed in chunks to bound
+    the temporary arrays.
+    """
+    n, width = matrix.shape
+    current = np.zeros(n, dtype=np.int64)
+    longest = np.zeros(n, dtype=np.int64)
+    if not width:
+        return current, longest
+    dtype = np.int16 if width < np.iinfo(np.int16).max else np.int32
+    positions = np.arange(1, width + 1, dtype=dtype)
+    for lo in range(0, n, chunk):
+        block = matrix[lo:lo + chunk]
+        last_missed = np.maximum.accumulate(np.where(block, 0, positions).astype(dtype), axis=1)
+        runs = positions - last_missed
+        longest[lo:lo + chunk] = runs.max(axis=1)
+        previous = runs[:, -2] if width > 1 else 0
+        current[lo:lo + chunk] = np.where(block[:, -1], runs[:, -1], previous)
+    return current, longest
+
+
+class HabitStats:
+    """Streaks and completion rates for every habit from one habits x days matrix.
+
+    Row ``i`` is ``habits[i]``; column ``j`` is day ``start + j`` and the last
+    column is ``today``. All queries are vectorized passes over the matrix,
+    so a screen rebuild computes everything once instead of per habit.
+    """
+
+    CHUNK = 1024
+
+    def __init__(self, habits, today, days=None):
+        self.today = today
+        histories = [CompletionHistory.for_habit(h) for h in habits]
+        end = today.toordinal()
+        starts = [h.start for h in histories if h.start is not None]
+        if days is None:
+            days = end - min(starts) + 1 if starts else 1
+        self.days = max(1, days)
+        self.start = end - self.days + 1
+        self.matrix = np.zeros((len(histories), self.days), dtype=bool)
+        self._cached_streaks = None
+        for row, history in zip(self.matrix, histories):
+            self._fill(row, history)
+
+    def _fill(self, row, history):
+        if not history.bits:
+            return
+        offset = history.start - self.start
+        bits = history.bits
+        if offset < 0:
+            bits >>= -offset
+            offset = 0
+        length = min(bits.bit_length(), self.days - offset)
+        if length <= 0:
+            return
+        bits &= (1 << length) - 1
+        raw = np.frombuffer(bits.to_bytes((length + 7) // 8, 'little'), dtype=np.uint8)
+        row[offset:offset + length] = np.unpackbits(raw, bitorder='little')[:length]
+
+    @property
+    def start_date(self):
+        return date.fromordinal(self.start)
+
+    @property
+    def completed_today(self):
+        return self.matrix[:, -1].copy()
+
+    def _streaks(self):
+        if self._cached_streaks is None:
+            self._cached_streaks = streaks(self.matrix, self.CHUNK)
+        return self._cached_streaks
+
+    def period_matrix(self, first_columns):
+        """Collapse days into periods: a period counts if any day in it was completed.
+
+        ``first_columns`` are the ascending column indices where each period
+        starts, beginning with 0.
+        """
+        if not len(self.matrix):
+            return np.zeros((0, len(first_columns)), dtype=bool)
+        return np.logical_or.reduceat(self.matrix, first_columns, axis=1)
+
+    def current_streaks(self):
+        """Run ending today, or ending yesterday where today isn't checked off yet"""
+        return self._streaks()[0]
+
+    def longest_streaks(self):
+        return self._streaks()[1]
+
+    def completion_rates(self, days):
+        """Fraction of the last ``days`` days each habit was completed.
+
+        Days before the matrix starts count as missed, so a habit with a
+        week of history has at most a 7/30 monthly rate.
+        """
+        if days <= 0:
+            return np.zeros(len(self.matrix))
+        return self.matrix[:, -min(days, self.days):].sum(axis=1) / days
+
+    def weekly_rates(self):
+        return self.completion_rates(7)
+
+    def monthly_rates(self):
+        return self.completion_rates(30)
+
+    def best_current_streak(self):
+        return int(self.current_streaks().max()) if len(self.matrix) else 0
+
+    def best_streak(self):
+        """Longest streak any habit has ever had"""
+        return int(self.longest_streaks().max()) if len(self.matrix) else 0
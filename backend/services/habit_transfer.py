@@ -0,0 +1,214 @@
+import csv
+import json
+import os
+from datetime import date, datetime
+from typing import NamedTuple
+from models.completion_history import CompletionHistory
+from services.habit_schedule import FREQUENCIES
+
+HABIT_FIELDS = ('id', 'name', 'type', 'frequency', 'xp', 'created_at')
+# the names of HabitType in screens/habits_screen.py
+HABIT_TYPES = ('PHYSICAL', 'MENTAL', 'SOCIAL', 'CREATIVE', 'PRODUCTIVE', 'OTHER')
+CSV_COLUMNS = ('habit_id', 'name', 'type', 'frequency', 'xp', 'created_at', 'date')
+FORMATS = ('.csv', '.jsonl')
+PROGRESS_EVERY = 5000
+
+
+class ImportResult(NamedTuple):
+    rows: int
+    habits_added: int
+    completions_added: int
+    skipped: int
+
+
+def export_jsonl(habits, f, progress=None):
+    """Write each habit as one line followed by one line per completed day.
+
+    Returns the number of lines written. Completions are streamed from the
+    history bitsets, so memory doesn't grow with the history length.
+    """
+    lines = reported = 0
+    for habit in habits:
+        f.write(json.dumps({k: habit.get(k) for k in HABIT_FIELDS}, separators=(',', ':')) + '\n')
+        lines += 1
+        for day in CompletionHistory.for_habit(habit).dates():
+            f.write(f'{{"habit_id":{json.dumps(habit["id"])},"date":"{day.isoformat()}"}}\n')
+            lines += 1
+        if progress and lines - reported >= PROGRESS_EVERY:
+            reported = lines
+            progress(lines)
+    return lines
+
+
+def export_csv(habits, f, progress=None):
+    """Write one row per completed day, and a dateless row for habits never completed"""
+    writer = csv.writer(f)
+    writer.writerow(CSV_COLUMNS)
+    rows = reported = 0
+    for habit in habits:
+        fields = [habit.get('id'), *(habit.get(k) for k in HABIT_FIELDS[1:])]
+        days = CompletionHistory.for_habit(habit).dates()
+        first = next(days, None)
+        writer.writerow([*fields, first.isoformat() if first else ''])
+        rows += 1
+        for day in days:
+            writer.writerow([*fields, day.isoformat()])
+            rows += 1
+        if progress and rows - reported >= PROGRESS_EVERY:
+            reported = rows
+            progress(rows)
+    return rows
+
+
+def read_jsonl(f):
+    """Yield one dict per non-blank line; unparseable lines come through as None"""
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def read_csv(f):
+    """Yield one dict per row, keyed by the header.
+
+    Only a ``name`` or ``habit_id`` column is required, so simple
+    ``name,date`` exports from other trackers import as well.
+    """
+    for row in csv.DictReader(f):
+        yield {k.strip().lower(): v for k, v in row.items() if k and v not in (None, '')}
+
+
+class HabitImporter:
+    """Merges streamed habit and completion rows into the player's habits.
+
+    A row with a ``date`` is a completion, for the habit named by its
+    ``habit_id`` or ``name``. Any other row defines a habit. Habits are
+    matched to existing ones by name, and unknown ones are added. Rows that
+    aren't objects, or that would add a habit with an unknown type or
+    frequency or a non-numeric xp, are counted as skipped. Changes are
+    committed every ``batch_size`` rows without notifying the UI, and
+    subscribers are told once at the end. Only the id map and the set of
+    touched habits are held in memory, never the rows.
+    """
+
+    def __init__(self, service, batch_size=5000, progress=None):
+        self.service = service
+        self.batch_size = batch_size
+        self.progress = progress
+        self.registry = service.player.habits
+        self._by_key = {}
+        self._by_name = {habit['name']: habit['id'] for habit in self.registry}
+        self._batch = set()
+        self._touched = set()
+
+    def run(self, rows):
+        count = habits_added = completions_added = skipped = 0
+        for row in rows:
+            count += 1
+            if not row or not isinstance(row, dict):
+                skipped += 1
+            else:
+                habit, created = self._resolve(row)
+                day = self._parse_date(row.get('date'))
+                if habit is None or (row.get('date') and day is None):
+                    skipped += 1
+                else:
+                    habits_added += created
+                    if day and CompletionHistory.for_habit(habit).mark(day):
+                        completions_added += 1
+                    self._batch.add(habit['id'])
+            if count % self.batch_size == 0:
+                self._commit(count)
+        self._commit(count)
+        today = datetime.now().date()
+        self.service.scheduler.refresh(self.registry.in_order(self._touched), today)
+        self.service.commit(self._touched)
+        return ImportResult(count, habits_added, completions_added, skipped)
+
+    def _resolve(self, row):
+        key = str(row.get('habit_id') or row.get('id') or '')
+        name = row.get('name')
+        habit_id = self._by_key.get(key) if key else None
+        if habit_id is None and name:
+            habit_id = self._by_name.get(name)
+        if habit_id is not None and habit_id in self.registry:
+            habit, created = self.registry.get(habit_id), False
+        elif isinstance(name, str) and name:
+            habit = self._new_habit(key, name, row)
+            if habit is None:
+                return None, False
+            habit = self.registry.add(habit)
+            self._by_name[name] = habit['id']
+            created = True
+        else:
+            return None, False
+        if key:
+            self._by_key[key] = habit['id']
+        return habit, created
+
+    @staticmethod
+    def _new_habit(key, name, row):
+        """The habit dict a row defines, or None if its type, frequency or xp is invalid"""
+        habit_type = str(row.get('type') or 'OTHER').upper()
+        frequency = str(row.get('frequency') or 'Daily').capitalize()
+        if habit_type not in HABIT_TYPES or frequency not in FREQUENCIES:
+            return None
+        xp = row.get('xp')
+        try:
+            xp = 10 if xp in (None, '') else int(xp)
+        except (TypeError, ValueError):
+            return None
+        if xp < 0:
+            return None
+        return {
+            'id': key or None,
+            'name': name,
+            'type': habit_type,
+            'frequency': frequency,
+            'streak': 0,
+            'xp': xp,
+            'completed_today': False,
+            'last_completed': None,
+            'created_at': row.get('created_at') or datetime.now().strftime("%Y-%m-%d")
+        }
+
+    @staticmethod
+    def _parse_date(value):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(str(value)[:10])
+        except ValueError:
+            return None
+
+    def _commit(self, count):
+        if self._batch:
+            self.service.commit(self._batch, notify=False, flush=True)
+            self._touched |= self._batch
+            self._batch = set()
+        if self.progress:
+            self.progress(count)
+
+
+def import_file(service, path, batch_size=5000, progress=None):
+    """Import a ``.csv`` or ``.jsonl`` file of habits and completions"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"unsupported import format: {extension}")
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = read_csv(f) if extension == '.csv' else read_jsonl(f)
+        return HabitImporter(service, batch_size, progress).run(rows)
+
+
+def export_file(habits, path, progress=None):
+    """Export habits and completions to a ``.csv`` or ``.jsonl`` file"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"unsupported export format: {extension}")
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if extension == '.csv':
+            return export_csv(habits, f, progress)
+        return export_jsonl(habits, f, progress)
@@ -0,0 +1,113 @@
+import json
+import os
+from services.snapshots import SnapshotError, quarantine, read_snapshot, write_snapshot
+
+
+def json_default(value):
+    """Encode objects that know their own compact JSON form (e.g. completion histories)"""
+    if hasattr(value, 'to_json'):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def apply_record(state, record):
+    """Apply a single journal record to a player state dict"""
+    op = record.get('op')
+    if op == 'set':
+        state[record['field']] = record['value']
+    elif op == 'put':
+        item = record['record']
+        items = state.setdefault(record['section'], [])
+        for i, existing in enumerate(items):
+            if str(existing.get('id')) == str(item.get('id')):
+                items[i] = item
+                break
+        else:
+            items.append(item)
+    elif op == 'del':
+        state[record['section']] = [
+            item for item in state.get(record['section'], [])
+            if str(item.get('id')) != str(record['id'])
+        ]
+
+
+class PlayerJournal:
+    """Compacted snapshot plus an append-only journal of player mutations.
+
+    Every save appends only the records that changed. Once the journal grows
+    past ``compact_every`` records the full state is written as a new
+    checksummed snapshot (keeping ``generations`` older ones) and the journal
+    is truncated.
+
+    Legacy store: the app runs on ``SQLiteStore`` (see ``open_store`` in
+    ``main.py``), which gets its crash safety from SQLite's WAL. This class
+    is only read there to migrate a pre-SQLite profile, and stays
+    ``Player``'s default store for code that runs without ``main.py``.
+    """
+
+    def __init__(self, snapshot_path='data/player.json', journal_path='data/player.journal',
+                 compact_every=200, generations=3):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.compact_every = compact_every
+        self.generations = generations
+        self.pending = 0
+
+    def append(self, records):
+        """Append mutation records to the journal, returning the bytes written"""
+        if not records:
+            return 0
+        lines = ''.join(json.dumps(r, separators=(',', ':'), default=json_default) + '\n' for r in records)
+        with open(self.journal_path, 'a') as f:
+            f.write(lines)
+        self.pending += len(records)
+        return len(lines)
+
+    def needs_compaction(self, incoming=0):
+        return self.pending + incoming > self.compact_every
+
+    def compact(self, state):
+        """Write the full state as the new snapshot and truncate the journal"""
+        written = write_snapshot(self.snapshot_path, json.dumps(state, default=json_default), keep=self.generations)
+        with open(self.journal_path, 'w'):
+            pass
+        self.pending = 0
+        return written
+
+    def load(self):
+        """Return the snapshot state with the journal tail replayed on top.
+
+        Falls back to older snapshot generations when the newest is torn or
+        fails its checksum. Raises FileNotFoundError when there is no snapshot
+        and no journal, and SnapshotError (after moving the unreadable files
+        aside) when no generation is valid.
+        """
+        state = {}
+        found = False
+        try:
+            state = read_snapshot(self.snapshot_path, keep=self.generations, parse=json.loads)
+            found = True
+        except FileNotFoundError:
+            pass
+        except SnapshotError:
+            quarantine(self.snapshot_path, keep=self.generations)
+            if os.path.exists(self.journal_path):
+                os.replace(self.journal_path, f"{self.journal_path}.corrupt")
+            raise
+
+        self.pending = 0
+        if os.path.exists(self.journal_path):
+            found = True
+            with open(self.journal_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # torn tail from an interrupted append
+                        break
+                    apply_record(state, record)
+                    self.pending += 1
+
+        if not found:
+            raise FileNotFoundError(self.snapshot_path)
+        return state
@@ -0,0 +1,117 @@
+import heapq
+import re
+import unicodedata
+from collections import defaultdict
+
+# runs of anything but letters and digits, in any script
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize(text):
+    """Casefold, strip accents and collapse everything but letters and digits to single spaces"""
+    text = unicodedata.normalize('NFKD', text or "")
+    text = ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+    return _SEPARATORS.sub(' ', text).strip()
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class LocationSearch:
+    """Substring search over location names and descriptions.
+
+    Each location's normalized text is broken into trigrams, and every
+    trigram maps to the ids containing it. A query term of three or more
+    characters only has to look at the ids in the intersection of its
+    trigrams' posting sets, which are then checked for the actual
+    substring. Terms too short to have a trigram don't narrow anything,
+    so queries made only of those fall back to scanning the normalized
+    strings.
+
+    Matches are ranked: exact name, name prefix, word prefix in the name,
+    anywhere in the name, then description-only matches, ties broken by
+    name.
+    """
+
+    def __init__(self):
+        self.names = {}
+        self.descriptions = {}
+        self.postings = defaultdict(set)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, item_id, name, description=""):
+        """Index a location, replacing whatever was indexed under ``item_id``"""
+        self.remove(item_id)
+        name, description = normalize(name), normalize(description)
+        self.names[item_id] = name
+        self.descriptions[item_id] = description
+        for gram in trigrams(name) | trigrams(description):
+            self.postings[gram].add(item_id)
+
+    def remove(self, item_id):
+        name = self.names.pop(item_id, None)
+        if name is None:
+            return False
+        description = self.descriptions.pop(item_id)
+        for gram in trigrams(name) | trigrams(description):
+            posting = self.postings[gram]
+            posting.discard(item_id)
+            if not posting:
+                del self.postings[gram]
+        return True
+
+    def _candidates(self, terms):
+        grams = set().union(*map(trigrams, terms))
+        if not grams:
+            return self.names.keys()
+        sets = []
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if not posting:
+                # no indexed text has this trigram, so none can contain the term
+                return ()
+            sets.append(posting)
+        sets.sort(key=len)
+        return set(sets[0]).intersection(*sets[1:])
+
+    def _rank(self, name, query):
+        if name == query:
+            return 0
+        if name.startswith(query):
+            return 1
+        position = name.find(query)
+        if position > 0 and name[position - 1] == ' ':
+            return 2
+        if position >= 0:
+            return 3
+        return 4
+
+    def search(self, query, limit=None, within=None):
+        """Ids matching every term of ``query``, best first.
+
+        Returns ``(ids, total)``: at most ``limit`` ids, and how many
+        matched in all. ``within`` restricts the results to a set of ids.
+        """
+        query = normalize(query)
+        terms = query.split()
+        if not terms:
+            return [], 0
+        ranked = []
+        for item_id in self._candidates(terms):
+            if within is not None and item_id not in within:
+                continue
+            name, description = self.names[item_id], self.descriptions[item_id]
+            if all(term in name or term in description for term in terms):
+                rank = self._rank(name, query)
+                if rank == 4 and not all(term in name for term in terms):
+                    rank = 5
+                ranked.append((rank, name, item_id))
+        total = len(ranked)
+        if limit is not None and total > limit:
+            ranked = heapq.nsmallest(limit, ranked, key=lambda entry: entry[:2])
+        else:
+            ranked.sort(key=lambda entry: entry[:2])
+        return [item_id for _, _, item_id in ranked], total
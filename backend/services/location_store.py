@@ -0,0 +1,55 @@
+class LocationStore:
+    """The player's saved map locations, keyed by id.
+
+    Wraps ``player.locations``, the list the player store saves record by
+    record, with an id -> position map so putting or deleting one location
+    never scans the list. Nothing is read from disk until ``load()``, which
+    the map calls the first time it is shown.
+    """
+
+    def __init__(self, player):
+        self.player = player
+        self._positions = None
+
+    def __len__(self):
+        return len(self._positions or ())
+
+    def __contains__(self, location_id):
+        return self._positions is not None and location_id in self._positions
+
+    @property
+    def loaded(self):
+        return self._positions is not None
+
+    def load(self):
+        """The saved location dicts, read from the player's store on the first call"""
+        if self._positions is None:
+            items = self.player.load_locations()
+            self._positions = {str(item['id']): i for i, item in enumerate(items)}
+        return self.player.locations
+
+    def put(self, data):
+        """Save a location dict, replacing the one saved under the same id"""
+        items = self.load()
+        location_id = str(data['id'])
+        position = self._positions.get(location_id)
+        if position is None:
+            self._positions[location_id] = len(items)
+            items.append(data)
+        else:
+            items[position] = data
+        self.player.request_save()
+
+    def delete(self, location_id):
+        """Forget a location; False if it wasn't saved"""
+        items = self.load()
+        position = self._positions.pop(str(location_id), None)
+        if position is None:
+            return False
+        # fill the hole with the last location so no other position moves
+        last = items.pop()
+        if position < len(items):
+            items[position] = last
+            self._positions[str(last['id'])] = position
+        self.player.request_save()
+        return True
@@ -0,0 +1,306 @@
+import base64
+import math
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+import numpy as np
+from services.calendar_raster import iter_png
+
+TILE_SIZE = 256
+# next to the code rather than the working directory, so the app and the
+# tests find it wherever they are started from
+WORLD_MAP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'world_map.png')
+
+
+def read_png(data):
+    """Palette indices and palette of an 8-bit indexed PNG.
+
+    Only non-interlaced images whose rows use the None, Sub or Up filters
+    are read, which covers everything ``iter_png`` writes.
+    """
+    if data[:8] != b'\x89PNG\r\n\x1a\n':
+        raise ValueError("not a PNG file")
+    header = palette = None
+    compressed = []
+    position = 8
+    while position < len(data):
+        length, kind = struct.unpack('>I4s', data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        position += length + 12
+        if kind == b'IHDR':
+            header = struct.unpack('>IIBBBBB', body)
+        elif kind == b'PLTE':
+            palette = tuple(tuple(body[i:i + 3]) for i in range(0, len(body), 3))
+        elif kind == b'IDAT':
+            compressed.append(body)
+        elif kind == b'IEND':
+            break
+    if header is None or palette is None:
+        raise ValueError("PNG has no header or palette")
+    width, height, depth, color_type, _, _, interlace = header
+    if (depth, color_type, interlace) != (8, 3, 0):
+        raise ValueError("expected a non-interlaced 8-bit palette PNG")
+    raw = np.frombuffer(zlib.decompress(b''.join(compressed)), dtype=np.uint8).reshape(height, width + 1)
+    pixels = raw[:, 1:].copy()
+    for row in np.flatnonzero(raw[:, 0]):
+        row_filter = raw[row, 0]
+        if row_filter == 1:
+            pixels[row] = np.cumsum(pixels[row], dtype=np.uint8)
+        elif row_filter == 2:
+            if row:
+                pixels[row] += pixels[row - 1]
+        else:
+            raise ValueError(f"unsupported PNG row filter {row_filter}")
+    return pixels, palette
+
+
+class SourceMap:
+    """The bundled map image the tile pyramid is cut from.
+
+    An equirectangular world map kept as an 8-bit palette PNG, so it is
+    small and decodes with zlib alone. It is read when the first tile is
+    rendered, not at startup. Every tile samples it at the tile's pixel
+    centres, so zoomed-out tiles are subsampled and tiles past the image's
+    own resolution are plain enlargements.
+    """
+
+    def __init__(self, path=WORLD_MAP):
+        self.path = path
+        self._version = None
+        self._pixels = None
+        self._palette = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        """Names the tile cache after the image's contents, so a new image gets fresh tiles"""
+        if self._version is None:
+            with open(self.path, 'rb') as f:
+                checksum = zlib.crc32(f.read())
+            name = os.path.splitext(os.path.basename(self.path))[0]
+            self._version = f"{name}-{checksum:08x}"
+        return self._version
+
+    def _load(self):
+        with self._lock:
+            if self._pixels is None:
+                with open(self.path, 'rb') as f:
+                    self._pixels, self._palette = read_png(f.read())
+
+    @property
+    def palette(self):
+        self._load()
+        return self._palette
+
+    def render(self, level, tx, ty, size=TILE_SIZE):
+        """Palette indices for tile ``(tx, ty)`` of ``level``, sampled at pixel centres"""
+        self._load()
+        height, width = self._pixels.shape
+        n = 1 << level
+        steps = (np.arange(size) + 0.5) / (size * n)
+        columns = ((tx / n + steps) * width).astype(np.intp)
+        rows = ((ty / n + steps) * height).astype(np.intp)
+        return self._pixels[np.ix_(rows, columns)]
+
+
+def encode_tile(pixels, palette):
+    """An indexed PNG of a tile's palette indices"""
+    height, width = pixels.shape
+    return b''.join(iter_png(width, height, (row.tobytes() for row in pixels),
+                             palette=palette, transparent=()))
+
+
+class TileCache:
+    """Tiles of the source pyramid, through an in-memory and an on-disk LRU.
+
+    ``get`` looks in memory (base64 strings ready for ``ft.Image``), then
+    on disk (PNG files under ``directory/<source version>``), and only then
+    renders the tile from the source. Both levels evict their least
+    recently used tiles once they pass their byte budget; disk recency is
+    kept in file mtimes so it survives restarts. ``memory_hits``,
+    ``disk_hits`` and ``renders`` count where tiles came from.
+
+    Cutting and encoding a tile takes up to about 20 milliseconds, and the
+    first one also decodes the source image, so the map asks for uncached
+    tiles with ``request()`` and a background worker renders them while
+    frames keep drawing what is already cached.
+    """
+
+    MAX_LEVEL = 5
+
+    def __init__(self, source, directory='data/tiles', memory_bytes=8 << 20, disk_bytes=64 << 20):
+        self.source = source
+        self.root = directory
+        self._directory = None
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.renders = 0
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._disk = None  # file name -> size, oldest first; scanned on first use
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self._queue = OrderedDict()  # tile key -> on_ready, next to render first
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def directory(self):
+        """``root/<source version>``, worked out when a tile is first looked up rather than on construction"""
+        if self._directory is None:
+            self._directory = os.path.join(self.root, self.source.version)
+        return self._directory
+
+    def level_for(self, span_px):
+        """Coarsest level whose tiles aren't stretched past ``TILE_SIZE`` over ``span_px``"""
+        if span_px <= TILE_SIZE:
+            return 0
+        return min(self.MAX_LEVEL, math.ceil(math.log2(span_px / TILE_SIZE)))
+
+    @staticmethod
+    def covering(level, left, top, right, bottom):
+        """Tile keys ``(level, x, y)`` overlapping a map rectangle in 0-1 units"""
+        n = 1 << level
+        first_x, last_x = max(0, math.floor(left * n)), min(n - 1, math.ceil(right * n) - 1)
+        first_y, last_y = max(0, math.floor(top * n)), min(n - 1, math.ceil(bottom * n) - 1)
+        return [(level, x, y) for y in range(first_y, last_y + 1) for x in range(first_x, last_x + 1)]
+
+    def cached(self, key):
+        """True if the tile is in memory or on disk, so ``get`` won't render it"""
+        with self._lock:
+            if self._disk is None:
+                self._scan()
+            return key in self._memory or self._name(key) in self._disk
+
+    def get(self, level, x, y):
+        """Base64 PNG of a tile, rendering it here if it isn't cached"""
+        key = (level, x, y)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+            png = self._read(key)
+            if png is not None:
+                self.disk_hits += 1
+                return self._remember(key, png)
+        png = encode_tile(self.source.render(level, x, y), self.source.palette)
+        with self._lock:
+            self.renders += 1
+            self._write(key, png)
+            return self._remember(key, png)
+
+    def request(self, keys, on_ready):
+        """Render uncached tiles in the background, in the order given.
+
+        Replaces the previous request, so tiles that have left the view
+        since are dropped unrendered. ``on_ready()`` is called from the
+        worker after each tile.
+        """
+        with self._lock:
+            self._queue = OrderedDict((key, on_ready) for key in keys)
+            if not keys:
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tile-renderer", daemon=True)
+                self._thread.start()
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                if not self._queue:
+                    self._wake.clear()
+                    continue
+                key, on_ready = self._queue.popitem(last=False)
+            if self.cached(key):
+                continue
+            try:
+                self.get(*key)
+                on_ready()
+            except Exception as e:
+                print(f"Error: could not render map tile {key}: {e}")
+
+    def _remember(self, key, png):
+        data = base64.b64encode(png).decode('ascii')
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+        return data
+
+    @staticmethod
+    def _name(key):
+        return "{}-{}-{}.png".format(*key)
+
+    def _scan(self):
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.png'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+                elif entry.name.endswith('.tmp'):
+                    # left by a write the app was closed in the middle of;
+                    # newer ones may still be being written by another cache
+                    try:
+                        if time.time() - entry.stat().st_mtime > 60:
+                            os.remove(entry.path)
+                    except OSError:
+                        pass
+        entries.sort()
+        self._disk = OrderedDict((name, size) for _, name, size in entries)
+        self._disk_size = sum(self._disk.values())
+
+    def _read(self, key):
+        if self._disk is None:
+            self._scan()
+        name = self._name(key)
+        if name not in self._disk:
+            return None
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, 'rb') as f:
+                png = f.read()
+            os.utime(path)
+        except OSError as e:
+            print(f"Error: could not read map tile {name}: {e}")
+            self._disk_size -= self._disk.pop(name)
+            return None
+        self._disk.move_to_end(name)
+        return png
+
+    def _write(self, key, png):
+        name = self._name(key)
+        path = os.path.join(self.directory, name)
+        # another renderer may be writing the same tile
+        temporary = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, 'wb') as f:
+                f.write(png)
+            os.replace(temporary, path)
+        except OSError as e:
+            print(f"Error: could not cache map tile {name}: {e}")
+            return
+        self._disk_size += len(png) - self._disk.pop(name, 0)
+        self._disk[name] = len(png)
+        while self._disk_size > self.disk_bytes and len(self._disk) > 1:
+            evicted, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            try:
+                os.remove(os.path.join(self.directory, evicted))
+            except OSError:
+                pass
+
+    def __repr__(self):
+        return (f"TileCache(memory_hits={self.memory_hits}, disk_hits={self.disk_hits}, "
+                f"renders={self.renders}, memory_bytes={self._memory_size}, disk_bytes={self._disk_size})")
@@ -0,0 +1,94 @@
+from typing import NamedTuple
+
+
+class Cluster(NamedTuple):
+    level: int
+    key: tuple
+    count: int
+    x: float
+    y: float
+    point_id: object  # the only member when count == 1, else None
+
+
+class PinClusters:
+    """Grid clusters of map points at a fixed set of zoom levels.
+
+    Level ``i`` splits the unit square into ``LEVELS[i]`` cells per side.
+    Each level doubles the count of the one before, so a cluster's
+    children are the four cells under it one level down. Every point is
+    kept in its cell at every level together with the cell's coordinate
+    sums, so add and remove cost one update per level and a frame only
+    reads the cells already built for the current zoom.
+    """
+
+    LEVELS = (4, 8, 16, 32, 64, 128)
+
+    def __init__(self, min_cell_px=40):
+        self.min_cell_px = min_cell_px
+        self.points = {}
+        # per level: cell -> [ids, sum_x, sum_y]
+        self.cells = [{} for _ in self.LEVELS]
+
+    def __len__(self):
+        return len(self.points)
+
+    @staticmethod
+    def _cell(value, cells):
+        return min(cells - 1, max(0, int(value * cells)))
+
+    def add(self, point_id, x, y):
+        """Add a point, or move it if ``point_id`` is already clustered"""
+        if point_id in self.points:
+            self.remove(point_id)
+        self.points[point_id] = (x, y)
+        for cells, level in zip(self.LEVELS, self.cells):
+            entry = level.setdefault((self._cell(x, cells), self._cell(y, cells)), [set(), 0.0, 0.0])
+            entry[0].add(point_id)
+            entry[1] += x
+            entry[2] += y
+
+    def remove(self, point_id):
+        point = self.points.pop(point_id, None)
+        if point is None:
+            return False
+        x, y = point
+        for cells, level in zip(self.LEVELS, self.cells):
+            key = self._cell(x, cells), self._cell(y, cells)
+            entry = level[key]
+            entry[0].discard(point_id)
+            if entry[0]:
+                entry[1] -= x
+                entry[2] -= y
+            else:
+                del level[key]
+        return True
+
+    def level_for(self, width_px, height_px):
+        """Finest level whose cells are still at least ``min_cell_px`` on screen"""
+        best = 0
+        for i, cells in enumerate(self.LEVELS):
+            if min(width_px, height_px) / cells >= self.min_cell_px:
+                best = i
+        return best
+
+    def clusters(self, level, left, top, right, bottom):
+        """Yield the clusters at ``level`` whose cells overlap the rectangle"""
+        if left > right or top > bottom:
+            return
+        cells, entries = self.LEVELS[level], self.cells[level]
+        first_x, last_x = self._cell(left, cells), self._cell(right, cells)
+        first_y, last_y = self._cell(top, cells), self._cell(bottom, cells)
+        if (last_x - first_x + 1) * (last_y - first_y + 1) >= len(entries):
+            keys = [key for key in entries if first_x <= key[0] <= last_x and first_y <= key[1] <= last_y]
+        else:
+            keys = [(cx, cy) for cx in range(first_x, last_x + 1) for cy in range(first_y, last_y + 1)
+                    if (cx, cy) in entries]
+        for key in keys:
+            ids, sum_x, sum_y = entries[key]
+            count = len(ids)
+            yield Cluster(level, key, count, sum_x / count, sum_y / count,
+                          next(iter(ids)) if count == 1 else None)
+
+    def members(self, level, key):
+        entry = self.cells[level].get(key)
+        return set(entry[0]) if entry else set()
@@ -0,0 +1,55 @@
+from bisect import bisect_left, insort
+from itertools import count
+
+
+class SortedViews:
+    """Items kept in several sort orders at once, one sorted list per order.
+
+    ``keys`` maps a view name to a function giving an item's sort key.
+    Each list holds ``(key, seq, id)`` entries; ``seq`` is the order items
+    were added in, which keeps equal keys stable and makes every entry
+    unique. Adding or removing an item bisects to its slot in every view,
+    so switching views never sorts.
+    """
+
+    def __init__(self, keys, item_id=lambda item: item.id):
+        self.keys = keys
+        self.item_id = item_id
+        self.views = {name: [] for name in keys}
+        self._entries = {}
+        self._seq = count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, item):
+        """Insert ``item``, or re-sort it if it is already present"""
+        item_id = self.item_id(item)
+        self.remove(item_id)
+        seq = next(self._seq)
+        entries = {name: (key(item), seq, item_id) for name, key in self.keys.items()}
+        for name, entry in entries.items():
+            insort(self.views[name], entry)
+        self._entries[item_id] = entries
+
+    def remove(self, item_id):
+        entries = self._entries.pop(item_id, None)
+        if entries is None:
+            return False
+        for name, entry in entries.items():
+            view = self.views[name]
+            del view[bisect_left(view, entry)]
+        return True
+
+    def ids(self, name, limit=None, within=None):
+        """The first ``limit`` ids in view ``name``, optionally only those in ``within``"""
+        view = self.views[name]
+        if within is None:
+            return [entry[2] for entry in view[:limit]]
+        ids = []
+        for entry in view:
+            if limit is not None and len(ids) >= limit:
+                break
+            if entry[2] in within:
+                ids.append(entry[2])
+        return ids
@@ -0,0 +1,77 @@
+from collections import defaultdict
+
+
+class SpatialIndex:
+    """Uniform grid over the unit square for points keyed by id.
+
+    Points live in ``cells x cells`` buckets, so a rectangle query only
+    looks at the buckets it overlaps, and insert, move and remove are O(1).
+    Coordinates outside 0-1 are clamped to the border buckets.
+    """
+
+    def __init__(self, cells=64):
+        self.cells = cells
+        self.points = {}
+        self.buckets = defaultdict(set)
+
+    def __len__(self):
+        return len(self.points)
+
+    def __contains__(self, point_id):
+        return point_id in self.points
+
+    def _cell(self, value):
+        return min(self.cells - 1, max(0, int(value * self.cells)))
+
+    def insert(self, point_id, x, y):
+        """Add a point, or move it if ``point_id`` is already indexed"""
+        if point_id in self.points:
+            self.remove(point_id)
+        self.points[point_id] = (x, y)
+        self.buckets[self._cell(x), self._cell(y)].add(point_id)
+
+    def remove(self, point_id):
+        point = self.points.pop(point_id, None)
+        if point is None:
+            return False
+        key = self._cell(point[0]), self._cell(point[1])
+        bucket = self.buckets[key]
+        bucket.discard(point_id)
+        if not bucket:
+            del self.buckets[key]
+        return True
+
+    def query(self, left, top, right, bottom):
+        """Yield the ids of points inside the rectangle, edges included"""
+        if left > right or top > bottom:
+            return
+        first_x, last_x = self._cell(left), self._cell(right)
+        first_y, last_y = self._cell(top), self._cell(bottom)
+        if (last_x - first_x + 1) * (last_y - first_y + 1) >= len(self.buckets):
+            keys = [key for key in self.buckets if first_x <= key[0] <= last_x and first_y <= key[1] <= last_y]
+        else:
+            keys = [(cx, cy) for cx in range(first_x, last_x + 1) for cy in range(first_y, last_y + 1)
+                    if (cx, cy) in self.buckets]
+        for key in keys:
+            inner = first_x < key[0] < last_x and first_y < key[1] < last_y
+            for point_id in self.buckets[key]:
+                if inner:
+                    yield point_id
+                else:
+                    x, y = self.points[point_id]
+                    if left <= x <= right and top <= y <= bottom:
+                        yield point_id
+
+    def nearest(self, x, y, radius_x, radius_y):
+        """The id of the closest point within the ellipse of the given radii, or None.
+
+        Separate radii let callers pass a pixel tolerance converted to map
+        units, which differ per axis when the map isn't square.
+        """
+        best, best_distance = None, 1.0
+        for point_id in self.query(x - radius_x, y - radius_y, x + radius_x, y + radius_y):
+            px, py = self.points[point_id]
+            distance = ((px - x) / radius_x) ** 2 + ((py - y) / radius_y) ** 2
+            if distance <= best_distance:
+                best, best_distance = point_id, distance
+        return best
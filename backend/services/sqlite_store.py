@@ -0,0 +1,337 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+from models.completion_history import CompletionHistory
+from services.journal import PlayerJournal, json_default
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS player (
+    field TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS habits (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT,
+    frequency TEXT,
+    streak INTEGER NOT NULL DEFAULT 0,
+    xp INTEGER NOT NULL DEFAULT 10,
+    completed_today INTEGER NOT NULL DEFAULT 0,
+    last_completed TEXT,
+    created_at TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS habits_by_position ON habits (position);
+CREATE TABLE IF NOT EXISTS habit_completions (
+    habit_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    PRIMARY KEY (habit_id, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS locations (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    x REAL NOT NULL,
+    y REAL NOT NULL,
+    visit_type TEXT,
+    visited INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS locations_by_created_at ON locations (created_at);
+CREATE TABLE IF NOT EXISTS quests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    quest_type TEXT,
+    rarity TEXT,
+    xp_reward INTEGER NOT NULL DEFAULT 0,
+    gold_reward INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quests_by_position ON quests (position);
+"""
+
+HABIT_COLUMNS = ('id', 'name', 'type', 'frequency', 'streak', 'xp', 'completed_today', 'last_completed', 'created_at')
+LOCATION_COLUMNS = ('id', 'name', 'description', 'x', 'y', 'visit_type', 'visited', 'created_at', 'updated_at')
+# what a compact location dict (see ``Location.to_dict``) leaves out
+LOCATION_DEFAULTS = {'description': "", 'visit_type': 'OTHER', 'visited': False, 'created_at': 0.0}
+QUEST_COLUMNS = ('name', 'description', 'quest_type', 'rarity', 'xp_reward', 'gold_reward', 'completed', 'state')
+
+
+class SQLiteStore:
+    """Embedded SQLite storage for the player, habits, locations and quests.
+
+    Speaks the same record protocol as ``PlayerJournal``: ``append`` turns
+    each changed field or record into a point update inside one transaction.
+    """
+
+    def __init__(self, path='data/life_rpg.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._written = 0
+        self._acks = []
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def needs_compaction(self, incoming=0):
+        return False
+
+    def append(self, records):
+        """Apply mutation records as point updates in a single transaction.
+
+        Returns the number of bytes bound into the written rows.
+        """
+        if not records:
+            return 0
+        return self._commit(records)
+
+    def compact(self, state):
+        """Replace everything with the given full state"""
+        return self._commit({'op': 'set', 'field': field, 'value': value} for field, value in state.items())
+
+    def _commit(self, records):
+        """Apply records in one transaction.
+
+        Completion changes are only acknowledged to their histories once
+        the transaction has committed, so a rolled-back save leaves them
+        pending for the next one.
+        """
+        with self._lock:
+            self._written = 0
+            self._acks = []
+            with self._conn:
+                for record in records:
+                    self._apply(record)
+            for history, added, removed in self._acks:
+                history.acknowledge(added, removed)
+            self._acks = []
+            return self._written
+
+    def load(self):
+        """Return the stored player state, or raise FileNotFoundError if empty.
+
+        Raises ValueError when a row can't be read. Locations are left out;
+        ``load_locations`` reads them when the map first needs them.
+        """
+        with self._lock:
+            try:
+                rows = self._conn.execute("SELECT field, value FROM player").fetchall()
+                if not rows:
+                    raise FileNotFoundError(self.path)
+                state = {row['field']: json.loads(row['value']) for row in rows}
+                state['habits'] = [
+                    self._habit_from_row(row)
+                    for row in self._conn.execute("SELECT * FROM habits ORDER BY position")
+                ]
+                state['quests'] = [
+                    self._quest_from_row(row)
+                    for row in self._conn.execute("SELECT * FROM quests ORDER BY position")
+                ]
+            except sqlite3.DatabaseError as e:
+                raise ValueError(f"{self.path}: {e}") from e
+        return state
+
+    def quarantine(self):
+        """Copy the database aside before anything is saved over it; returns the copy's path"""
+        target = f"{self.path}.{datetime.now():%Y%m%d-%H%M%S}.corrupt"
+        with self._lock:
+            try:
+                copy = sqlite3.connect(target)
+                try:
+                    self._conn.backup(copy)
+                finally:
+                    copy.close()
+            except sqlite3.DatabaseError:
+                # too damaged to read page by page; keep the raw files instead
+                for suffix in ('', '-wal'):
+                    if os.path.exists(self.path + suffix):
+                        shutil.copyfile(self.path + suffix, target + suffix)
+        return target
+
+    def migrate_from(self, legacy):
+        """One-shot import of a JSON store (e.g. ``PlayerJournal``) into SQLite"""
+        with self._lock:
+            done = self._conn.execute("SELECT value FROM meta WHERE key = 'migrated_from'").fetchone()
+        if done:
+            return False
+        try:
+            state = legacy.load()
+        except (FileNotFoundError, ValueError):
+            state = None
+        with self._lock, self._conn:
+            if state is not None:
+                for field, value in state.items():
+                    self._apply({'op': 'set', 'field': field, 'value': value})
+            self._acks = []  # nothing live to acknowledge to
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from', ?)",
+                (getattr(legacy, 'snapshot_path', type(legacy).__name__),)
+            )
+        return state is not None
+
+    def completions(self, habit_id, since=None):
+        """Dates a habit was completed on, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date FROM habit_completions WHERE habit_id = ? AND date >= ? ORDER BY date",
+                (str(habit_id), since or '')
+            ).fetchall()
+        return [row['date'] for row in rows]
+
+    def load_locations(self):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(LOCATION_COLUMNS)} FROM locations ORDER BY created_at"
+            ).fetchall()
+        return [self._location_from_row(row) for row in rows]
+
+    def _write(self, sql, params=()):
+        self._conn.execute(sql, params)
+        self._written += sum(
+            len(p) if isinstance(p, (str, bytes)) else 8
+            for p in params if p is not None
+        )
+
+    def _write_many(self, sql, rows):
+        rows = list(rows)
+        self._conn.executemany(sql, rows)
+        self._written += sum(
+            len(p) if isinstance(p, (str, bytes)) else 8
+            for params in rows for p in params if p is not None
+        )
+
+    def _apply(self, record):
+        op = record['op']
+        if op == 'put':
+            if record['section'] == 'habits':
+                self._put_habit(record['record'])
+            elif record['section'] == 'locations':
+                self._put_location(record['record'])
+        elif op == 'del':
+            if record['section'] == 'habits':
+                self._write("DELETE FROM habits WHERE id = ?", (str(record['id']),))
+                self._write("DELETE FROM habit_completions WHERE habit_id = ?", (str(record['id']),))
+            elif record['section'] == 'locations':
+                self._write("DELETE FROM locations WHERE id = ?", (str(record['id']),))
+        elif record['field'] == 'habits':
+            self._write("DELETE FROM habits")
+            self._write("DELETE FROM habit_completions")
+            for position, habit in enumerate(record['value']):
+                self._put_habit(habit, position, rewrite=True)
+        elif record['field'] == 'locations':
+            self._write("DELETE FROM locations")
+            for location in record['value']:
+                self._put_location(location)
+        elif record['field'] == 'quests':
+            self._write("DELETE FROM quests")
+            for position, quest in enumerate(record['value']):
+                self._write(
+                    f"INSERT INTO quests (position, {', '.join(QUEST_COLUMNS)}) "
+                    f"VALUES (?, {', '.join('?' * len(QUEST_COLUMNS))})",
+                    (position, *(quest.get(c) for c in QUEST_COLUMNS))
+                )
+        else:
+            self._write(
+                "INSERT OR REPLACE INTO player (field, value) VALUES (?, ?)",
+                (record['field'], json.dumps(record['value'], default=json_default))
+            )
+
+    def _put_habit(self, habit, position=None, rewrite=False):
+        if position is None:
+            row = self._conn.execute("SELECT position FROM habits WHERE id = ?", (str(habit['id']),)).fetchone()
+            if row is None:
+                row = self._conn.execute("SELECT COALESCE(MAX(position) + 1, 0) AS position FROM habits").fetchone()
+            position = row['position']
+        extra = {k: v for k, v in habit.items() if k not in HABIT_COLUMNS}
+        self._write(
+            f"INSERT OR REPLACE INTO habits (position, {', '.join(HABIT_COLUMNS)}, extra) "
+            f"VALUES (?, {', '.join('?' * len(HABIT_COLUMNS))}, ?)",
+            (position, str(habit['id']), *(habit.get(c) for c in HABIT_COLUMNS[1:]),
+             json.dumps(extra, default=json_default) if extra else None)
+        )
+        # the bitset in ``extra`` is what gets loaded; keep the queryable
+        # completions table in step with it
+        history = habit.get('history')
+        if isinstance(history, CompletionHistory) and not rewrite:
+            added, removed = history.pending_changes()
+            self._acks.append((history, added, removed))
+            self._write_many(
+                "INSERT OR IGNORE INTO habit_completions (habit_id, date) VALUES (?, ?)",
+                ((str(habit['id']), day.isoformat()) for day in added)
+            )
+            self._write_many(
+                "DELETE FROM habit_completions WHERE habit_id = ? AND date = ?",
+                ((str(habit['id']), day.isoformat()) for day in removed)
+            )
+        else:
+            # a serialized or legacy history has no pending changes to go
+            # by, so its rows are written out in full
+            if isinstance(history, CompletionHistory):
+                self._acks.append((history, *history.pending_changes()))
+            if not rewrite:
+                self._write("DELETE FROM habit_completions WHERE habit_id = ?", (str(habit['id']),))
+            self._write_many(
+                "INSERT OR IGNORE INTO habit_completions (habit_id, date) VALUES (?, ?)",
+                ((str(habit['id']), day.isoformat()) for day in CompletionHistory.for_habit(dict(habit)).dates())
+            )
+
+    def _put_location(self, location):
+        location = dict(LOCATION_DEFAULTS, **location)
+        location.setdefault('updated_at', location['created_at'])
+        self._write(
+            f"INSERT OR REPLACE INTO locations ({', '.join(LOCATION_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(LOCATION_COLUMNS))})",
+            tuple(location[c] for c in LOCATION_COLUMNS)
+        )
+
+    @staticmethod
+    def _habit_from_row(row):
+        habit = {c: row[c] for c in HABIT_COLUMNS}
+        habit['completed_today'] = bool(habit['completed_today'])
+        if row['extra']:
+            habit.update(json.loads(row['extra']))
+        return habit
+
+    @staticmethod
+    def _location_from_row(row):
+        """The row as a compact location dict, leaving out default values"""
+        location = {'id': row['id'], 'name': row['name'], 'x': row['x'], 'y': row['y']}
+        for column, default in LOCATION_DEFAULTS.items():
+            if row[column] and row[column] != default:
+                location[column] = row[column]
+        if row['updated_at'] != row['created_at']:
+            location['updated_at'] = row['updated_at']
+        if 'visited' in location:
+            location['visited'] = True
+        return location
+
+    @staticmethod
+    def _quest_from_row(row):
+        quest = {c: row[c] for c in QUEST_COLUMNS}
+        quest['completed'] = bool(quest['completed'])
+        return quest
+
+
+def open_store(path='data/life_rpg.db', legacy=None):
+    """Open the SQLite store, importing the legacy JSON profile on first run"""
+    store = SQLiteStore(path)
+    store.migrate_from(legacy or PlayerJournal())
+    return store
@@ -0,0 +1,68 @@
+import threading
+
+
+class WriteBehindSaver:
+    """Coalesces bursts of save requests into one save on a background worker.
+
+    Event handlers call ``request()`` and return immediately; the worker waits
+    ``delay`` seconds for the burst to settle and then runs ``save`` once.
+    """
+
+    def __init__(self, save, delay=0.5):
+        self._save = save
+        self.delay = delay
+        self.requests = 0
+        self.saves = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        """Mark state dirty and wake the worker"""
+        if self._closed.is_set():
+            self._save()
+            return
+        with self._lock:
+            self._dirty = True
+            self.requests += 1
+        self._wake.set()
+
+    def flush(self):
+        """Run any pending save now, on the calling thread"""
+        self._save_pending()
+
+    def close(self):
+        """Stop the worker and flush whatever is still pending"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            # let the rest of the burst arrive before writing
+            if self._closed.wait(self.delay):
+                return
+            self._wake.clear()
+            self._save_pending()
+
+    def _save_pending(self):
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+            try:
+                self._save()
+                self.saves += 1
+            except Exception as e:
+                with self._lock:
+                    self._dirty = True
+                print(f"Error: background save failed: {e}")
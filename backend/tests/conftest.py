@@ -0,0 +1,19 @@
+import pytest
+from models.player import Player
+from services.habit_schedule import HabitScheduler
+from services.habit_service import HabitService
+from services.sqlite_store import SQLiteStore
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    """A fresh SQLite store that ``Player`` saves to and loads from"""
+    store = SQLiteStore(str(tmp_path / 'life_rpg.db'))
+    monkeypatch.setattr(Player, 'store', store)
+    return store
+
+
+@pytest.fixture
+def service(store):
+    """A habit service over a new, empty player"""
+    return HabitService(Player(), HabitScheduler())
@@ -0,0 +1,57 @@
+import io
+import re
+import zlib
+from datetime import date
+from xml.etree import ElementTree
+import pytest
+from models.life_calendar import LifeCalendar
+from services.calendar_export import export_calendar, export_pdf, export_png, export_svg
+from services.calendar_raster import WEEKS_PER_YEAR, GridLayout
+from services.map_tiles import read_png
+
+
+@pytest.fixture
+def calendar():
+    calendar = LifeCalendar(date(1990, 6, 15), 80)
+    calendar.advance(date(2024, 3, 6))
+    return calendar
+
+
+def test_svg_draws_every_week_once(calendar):
+    f = io.StringIO()
+    export_svg(calendar, f)
+    root = ElementTree.fromstring(f.getvalue())
+    paths = root.findall('{http://www.w3.org/2000/svg}path')
+    cells = {css: sum(p.get('d').count('M') for p in paths if p.get('class') == css) for css in 'lr'}
+    assert cells == {'l': calendar.lived_weeks, 'r': calendar.remaining_weeks}
+
+
+def test_png_is_the_grid_at_poster_size(calendar):
+    f = io.BytesIO()
+    export_png(calendar, f)
+    pixels, _ = read_png(f.getvalue())
+    layout = GridLayout(80, 40, 8)
+    assert pixels.shape == (layout.height, layout.width)
+
+
+def test_pdf_has_a_valid_xref_and_one_rectangle_per_week(calendar):
+    f = io.BytesIO()
+    export_pdf(calendar, f)
+    data = f.getvalue()
+    assert data.startswith(b'%PDF-1.4')
+    xref = int(re.search(rb'startxref\n(\d+)', data).group(1))
+    assert data[xref:].startswith(b'xref')
+    for number, offset in enumerate(re.findall(rb'(\d{10}) 00000 n', data), start=1):
+        assert data[int(offset):].startswith(b'%d 0 obj' % number)
+    start = data.index(b'stream\n') + len(b'stream\n')
+    length = int(re.search(rb'6 0 obj\n(\d+)', data).group(1))
+    content = zlib.decompress(data[start:start + length])
+    assert content.count(b' re\n') == 80 * WEEKS_PER_YEAR
+
+
+def test_export_picks_the_format_from_the_extension(calendar, tmp_path):
+    for name in ('grid.svg', 'grid.PNG', 'grid.pdf'):
+        export_calendar(calendar, str(tmp_path / name))
+    assert (tmp_path / 'grid.PNG').read_bytes().startswith(b'\x89PNG')
+    with pytest.raises(ValueError):
+        export_calendar(calendar, str(tmp_path / 'grid.gif'))
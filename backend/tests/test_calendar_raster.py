@@ -0,0 +1,41 @@
+import random
+import pytest
+from services.calendar_raster import (
+    BACKGROUND, LIVED, LIVED_BORDER, REMAINING, REMAINING_BORDER, WEEKS_PER_YEAR,
+    GridLayout, lived_per_year, render_png,
+)
+from services.map_tiles import read_png
+
+
+def test_week_at_finds_cells_and_skips_gaps():
+    layout = GridLayout(80, cell=10, gap=2)
+    assert layout.week_at(0, 0) == (0, 0)
+    assert layout.week_at(9.9, 9.9) == (0, 0)
+    assert layout.week_at(12, 24) == (2, 1)
+    assert layout.week_at(10, 5) is None  # gap between weeks
+    assert layout.week_at(5, 11) is None  # gap between years
+    assert layout.week_at(-1, 5) is None
+    assert layout.week_at(layout.width, 5) is None
+    assert layout.week_at(5, layout.height) is None
+
+
+@pytest.mark.parametrize('cell, gap', [(10, 2), (4, 1), (40, 8)])
+def test_week_at_agrees_with_the_rendered_pixels(cell, gap):
+    layout = GridLayout(12, cell, gap)
+    per_year = lived_per_year(300, 12)
+    pixels, _ = read_png(render_png(layout, per_year))
+    assert pixels.shape == (layout.height, layout.width)
+    rng = random.Random(cell)
+    for _ in range(2000):
+        x, y = rng.randrange(layout.width), rng.randrange(layout.height)
+        week = layout.week_at(x, y)
+        if week is None:
+            assert pixels[y, x] == BACKGROUND
+        else:
+            year, week_num = week
+            lived = week_num < per_year[year]
+            assert pixels[y, x] in ((LIVED, LIVED_BORDER) if lived else (REMAINING, REMAINING_BORDER))
+
+
+def test_lived_weeks_fill_year_rows_in_order():
+    assert lived_per_year(WEEKS_PER_YEAR + 3, 3) == [WEEKS_PER_YEAR, 3, 0]
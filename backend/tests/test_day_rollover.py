@@ -0,0 +1,40 @@
+import asyncio
+from datetime import date, datetime
+from services.day_rollover import DayRollover, FakeClock
+
+
+async def run_until(rollover, clock, end):
+    task = asyncio.ensure_future(rollover.run())
+    while clock.now() < end:
+        await asyncio.sleep(0)
+    task.cancel()
+
+
+def test_crossing_midnight_resets_flags_and_streaks_once(service):
+    done_today = service.add("Read", 'MENTAL', "Daily")['id']
+    missed_today = service.add("Run", 'PHYSICAL', "Daily")['id']
+    for day in (date(2024, 3, 5), date(2024, 3, 6)):
+        service.toggle(done_today, day)
+    service.toggle(missed_today, date(2024, 3, 5))
+    service.player.daily_streak = 4
+    service.player.last_login = datetime(2024, 3, 5, 9)
+    notifications = []
+    service.subscribe(notifications.append)
+
+    clock = FakeClock(datetime(2024, 3, 6, 23, 50))
+    rollover = DayRollover(service.player, service, clock=clock)
+    asyncio.run(run_until(rollover, clock, datetime(2024, 3, 7, 6)))
+
+    assert rollover.rollovers == 1
+    assert len(notifications) == 1
+    read, run = service.get(done_today), service.get(missed_today)
+    assert (read['completed_today'], read['streak']) == (False, 2)
+    assert (run['completed_today'], run['streak']) == (False, 0)
+    assert service.player.daily_streak == 0
+
+
+def test_no_rollover_before_midnight(service):
+    clock = FakeClock(datetime(2024, 3, 6, 8))
+    rollover = DayRollover(service.player, service, clock=clock)
+    asyncio.run(run_until(rollover, clock, datetime(2024, 3, 6, 23, 50)))
+    assert rollover.rollovers == 0
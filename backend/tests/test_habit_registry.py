@@ -0,0 +1,31 @@
+from datetime import date
+from models.habit_registry import HabitRegistry
+from models.player import Player
+from services.habit_schedule import HabitScheduler
+from services.habit_service import HabitService
+
+
+def test_deleted_ids_are_not_issued_again():
+    registry = HabitRegistry([{'name': 'Read'}, {'name': 'Walk'}])
+    registry.delete('2')
+    assert registry.add({'name': 'Swim'})['id'] == '3'
+
+
+def test_saved_counter_outlives_a_restart(service):
+    service.add("Read", 'MENTAL', "Daily")
+    walk = service.add("Walk", 'PHYSICAL', "Daily")['id']
+    service.toggle(walk, date(2024, 3, 6))
+    service.delete(walk)
+
+    player = Player.load()
+    swim = HabitService(player, HabitScheduler()).add("Swim", 'PHYSICAL', "Daily")['id']
+    assert swim != walk
+    assert Player.store.completions(swim) == []
+    assert Player.load().habits.next_id == int(swim) + 1
+
+
+def test_replacing_the_habit_list_keeps_the_counter(store):
+    player = Player()
+    player.habits = [{'name': 'Read'}, {'name': 'Walk'}]
+    player.habits = [{'name': 'Swim'}]
+    assert player.habits.ids() == ['3']
@@ -0,0 +1,43 @@
+from datetime import date
+import pytest
+from models.player import Player
+from services.habit_schedule import HabitScheduler
+from services.habit_service import HabitService
+
+DAY = date(2024, 3, 6)
+
+
+@pytest.fixture(autouse=True)
+def habits(service):
+    service.add("Read", 'MENTAL', "Daily", xp=10)
+    service.add("Review", 'PRODUCTIVE', "Weekly", xp=25)
+
+
+def ids(service):
+    return service.player.habits.ids()
+
+
+def test_checking_off_again_after_undo_pays_no_more_xp(service):
+    daily = ids(service)[0]
+    for _ in range(5):
+        service.toggle(daily, DAY)
+        service.toggle(daily, DAY)
+    assert service.player.xp == 10
+    assert service.toggle(daily, DAY) is True
+    assert service.player.xp == 10
+
+
+def test_bulk_completion_pays_once_per_period(service):
+    service.complete_many(ids(service), DAY)
+    service.uncomplete_many(ids(service), DAY)
+    service.complete_many(ids(service), date(2024, 3, 8))  # same week, next day
+    assert service.player.xp == 10 + 25 + 10
+
+
+def test_rewarded_period_survives_a_reload(service):
+    daily = ids(service)[0]
+    service.toggle(daily, DAY)
+    service.toggle(daily, DAY)
+    player = Player.load()
+    HabitService(player, HabitScheduler()).toggle(daily, DAY)
+    assert player.xp == 10
@@ -0,0 +1,43 @@
+from datetime import date, timedelta
+import pytest
+from models.completion_history import CompletionHistory
+from services.habit_schedule import HabitScheduler
+from services.habit_stats import HabitStats
+
+TODAY = date(2024, 3, 31)
+
+
+def habit_with(*days, frequency='Daily'):
+    history = CompletionHistory()
+    for day in days:
+        history.mark(day)
+    return {'id': str(id(history)), 'frequency': frequency, 'history': history}
+
+
+def last_days(count, end=TODAY):
+    return [end - timedelta(days=i) for i in range(count)]
+
+
+def test_completion_rate_divides_by_the_requested_window():
+    stats = HabitStats([habit_with(*last_days(7))], TODAY)
+    assert stats.days == 7
+    assert stats.weekly_rates()[0] == 1.0
+    assert stats.monthly_rates()[0] == pytest.approx(7 / 30)
+    assert stats.completion_rates(0)[0] == 0.0
+
+
+def test_rates_match_the_bitset():
+    habits = [habit_with(*last_days(12)), habit_with(*last_days(40)[::3])]
+    stats = HabitStats(habits, TODAY)
+    for days in (1, 7, 30, 365):
+        for rate, habit in zip(stats.completion_rates(days), habits):
+            assert rate == pytest.approx(habit['history'].completion_rate(days, TODAY))
+
+
+def test_daily_and_period_statuses():
+    yesterday_run = habit_with(*last_days(5, TODAY - timedelta(days=1)))
+    today_run = habit_with(*last_days(3))
+    # Fri 2024-03-29 this week, Mon 2024-03-18 and Sun 2024-03-17 in the two before, a gap before that
+    weekly = habit_with(date(2024, 3, 29), date(2024, 3, 18), date(2024, 3, 17), date(2024, 3, 1), frequency='Weekly')
+    statuses = HabitScheduler().statuses([yesterday_run, today_run, weekly], TODAY)
+    assert [(s.done, s.streak) for s in statuses] == [(False, 5), (True, 3), (True, 3)]
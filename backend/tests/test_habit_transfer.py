@@ -0,0 +1,52 @@
+import io
+import json
+from screens.habits_screen import HabitType
+from services.habit_transfer import HABIT_TYPES, HabitImporter, read_csv, read_jsonl
+
+
+def run_jsonl(service, *lines):
+    text = '\n'.join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+    return HabitImporter(service).run(read_jsonl(io.StringIO(text)))
+
+
+def test_habit_types_match_the_enum():
+    assert set(HABIT_TYPES) == {habit_type.name for habit_type in HabitType}
+
+
+def test_malformed_rows_are_skipped_not_fatal(service):
+    result = run_jsonl(
+        service,
+        {'name': 'Bad type', 'type': 'FLYING'},
+        {'name': 'Bad frequency', 'frequency': 'Hourly'},
+        {'name': 'Bad xp', 'xp': 'abc'},
+        {'name': 'Negative xp', 'xp': -5},
+        {'name': 7},
+        '[1, 2, 3]',
+        '"just a string"',
+        '{not json',
+        {'name': 'Read', 'type': 'mental', 'frequency': 'weekly', 'xp': '15'},
+        {'name': 'Read', 'date': '2024-03-01'},
+        {'name': 'Read', 'date': 'yesterday'},
+    )
+    assert result.rows == 11
+    assert result.skipped == 9
+    assert (result.habits_added, result.completions_added) == (1, 1)
+    [habit] = service.player.habits
+    assert (habit['name'], habit['type'], habit['frequency'], habit['xp']) == ('Read', 'MENTAL', 'Weekly', 15)
+
+
+def test_imported_habits_can_be_shown(service):
+    run_jsonl(service, {'name': 'Swim', 'type': 'PHYSICAL'}, {'name': 'Nap', 'type': 'SLEEPY'})
+    assert [HabitType[habit['type']] for habit in service.player.habits] == [HabitType.PHYSICAL]
+
+
+def test_csv_rows_with_bad_values_are_skipped(service):
+    text = "name,type,frequency,xp,date\nRun,PHYSICAL,Daily,x,2024-03-01\nRun,PHYSICAL,Daily,20,2024-03-02\n"
+    result = HabitImporter(service).run(read_csv(io.StringIO(text)))
+    assert (result.rows, result.skipped, result.completions_added) == (2, 1, 1)
+    assert [habit['xp'] for habit in service.player.habits] == [20]
+
+
+def test_explicit_zero_xp_is_kept(service):
+    run_jsonl(service, {'name': 'Stretch', 'xp': 0}, {'name': 'Nap', 'xp': '0'}, {'name': 'Read', 'xp': ''})
+    assert [habit['xp'] for habit in service.player.habits] == [0, 0, 10]
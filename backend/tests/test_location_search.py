@@ -0,0 +1,33 @@
+from services.location_search import LocationSearch, normalize
+
+
+def index(*names):
+    search = LocationSearch()
+    for i, name in enumerate(names):
+        search.add(str(i), name)
+    return search
+
+
+def test_normalize_keeps_letters_of_every_script():
+    assert normalize('Москва') == 'москва'
+    assert normalize('東京タワー') == '東京タワー'
+    assert normalize('São_Paulo, Brasil!') == 'sao paulo brasil'
+    assert normalize('STRASSE') == normalize('Straße')
+
+
+def test_non_latin_names_are_found():
+    search = index('Москва', 'Санкт-Петербург', '東京', '東京タワー', 'Grand Canyon')
+    assert search.search('Москва') == (['0'], 1)
+    assert search.search('москв') == (['0'], 1)
+    assert search.search('петер') == (['1'], 1)
+    assert search.search('東京') == (['2', '3'], 2)
+    assert search.search('京タワ') == (['3'], 1)
+    assert search.search('grand can') == (['4'], 1)
+
+
+def test_short_terms_scan_instead_of_matching_nothing():
+    search = index('Oslo', 'Ōsaka', '大阪')
+    assert search.search('os')[1] == 2
+    assert search.search('阪') == (['2'], 1)
+    assert search.search('o') == (['1', '0'], 2)  # osaka before oslo
+    assert search.search('zzz') == ([], 0)
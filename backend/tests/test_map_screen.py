@@ -0,0 +1,38 @@
+import threading
+import time
+from models.player import Player
+from screens.map_screen import Location, MapScreen, VisitType
+from services.map_tiles import SourceMap, TileCache
+
+
+def test_frames_and_ui_edits_can_overlap(store, tmp_path):
+    screen = MapScreen(Player(), None)
+    screen.tile_layer.cache = TileCache(SourceMap(), directory=str(tmp_path))
+    errors = []
+    done = threading.Event()
+
+    def frames():
+        try:
+            while not done.is_set():
+                screen.offset_x = (screen.offset_x + 7) % 300
+                screen._render_frame()
+                time.sleep(0.001)
+        except Exception as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=frames)
+    worker.start()
+    try:
+        for i in range(200):
+            location = Location(id=str(i), name=f"Place {i}", description="", x=(i * 37 % 100) / 100,
+                                y=(i * 53 % 100) / 100, visit_type=VisitType.OTHER, visited=False)
+            screen.add_location(location)
+            if i % 2:
+                screen.selected_location = screen.locations[str(i - 1)]
+                screen._perform_delete()
+    finally:
+        done.set()
+        worker.join()
+        screen.frames.close()
+    assert errors == []
+    assert len(screen.locations) == len(screen.index) == len(screen.clusters) == len(screen.pin_layer) == 100
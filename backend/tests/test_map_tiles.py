@@ -0,0 +1,72 @@
+import base64
+import struct
+import zlib
+import numpy as np
+import pytest
+from services.calendar_raster import _chunk, iter_png
+from services.map_tiles import SourceMap, TileCache, encode_tile, read_png
+
+PALETTE = ((0, 0, 0), (255, 0, 0), (0, 255, 0), (0, 0, 255))
+
+
+def png(width, height, raw_rows, color_type=3):
+    return (b'\x89PNG\r\n\x1a\n'
+            + _chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+            + _chunk(b'PLTE', b''.join(bytes(rgb) for rgb in PALETTE))
+            + _chunk(b'IDAT', zlib.compress(b''.join(raw_rows)))
+            + _chunk(b'IEND', b''))
+
+
+def test_reads_back_what_iter_png_writes():
+    pixels = np.random.default_rng(1).integers(0, 4, (9, 13), dtype=np.uint8)
+    decoded, palette = read_png(encode_tile(pixels, PALETTE))
+    assert palette == PALETTE
+    assert np.array_equal(decoded, pixels)
+
+
+def test_undoes_sub_and_up_filters():
+    rows = [b'\x00' + bytes([1, 2, 3]), b'\x01' + bytes([1, 1, 1]), b'\x02' + bytes([2, 0, 255])]
+    pixels, _ = read_png(png(3, 3, rows))
+    assert pixels.tolist() == [[1, 2, 3], [1, 2, 3], [3, 2, 2]]
+
+
+def test_rejects_other_pngs():
+    with pytest.raises(ValueError):
+        read_png(b'GIF89a')
+    with pytest.raises(ValueError):
+        read_png(png(1, 1, [b'\x00' + bytes(3)], color_type=2))
+    with pytest.raises(ValueError):
+        read_png(png(1, 1, [b'\x04' + bytes([1])]))
+
+
+def test_cuts_tiles_from_the_bundled_map():
+    source = SourceMap()
+    assert source.version.startswith('world_map-')
+    assert len(source.palette) > 1
+    whole = source.render(0, 0, 0)
+    assert whole.shape == (256, 256)
+    # level 4 is 16 tiles across the 4096 pixel wide image, one source column per tile column
+    with open(source.path, 'rb') as f:
+        pixels, _ = read_png(f.read())
+    assert np.array_equal(source.render(4, 3, 5)[::2], pixels[640:768, 768:1024])
+
+
+def test_cache_writes_tiles_under_the_map_version(tmp_path):
+    source = SourceMap()
+    cache = TileCache(source, directory=str(tmp_path))
+    data = cache.get(2, 1, 1)
+    pixels, _ = read_png(base64.b64decode(data))
+    assert np.array_equal(pixels, source.render(2, 1, 1))
+    assert (tmp_path / source.version).is_dir()
+    assert TileCache(source, directory=str(tmp_path)).get(2, 1, 1) == data
+
+
+def test_finds_the_bundled_map_from_any_directory(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    assert SourceMap().version.startswith('world_map-')
+
+
+def test_cache_reads_the_source_only_when_a_tile_is_looked_up(tmp_path):
+    cache = TileCache(SourceMap(str(tmp_path / 'missing.png')), directory=str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        cache.cached((0, 0, 0))
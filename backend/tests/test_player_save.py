@@ -0,0 +1,149 @@
+from datetime import date
+import sqlite3
+import pytest
+from models.completion_history import CompletionHistory
+from models.player import Player
+
+
+class RecordingStore:
+    """Keeps appended records; fails the next ``fail`` writes"""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = 0
+
+    def needs_compaction(self, incoming=0):
+        return False
+
+    def append(self, records):
+        if self.fail:
+            self.fail -= 1
+            raise OSError("disk full")
+        self.batches.append(records)
+        return len(records)
+
+
+class Saver:
+    """Stands in for the write-behind worker; writes only when told to"""
+
+    def __init__(self, player):
+        self.player = player
+
+    def request(self):
+        pass
+
+    def run(self):
+        self.player.write_staged()
+
+
+@pytest.fixture
+def player(monkeypatch):
+    monkeypatch.setattr(Player, 'store', RecordingStore())
+    player = Player()
+    player.habits = [{'name': 'Read', 'streak': 1, 'history': CompletionHistory()}]
+    player.save()
+    player.store.batches.clear()
+    player.saver = Saver(player)
+    return player
+
+
+def puts(batch):
+    return [record['record'] for record in batch if record['op'] == 'put']
+
+
+def test_background_write_sees_the_state_at_request_time(player):
+    habit_id = player.habits.ids()[0]
+    player.habits.update(habit_id, streak=2)
+    player.request_save()
+    # the UI keeps editing while the worker hasn't written yet
+    player.habits.get(habit_id)['streak'] = 99
+    player.habits.get(habit_id)['note'] = "added mid-save"
+
+    player.saver.run()
+    [written] = puts(player.store.batches[0])
+    assert written['streak'] == 2 and 'note' not in written
+    assert written is not player.habits.get(habit_id)
+
+
+def test_history_is_copied_and_acknowledged_through_the_copy(player):
+    habit_id = player.habits.ids()[0]
+    history = player.habits.get(habit_id)['history']
+    history.mark(date(2024, 3, 1))
+    player.habits.update(habit_id)
+    player.request_save()
+    history.mark(date(2024, 3, 2))
+
+    player.saver.run()
+    [written] = puts(player.store.batches[0])
+    assert written['history'] is not history
+    assert list(written['history'].dates()) == [date(2024, 3, 1)]
+    written['history'].acknowledge(*written['history'].pending_changes())
+    assert history.pending_changes() == ([date(2024, 3, 2)], [])
+
+
+def test_failed_write_is_retried_with_newer_changes_winning(player):
+    first, = player.habits.ids()
+    player.habits.update(first, streak=2)
+    player.request_save()
+    player.store.fail = 1
+    with pytest.raises(OSError):
+        player.saver.run()
+
+    player.habits.update(first, streak=3)
+    second = player.habits.add({'name': 'Walk', 'streak': 0})['id']
+    player.request_save()
+    player.saver.run()
+    assert [(h['id'], h['streak']) for h in puts(player.store.batches[0])] == [(first, 3), (second, 0)]
+
+
+def test_section_rewrite_drops_older_staged_records(player):
+    habit_id = player.habits.ids()[0]
+    player.habits.update(habit_id, streak=5)
+    player.request_save()
+    player.habits = [{'name': 'Only', 'streak': 0}]
+    player.request_save()
+    player.saver.run()
+    [batch] = player.store.batches
+    assert [(record['op'], record['field']) for record in batch] == [('set', 'habits'), ('set', 'next_habit_id')]
+    assert [h['name'] for h in batch[0]['value']] == ['Only']
+
+
+def test_unreadable_sqlite_profile_is_kept_until_the_user_agrees(store):
+    path = store.path
+    saved = Player()
+    saved.habits = [{'name': 'Read', 'streak': 1}]
+    saved.save()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE player SET value = '{' WHERE field = 'name'")
+
+    player = Player.load()
+    assert player.load_error and player.saves_blocked
+    player.habits.add({'name': 'Run', 'streak': 0})
+    player.save()
+    player.close()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT name FROM habits").fetchall() == [('Read',)]
+    with sqlite3.connect(player.backup_path) as conn:
+        assert conn.execute("SELECT name FROM habits").fetchall() == [('Read',)]
+
+    player.allow_saves()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT name FROM habits").fetchall() == [('Run',)]
+    assert Player.load().name == "Adventurer"
+
+
+@pytest.mark.parametrize('locations, seeded', [([], False), ([{'id': 'home', 'name': 'Home'}], True)])
+def test_profile_from_before_the_seeded_flag(monkeypatch, locations, seeded):
+    class OldProfile:
+        def load(self):
+            return {'name': 'Old', 'locations': locations}
+
+    monkeypatch.setattr(Player, 'store', OldProfile())
+    assert Player.load().locations_seeded is seeded
+
+
+def test_sqlite_profile_without_the_seeded_flag_gets_the_samples(store):
+    Player().save()
+    with sqlite3.connect(store.path) as conn:
+        conn.execute("DELETE FROM player WHERE field = 'locations_seeded'")
+    assert Player.load().locations_seeded is False
@@ -0,0 +1,148 @@
+"""Fault injection for snapshot writes: the write is killed at random points"""
+import json
+import os
+import random
+import pytest
+from services import snapshots
+from services.journal import PlayerJournal
+from services.snapshots import SnapshotError, read_snapshot, write_snapshot
+
+TRIALS = 200
+
+
+class Crash(Exception):
+    """The process died here"""
+
+
+class CrashingFile:
+    """A file that dies once ``budget`` more bytes have been written"""
+
+    def __init__(self, f, budget):
+        self.f = f
+        self.budget = budget
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.f.close()
+
+    def write(self, data):
+        if len(data) > self.budget[0]:
+            self.f.write(data[:self.budget[0]])
+            self.f.flush()
+            self.budget[0] = 0
+            raise Crash()
+        self.budget[0] -= len(data)
+        return self.f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+
+def kill_after(monkeypatch, written_bytes=None, renames=None):
+    """Make the next snapshot write die after ``written_bytes`` bytes or ``renames`` renames"""
+    if written_bytes is not None:
+        budget = [written_bytes]
+        monkeypatch.setattr(snapshots, 'open', lambda *a, **k: CrashingFile(open(*a, **k), budget), raising=False)
+    if renames is not None:
+        left = [renames]
+        replace = os.replace
+
+        def crashing_replace(src, dst):
+            if not left[0]:
+                raise Crash()
+            left[0] -= 1
+            replace(src, dst)
+        monkeypatch.setattr(snapshots.os, 'replace', crashing_replace)
+
+
+def payload(generation):
+    return json.dumps({'generation': generation, 'pad': 'x' * (generation * 37 % 500)})
+
+
+def write_generations(path, count, keep=3):
+    for generation in range(1, count + 1):
+        write_snapshot(path, payload(generation), keep=keep)
+
+
+def loaded_generation(path, keep=3):
+    return read_snapshot(path, keep=keep, parse=json.loads)['generation']
+
+
+@pytest.mark.parametrize('seed', range(TRIALS))
+def test_write_killed_at_random_offset_keeps_previous_generation(tmp_path, monkeypatch, seed):
+    rng = random.Random(seed)
+    path = str(tmp_path / 'player.json')
+    done = rng.randint(1, 5)
+    write_generations(path, done)
+    new = payload(done + 1)
+    size = write_snapshot(str(tmp_path / 'scratch'), new)
+    kill_after(monkeypatch, written_bytes=rng.randrange(0, size))
+    with pytest.raises(Crash):
+        write_snapshot(path, new)
+    monkeypatch.undo()
+    assert loaded_generation(path) == done
+
+
+@pytest.mark.parametrize('seed', range(TRIALS // 4))
+def test_write_killed_between_renames_keeps_a_whole_generation(tmp_path, monkeypatch, seed):
+    rng = random.Random(seed)
+    path = str(tmp_path / 'player.json')
+    done = rng.randint(1, 5)
+    write_generations(path, done)
+    # every rename before the new snapshot's own, which is the last
+    kill_after(monkeypatch, renames=rng.randint(0, min(done, 3)))
+    with pytest.raises(Crash):
+        write_snapshot(path, payload(done + 1))
+    monkeypatch.undo()
+    assert loaded_generation(path) == done
+
+
+@pytest.mark.parametrize('seed', range(TRIALS))
+def test_torn_or_corrupted_newest_generation_falls_back(tmp_path, seed):
+    rng = random.Random(seed)
+    path = str(tmp_path / 'player.json')
+    done = rng.randint(2, 5)
+    write_generations(path, done)
+    with open(path, 'rb') as f:
+        data = bytearray(f.read())
+    if rng.random() < 0.5:
+        data = data[:rng.randrange(0, len(data))]
+    else:
+        i = rng.randrange(0, len(data))
+        data[i] ^= 1 << rng.randrange(8)
+    with open(path, 'wb') as f:
+        f.write(data)
+    assert loaded_generation(path) == done - 1
+
+
+def test_no_valid_generation_raises(tmp_path):
+    path = str(tmp_path / 'player.json')
+    write_generations(path, 2, keep=1)
+    for candidate in (path, f"{path}.1"):
+        with open(candidate, 'r+b') as f:
+            f.truncate(10)
+    with pytest.raises(SnapshotError):
+        read_snapshot(path, keep=1, parse=json.loads)
+
+
+@pytest.mark.parametrize('seed', range(TRIALS // 4))
+def test_journal_survives_compaction_killed_mid_write(tmp_path, monkeypatch, seed):
+    rng = random.Random(seed)
+    journal = PlayerJournal(str(tmp_path / 'player.json'), str(tmp_path / 'player.journal'))
+    state = {'name': 'Adventurer', 'xp': 0, 'habits': []}
+    journal.compact(state)
+    for i in range(rng.randint(1, 20)):
+        record = {'op': 'put', 'section': 'habits', 'record': {'id': str(i), 'name': f"Habit {i}"}}
+        journal.append([record])
+        state['habits'].append(record['record'])
+    state['xp'] = 50
+    journal.append([{'op': 'set', 'field': 'xp', 'value': 50}])
+
+    size = PlayerJournal(str(tmp_path / 'scratch.json'), str(tmp_path / 'scratch.journal')).compact(state)
+    kill_after(monkeypatch, written_bytes=rng.randrange(0, size))
+    with pytest.raises(Crash):
+        journal.compact(state)
+    monkeypatch.undo()
+    assert PlayerJournal(journal.snapshot_path, journal.journal_path).load() == state
@@ -0,0 +1,67 @@
+from datetime import date
+import pytest
+from models.completion_history import CompletionHistory
+from services.sqlite_store import SQLiteStore
+
+
+def habit_with(*days):
+    history = CompletionHistory()
+    for day in days:
+        history.mark(day)
+    return {'id': '1', 'name': 'Read', 'type': 'MENTAL', 'frequency': 'Daily', 'streak': 0,
+            'xp': 10, 'completed_today': False, 'history': history}
+
+
+def test_rolled_back_save_keeps_completion_changes_pending(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'db'))
+    habit = habit_with(date(2024, 3, 1))
+    broken = {'op': 'set', 'field': 'name', 'value': object()}  # not JSON serializable
+
+    with pytest.raises(TypeError):
+        store.append([{'op': 'put', 'section': 'habits', 'record': habit}, broken])
+    assert store.completions('1') == []
+    assert habit['history'].pending_changes() == ([date(2024, 3, 1)], [])
+
+    store.append([{'op': 'put', 'section': 'habits', 'record': habit}])
+    assert store.completions('1') == ['2024-03-01']
+    assert habit['history'].pending_changes() == ([], [])
+
+
+def test_changes_made_during_a_save_stay_pending():
+    habit = habit_with(date(2024, 3, 1))
+    history = habit['history']
+    added, removed = history.pending_changes()
+    history.unmark(date(2024, 3, 1))
+    history.acknowledge(added, removed)
+    assert history.pending_changes() == ([], [date(2024, 3, 1)])
+
+
+class LegacyStore:
+    def __init__(self, state):
+        self.state = state
+
+    def load(self):
+        return self.state
+
+
+def test_migration_fills_completions_from_the_stored_history(tmp_path):
+    days = [date(2024, 3, d) for d in range(1, 6)]
+    serialized = dict(habit_with(*days), history=habit_with(*days)['history'].to_json())
+    legacy = {'id': '2', 'name': 'Run', 'streak': 3, 'last_completed': '2024-02-10'}
+    store = SQLiteStore(str(tmp_path / 'db'))
+    assert store.migrate_from(LegacyStore({'name': 'Hero', 'habits': [serialized, legacy]}))
+    assert store.completions('1') == [day.isoformat() for day in days]
+    assert store.completions('2') == ['2024-02-08', '2024-02-09', '2024-02-10']
+
+
+def test_rewriting_habits_replaces_their_completions(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'db'))
+    first = habit_with(date(2024, 3, 1), date(2024, 3, 2))
+    store.append([{'op': 'set', 'field': 'habits', 'value': [first]}])
+    assert store.completions('1') == ['2024-03-01', '2024-03-02']
+    assert first['history'].pending_changes() == ([], [])
+
+    second = dict(habit_with(date(2024, 4, 1)), id='2')
+    store.append([{'op': 'set', 'field': 'habits', 'value': [second]}])
+    assert store.completions('1') == []
+    assert store.completions('2') == ['2024-04-01']